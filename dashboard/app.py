@@ -5,34 +5,20 @@ import streamlit as st
 import plotly.express as px
 from db.connection import get_engine
 from sqlalchemy.orm import sessionmaker
+from dashboard.course_index import CourseIndex
+from dashboard.result_cache import result_cache_from_env
 from dashboard.queries import (
-    search_courses, get_professors_for_course, get_grade_history,
-    get_comments_for_professor, get_departments,
-)
-from etl.scoring import (
-    compute_gaucho_score, normalize_gpa, normalize_quality,
-    normalize_difficulty, bayesian_adjust,
+    get_professor_ranking_page, get_course_grade_history,
+    get_course_grade_histograms, get_course_grade_trends, get_course_comments, get_departments,
+    TREND_TERMS,
 )
+from db.data_version import current_data_version
 
 st.set_page_config(page_title="Gaucho Course Optimizer", page_icon="\U0001f393", layout="wide")
 st.title("Gaucho Course Optimizer")
 st.caption("Find the best professor for your UCSB courses")
 
-# --- Sidebar: Weight Sliders ---
-st.sidebar.header("Score Weights")
-w_gpa = st.sidebar.slider("GPA Weight", 0.0, 1.0, 0.25, 0.05)
-w_quality = st.sidebar.slider("Quality Weight", 0.0, 1.0, 0.25, 0.05)
-w_difficulty = st.sidebar.slider("Difficulty Weight", 0.0, 1.0, 0.25, 0.05)
-w_sentiment = st.sidebar.slider("Sentiment Weight", 0.0, 1.0, 0.25, 0.05)
-
-weights = {"gpa": w_gpa, "quality": w_quality, "difficulty": w_difficulty, "sentiment": w_sentiment}
-
-# Normalize weights to sum to 1
-total_w = sum(weights.values())
-if total_w > 0:
-    weights = {k: v / total_w for k, v in weights.items()}
-
-st.sidebar.markdown("---")
+# --- Sidebar: Filters ---
 st.sidebar.header("Filters")
 min_year = st.sidebar.number_input("Minimum Year", value=2015, min_value=2009, max_value=2025)
 
@@ -41,47 +27,263 @@ engine = get_engine()
 Session = sessionmaker(bind=engine)
 
 
-@st.cache_data(ttl=3600)
-def _get_departments():
+# Cached results never expire on their own; every loader takes the data version
+# as its first argument, so a pipeline run that bumps it makes all keys miss.
+# Query results go through ResultCache, whose backend (DASHBOARD_CACHE_URL) can
+# be shared by every dashboard replica.
+DATA_VERSION_CHECK_SECONDS = 5
+
+
+@st.cache_resource
+def _result_cache():
+    return result_cache_from_env()
+
+
+cache = _result_cache()
+
+
+@st.cache_data(ttl=DATA_VERSION_CHECK_SECONDS)
+def _data_version() -> int:
+    with Session() as session:
+        return current_data_version(session)
+
+
+@st.cache_resource(max_entries=1)
+def _course_index(data_version: int) -> CourseIndex:
+    # One index per process; a new data version builds a fresh one, replacing the old
+    with Session() as session:
+        return CourseIndex.load(session)
+
+
+@cache.cached
+def _get_departments(data_version: int):
     with Session() as session:
         return get_departments(session)
 
 
-@st.cache_data(ttl=3600)
-def _search_courses(query: str, department: str | None = None):
+@cache.cached
+def _get_ranking_page(data_version: int, course_id: int, weights: dict[str, float],
+                      min_year: int | None = None, cursor: list | None = None):
     with Session() as session:
-        return search_courses(session, query, department=department)
+        return get_professor_ranking_page(session, course_id, weights, min_year=min_year, cursor=cursor)
 
 
-@st.cache_data(ttl=3600)
-def _get_professors(course_id: int, min_year: int | None = None):
+# Course-level batches, one query and one cache entry per course; the cards slice
+# them. Stored as (professor_id, rows) pairs since JSON object keys are strings.
+@cache.cached
+def _get_course_history(data_version: int, course_id: int, min_year: int | None = None):
     with Session() as session:
-        return get_professors_for_course(session, course_id, min_year=min_year)
+        return list(get_course_grade_history(session, course_id, min_year=min_year).items())
 
 
-@st.cache_data(ttl=3600)
-def _get_grade_history(prof_id: int, course_id: int):
+@cache.cached
+def _get_course_histograms(data_version: int, course_id: int, min_year: int | None = None):
     with Session() as session:
-        return get_grade_history(session, prof_id, course_id)
+        return list(get_course_grade_histograms(session, course_id, min_year=min_year).items())
 
 
-@st.cache_data(ttl=3600)
-def _get_comments(professor_id: int):
+@cache.cached
+def _get_course_trends(data_version: int, course_id: int, min_year: int | None = None):
     with Session() as session:
-        return get_comments_for_professor(session, professor_id)
+        return list(get_course_grade_trends(session, course_id, min_year=min_year).items())
 
 
+@cache.cached
+def _get_course_comments(data_version: int, course_id: int):
+    with Session() as session:
+        return list(get_course_comments(session, course_id).items())
+
+
+# Labels for the histogram buckets, in dashboard.queries.GRADE_KEYS order
+GRADE_LABELS = ["A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "D-", "F"]
+
+
+def _score_weights() -> dict[str, float]:
+    """Weight sliders, normalized to sum to 1."""
+    st.subheader("Score Weights")
+    cols = st.columns(4)
+    weights = {
+        "gpa": cols[0].slider("GPA Weight", 0.0, 1.0, 0.25, 0.05),
+        "quality": cols[1].slider("Quality Weight", 0.0, 1.0, 0.25, 0.05),
+        "difficulty": cols[2].slider("Difficulty Weight", 0.0, 1.0, 0.25, 0.05),
+        "sentiment": cols[3].slider("Sentiment Weight", 0.0, 1.0, 0.25, 0.05),
+    }
+    total_w = sum(weights.values())
+    if total_w > 0:
+        weights = {k: v / total_w for k, v in weights.items()}
+    return weights
+
+
+@st.fragment
+def _grade_history_panel(prof: dict, course_id: int, min_year: int, data_version: int):
+    # Lazy: history is fetched and the figures built only while the expander is open
+    panel = st.expander(f"Grade history for {prof['name']}", key=f"history-{prof['id']}", on_change="rerun")
+    if not panel.open:
+        return
+    with panel:
+        history = dict(_get_course_history(data_version, course_id, min_year=min_year)).get(prof["id"])
+        if not history:
+            st.info("No grade history for this course.")
+            return
+        histogram = dict(_get_course_histograms(data_version, course_id, min_year=min_year))[prof["id"]]
+        if histogram["weighted_gpa"] is not None:
+            st.caption(f"{histogram['students']} students, enrollment-weighted GPA {histogram['weighted_gpa']:.2f}")
+        bar_fig = px.bar(
+            x=GRADE_LABELS,
+            y=histogram["counts"],
+            labels={"x": "Grade", "y": "Students"},
+            title=f"Grade Distribution — {prof['name']}",
+        )
+        st.plotly_chart(bar_fig, use_container_width=True)
+
+        fig = px.line(
+            x=[h["quarter"] for h in history],
+            y=[h["avg_gpa"] for h in history],
+            labels={"x": "Quarter", "y": "Avg GPA"},
+            title=f"GPA Trend — {prof['name']}",
+        )
+        fig.update_layout(yaxis_range=[0, 4.0])
+        st.plotly_chart(fig, use_container_width=True)
+        trend = dict(_get_course_trends(data_version, course_id, min_year=min_year)).get(prof["id"])
+        if trend is not None:
+            st.caption(f"GPA trend over the last {TREND_TERMS} terms taught: {trend:+.2f} per year")
+
+
+@st.fragment
+def _comments_panel(prof: dict, course_id: int, data_version: int):
+    panel = st.expander(
+        f"Recent student comments for {prof['name']}", key=f"comments-{prof['id']}", on_change="rerun",
+    )
+    if not panel.open:
+        return
+    with panel:
+        comments = dict(_get_course_comments(data_version, course_id)).get(prof["id"])
+        if not comments:
+            st.info("No comments found for this professor.")
+            return
+        for comment in comments:
+            sent = comment.get("sentiment_score")
+            if sent is not None:
+                if sent >= 0.2:
+                    badge = ":green[Positive]"
+                elif sent <= -0.2:
+                    badge = ":red[Negative]"
+                else:
+                    badge = ":orange[Neutral]"
+            else:
+                badge = ":gray[N/A]"
+
+            date_str = comment.get("created_at") or "Unknown date"
+            st.markdown(f"**{date_str}** {badge}")
+            st.write(comment.get("text") or "_No comment text_")
+            st.markdown("---")
+
+
+def _professor_card(prof: dict, course_id: int, min_year: int, data_version: int):
+    score = prof.get("gaucho_score", 0)
+    if score >= 70:
+        color = "\U0001f7e2"
+    elif score >= 50:
+        color = "\U0001f7e1"
+    else:
+        color = "\U0001f534"
+
+    with st.container():
+        col1, col2, col3 = st.columns([1, 2, 2])
+
+        with col1:
+            st.metric("Gaucho Score", f"{score:.0f}/100")
+            if prof.get("score_low") is not None:
+                st.caption(
+                    f"95% range {prof['score_low']:.0f}-{prof['score_high']:.0f} at default weights",
+                    help="Bootstrap interval from resampling this instructor's quarter GPAs and "
+                         "comment sentiments; wide ranges mean little data.",
+                )
+            st.caption(f"{color} {prof['name']}")
+            if prof.get("match_confidence"):
+                st.caption(f"Match: {prof['match_confidence']:.0f}%")
+
+        with col2:
+            st.markdown("**Grade Stats**")
+            if prof["mean_gpa"]:
+                st.write(f"Avg GPA: **{prof['mean_gpa']:.2f}** (+/-{prof['std_gpa'] or 0:.2f})")
+            st.write(f"Quarters taught: {prof['quarters_taught']}")
+            if prof.get("latest_term"):
+                st.caption(f"Last taught {prof['latest_term']}")
+
+        with col3:
+            st.markdown("**RMP Ratings**")
+            if prof["rmp_quality"]:
+                st.write(f"Quality: **{prof['rmp_quality']:.1f}**/5")
+                st.write(f"Difficulty: {prof['rmp_difficulty']:.1f}/5")
+                if prof["rmp_would_take_again"]:
+                    st.write(f"Would take again: {prof['rmp_would_take_again']:.0f}%")
+            else:
+                st.write("No RMP data")
+
+        # Keywords
+        if prof.get("keywords"):
+            st.markdown(" ".join(f"`{kw}`" for kw in prof["keywords"][:6]))
+
+        _grade_history_panel(prof, course_id, min_year, data_version)
+        _comments_panel(prof, course_id, data_version)
+
+        st.divider()
+
+
+def _load_more(state_key: str):
+    weights, pages_shown = st.session_state[state_key]
+    st.session_state[state_key] = (weights, pages_shown + 1)
+
+
+@st.fragment
+def _ranking(course_id: int, min_year: int, data_version: int):
+    # A fragment: moving a weight slider reruns only the sliders and the ranked cards
+    weights = _score_weights()
+
+    # Scores are computed and ranked in Postgres, a page at a time; "Load more"
+    # follows the keyset cursor. New weights (or course, year) start over at page one.
+    state_key = f"ranking-pages-{course_id}-{min_year}"
+    shown_for, pages_shown = st.session_state.get(state_key, (weights, 1))
+    if shown_for != weights:
+        pages_shown = 1
+
+    professors, cursor, page = [], None, None
+    for _ in range(pages_shown):
+        page = _get_ranking_page(data_version, course_id, weights, min_year=min_year, cursor=cursor)
+        professors.extend(page["professors"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    if not professors:
+        st.info("No professor data found for this course.")
+        return
+
+    for prof in professors:
+        _professor_card(prof, course_id, min_year, data_version)
+
+    st.session_state[state_key] = (weights, pages_shown)
+    if cursor is not None:
+        st.button(
+            f"Load more ({page['remaining']} more instructors)", key=f"more-{course_id}",
+            on_click=_load_more, args=(state_key,),
+        )
+
+
+data_version = _data_version()
+
 # --- Department filter ---
-departments = _get_departments()
-dept_options = ["All"] + departments
-selected_dept = st.sidebar.selectbox("Department", dept_options)
-dept_filter = None if selected_dept == "All" else selected_dept
+departments = _get_departments(data_version)
+dept_options = {"All": None} | {d["code"]: d["id"] for d in departments}
+selected_dept = st.sidebar.selectbox("Department", list(dept_options))
+dept_filter = dept_options[selected_dept]
 
 # --- Search ---
 search_query = st.text_input("Search for a course (e.g., PSTAT120A, CMPSC8)", "")
 
 if search_query:
-    courses = _search_courses(search_query.replace(" ", ""), department=dept_filter)
+    courses = _course_index(data_version).search(search_query, department_id=dept_filter)
     selected_course = None
 
     if not courses:
@@ -96,123 +298,7 @@ if search_query:
     if selected_course:
         st.header(f"Professors for {selected_course['code']}")
 
-        professors = _get_professors(selected_course["id"], min_year=int(min_year))
-
-        if not professors:
-            st.info("No professor data found for this course.")
-        else:
-            # Compute scores with current weights
-            dept_gpas = [p["mean_gpa"] for p in professors if p["mean_gpa"]]
-            dept_median = sorted(dept_gpas)[len(dept_gpas) // 2] if dept_gpas else 3.0
-
-            for prof in professors:
-                gpa_f = normalize_gpa(prof["mean_gpa"], dept_median) if prof["mean_gpa"] else 0.5
-                qual_f = normalize_quality(prof["rmp_quality"]) if prof["rmp_quality"] else 0.5
-                diff_f = normalize_difficulty(prof["rmp_difficulty"]) if prof["rmp_difficulty"] else 0.5
-                sent_f = (prof["avg_sentiment"] + 1) / 2 if prof["avg_sentiment"] is not None else 0.5
-
-                # Bayesian adjust quality if few ratings
-                if prof["rmp_num_ratings"] and prof["rmp_quality"]:
-                    adj_qual = bayesian_adjust(prof["rmp_quality"], prof["rmp_num_ratings"], 3.0)
-                    qual_f = normalize_quality(adj_qual)
-
-                prof["gaucho_score"] = compute_gaucho_score(gpa_f, qual_f, diff_f, sent_f, weights)
-
-            # Sort by score descending
-            professors.sort(key=lambda p: p.get("gaucho_score", 0), reverse=True)
-
-            # Render professor cards
-            for prof in professors:
-                score = prof.get("gaucho_score", 0)
-                if score >= 70:
-                    color = "\U0001f7e2"
-                elif score >= 50:
-                    color = "\U0001f7e1"
-                else:
-                    color = "\U0001f534"
-
-                with st.container():
-                    col1, col2, col3 = st.columns([1, 2, 2])
-
-                    with col1:
-                        st.metric("Gaucho Score", f"{score:.0f}/100")
-                        st.caption(f"{color} {prof['name']}")
-                        if prof.get("match_confidence"):
-                            st.caption(f"Match: {prof['match_confidence']:.0f}%")
-
-                    with col2:
-                        st.markdown("**Grade Stats**")
-                        if prof["mean_gpa"]:
-                            st.write(f"Avg GPA: **{prof['mean_gpa']:.2f}** (+/-{prof['std_gpa'] or 0:.2f})")
-                        st.write(f"Quarters taught: {prof['quarters_taught']}")
-
-                    with col3:
-                        st.markdown("**RMP Ratings**")
-                        if prof["rmp_quality"]:
-                            st.write(f"Quality: **{prof['rmp_quality']:.1f}**/5")
-                            st.write(f"Difficulty: {prof['rmp_difficulty']:.1f}/5")
-                            if prof["rmp_would_take_again"]:
-                                st.write(f"Would take again: {prof['rmp_would_take_again']:.0f}%")
-                        else:
-                            st.write("No RMP data")
-
-                    # Keywords
-                    if prof.get("keywords"):
-                        st.markdown(" ".join(f"`{kw}`" for kw in prof["keywords"][:6]))
-
-                    # Expandable: Grade history
-                    with st.expander(f"Grade history for {prof['name']}"):
-                        history = _get_grade_history(prof["id"], selected_course["id"])
-                        if history:
-                            # Grade distribution bar chart
-                            grade_labels = [
-                                "A+", "A", "A-", "B+", "B", "B-",
-                                "C+", "C", "C-", "D+", "D", "D-", "F",
-                            ]
-                            grade_keys = [
-                                "a_plus", "a", "a_minus", "b_plus", "b", "b_minus",
-                                "c_plus", "c", "c_minus", "d_plus", "d", "d_minus", "f",
-                            ]
-                            totals = {k: sum(h.get(k, 0) or 0 for h in history) for k in grade_keys}
-                            bar_fig = px.bar(
-                                x=grade_labels,
-                                y=[totals[k] for k in grade_keys],
-                                labels={"x": "Grade", "y": "Students"},
-                                title=f"Grade Distribution — {prof['name']}",
-                            )
-                            st.plotly_chart(bar_fig, use_container_width=True)
-
-                            # GPA trend line chart
-                            fig = px.line(
-                                x=[h["quarter"] for h in history],
-                                y=[h["avg_gpa"] for h in history],
-                                labels={"x": "Quarter", "y": "Avg GPA"},
-                                title=f"GPA Trend — {prof['name']}",
-                            )
-                            fig.update_layout(yaxis_range=[0, 4.0])
-                            st.plotly_chart(fig, use_container_width=True)
-
-                    # Expandable: Recent comments
-                    with st.expander(f"Recent student comments for {prof['name']}"):
-                        comments = _get_comments(prof["id"])
-                        if comments:
-                            for comment in comments:
-                                sent = comment.get("sentiment_score")
-                                if sent is not None:
-                                    if sent >= 0.2:
-                                        badge = ":green[Positive]"
-                                    elif sent <= -0.2:
-                                        badge = ":red[Negative]"
-                                    else:
-                                        badge = ":orange[Neutral]"
-                                else:
-                                    badge = ":gray[N/A]"
-
-                                date_str = comment.get("created_at") or "Unknown date"
-                                st.markdown(f"**{date_str}** {badge}")
-                                st.write(comment.get("text") or "_No comment text_")
-                                st.markdown("---")
-                        else:
-                            st.info("No comments found for this professor.")
-
-                    st.divider()
+        _ranking(selected_course["id"], int(min_year), data_version)
+
+with st.sidebar.expander("Cache stats"):
+    st.json(cache.stats())
@@ -0,0 +1,104 @@
+"""In-memory course catalog index for dashboard autocomplete.
+
+The catalog is small and changes only when the pipeline loads grades, so the
+dashboard loads it once per process (one query) and answers searches without
+touching the database. Normalized codes are kept sorted, so a prefix is a
+bisect plus a short forward scan; each canonical department gets its own
+sorted partition. Queries that are not a code prefix fall back to a substring
+scan of codes and titles, then to fuzzy title matching, mirroring the tiers of
+dashboard.queries.search_courses.
+"""
+
+from bisect import bisect_left
+from itertools import islice
+
+from rapidfuzz import fuzz, process
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from dashboard.queries import SEARCH_LIMIT
+from db.models import Course
+from db.course_search import normalize_course_code
+
+# Minimum partial_ratio for the fuzzy tier; tolerates a typo or two in a title word
+FUZZY_CUTOFF = 80
+
+
+class _Partition:
+    """Courses sorted by normalized code, with the keys in a parallel list for bisect."""
+
+    def __init__(self, courses: list[dict]):
+        self.courses = sorted(courses, key=lambda c: (c["code_normalized"], c["code"]))
+        self.keys = [c["code_normalized"] for c in self.courses]
+        self.texts = [c["search_text"] for c in self.courses]
+
+    def prefix(self, norm: str, limit: int) -> list[dict]:
+        hits = []
+        i = bisect_left(self.keys, norm)
+        while i < len(self.keys) and len(hits) < limit and self.keys[i].startswith(norm):
+            hits.append(self.courses[i])
+            i += 1
+        return hits
+
+
+class CourseIndex:
+    """Course catalog held in memory; search() returns the same dicts as search_courses."""
+
+    def __init__(self, courses: list[dict]):
+        self._all = _Partition(courses)
+        by_dept: dict[int, list[dict]] = {}
+        for course in courses:
+            if course["department_id"] is not None:
+                by_dept.setdefault(course["department_id"], []).append(course)
+        self._by_dept = {dept_id: _Partition(rows) for dept_id, rows in by_dept.items()}
+
+    @classmethod
+    def load(cls, session: Session) -> "CourseIndex":
+        """Build the index from a single query over the course catalog."""
+        rows = session.execute(select(
+            Course.id, Course.code, Course.title, Course.department, Course.department_id,
+            Course.code_normalized, Course.search_text,
+        )).all()
+        return cls([
+            {"id": r.id, "code": r.code, "title": r.title, "department": r.department,
+             "department_id": r.department_id,
+             "code_normalized": r.code_normalized or normalize_course_code(r.code),
+             "search_text": r.search_text or ""}
+            for r in rows
+        ])
+
+    def __len__(self) -> int:
+        return len(self._all.courses)
+
+    def search(self, query: str, department_id: int | None = None, limit: int = SEARCH_LIMIT) -> list[dict]:
+        """Search by normalized code prefix, then substring, then fuzzy code/title match."""
+        if department_id is None:
+            part = self._all
+        else:
+            part = self._by_dept.get(department_id)
+            if part is None:
+                return []
+
+        norm = normalize_course_code(query)
+        if not norm:
+            hits = part.courses[:limit]
+        else:
+            hits = part.prefix(norm, limit)
+        if not hits and norm:
+            needle = query.strip().lower()
+            hits = list(islice((
+                c for c in part.courses
+                if norm in c["code_normalized"] or needle in c["search_text"]
+            ), limit))
+            if not hits:
+                matches = process.extract(
+                    needle, part.texts,
+                    scorer=fuzz.partial_ratio, score_cutoff=FUZZY_CUTOFF, limit=limit,
+                )
+                hits = [part.courses[i] for _, _, i in matches]
+
+        return [
+            {"id": c["id"], "code": c["code"], "title": c["title"],
+             "department": c["department"], "department_id": c["department_id"]}
+            for c in hits
+        ]
@@ -1,6 +1,28 @@
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-from db.models import Professor, Course, GradeDistribution, RmpRating, RmpComment
+from sqlalchemy import and_, case, func, or_, select, text
+from sqlalchemy.orm import Session, aliased
+from db.course_stats import course_stats_query
+from db.models import (
+    Professor, Course, Department, GradeDistribution, RmpRating, RmpComment,
+    ProfessorRatingRollup, GauchoScore, professor_course_stats,
+)
+from db.course_search import normalize_course_code
+
+SEARCH_LIMIT = 20
+
+# Professors per page of a course ranking
+RANKING_PAGE_SIZE = 20
+
+# Most recent terms taught that a GPA trend is fitted over
+TREND_TERMS = 8
+
+# Whether pg_trgm is installed, per database URL
+_trigram_available: dict[str, bool] = {}
+
+# Histogram bucket order, best grade first
+GRADE_KEYS = [
+    "a_plus", "a", "a_minus", "b_plus", "b", "b_minus",
+    "c_plus", "c", "c_minus", "d_plus", "d", "d_minus", "f",
+]
 
 MONTH_NAMES = [
     "", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
@@ -8,106 +30,361 @@ MONTH_NAMES = [
 ]
 
 
-def get_departments(session: Session) -> list[str]:
-    """Get all distinct department names, sorted."""
-    rows = session.query(Course.department).distinct().order_by(Course.department).all()
-    return [r[0] for r in rows if r[0]]
+def get_departments(session: Session) -> list[dict]:
+    """Get the canonical departments that have courses, sorted by code."""
+    rows = (
+        session.query(Department)
+        .filter(Department.id.in_(session.query(Course.department_id)))
+        .order_by(Department.code)
+        .all()
+    )
+    return [{"id": d.id, "code": d.code, "name": d.name} for d in rows]
+
+
+def _has_trigram(session: Session) -> bool:
+    url = str(session.get_bind().engine.url)
+    if url not in _trigram_available:
+        _trigram_available[url] = session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first() is not None
+    return _trigram_available[url]
+
+
+def search_courses(session: Session, query: str, department_id: int | None = None) -> list[dict]:
+    """Search courses by code or title, optionally filtered by canonical department id.
+
+    Normalized code prefixes ("cmpsc 8", "pstat120") are answered from the
+    code_normalized B-tree. Otherwise courses are ranked by pg_trgm word
+    similarity over code and title, which tolerates typos; without pg_trgm
+    this falls back to a substring match.
+    """
+    q = session.query(Course)
+    if department_id is not None:
+        q = q.filter(Course.department_id == department_id)
+
+    norm = normalize_course_code(query)
+    if not norm:
+        courses = q.order_by(Course.code).limit(SEARCH_LIMIT).all()
+    else:
+        courses = (
+            q.filter(Course.code_normalized.like(f"{norm}%"))
+            .order_by(Course.code_normalized)
+            .limit(SEARCH_LIMIT)
+            .all()
+        )
+    if not courses and norm:
+        needle = query.strip().lower()
+        substring = or_(
+            Course.code_normalized.contains(norm, autoescape=True),
+            Course.search_text.contains(needle, autoescape=True),
+        )
+        if _has_trigram(session):
+            similarity = func.word_similarity(needle, Course.search_text)
+            courses = (
+                q.filter(or_(substring, Course.search_text.op("%>")(needle)))
+                .order_by(substring.desc(), similarity.desc(), Course.code)
+                .limit(SEARCH_LIMIT)
+                .all()
+            )
+        else:
+            courses = q.filter(substring).order_by(Course.code).limit(SEARCH_LIMIT).all()
+
+    return [
+        {"id": c.id, "code": c.code, "title": c.title, "department": c.department,
+         "department_id": c.department_id}
+        for c in courses
+    ]
+
+
+def _professor_rows(session: Session, course_id: int, min_year: int | None):
+    """Query of (Professor, grade stats..., RmpRating, ProfessorRatingRollup, GauchoScore) for one course.
 
+    Grade stats come from the professor_course_stats materialized view, so they
+    reflect the pipeline's last refresh; the latest RMP rating, its average
+    comment sentiment and keywords come from each professor's rating rollup.
+    """
+    stats = (
+        course_stats_query(session, min_year)
+        .filter(professor_course_stats.c.course_id == course_id)
+        .subquery()
+    )
+    query = (
+        session.query(
+            Professor, stats.c.mean_gpa, stats.c.std_gpa, stats.c.quarters_taught, stats.c.latest_term,
+            RmpRating, ProfessorRatingRollup, GauchoScore,
+        )
+        .join(stats, stats.c.professor_id == Professor.id)
+        .outerjoin(ProfessorRatingRollup, ProfessorRatingRollup.professor_id == Professor.id)
+        .outerjoin(RmpRating, RmpRating.id == ProfessorRatingRollup.latest_rating_id)
+        .outerjoin(GauchoScore, and_(
+            GauchoScore.professor_id == Professor.id, GauchoScore.course_id == course_id,
+        ))
+    )
+    return query, stats
 
-def search_courses(session: Session, query: str, department: str | None = None) -> list[dict]:
-    """Search courses by code prefix, optionally filtered by department."""
-    q = session.query(Course).filter(Course.code.ilike(f"%{query}%"))
-    if department:
-        q = q.filter(Course.department == department)
-    courses = q.order_by(Course.code).limit(20).all()
-    return [{"id": c.id, "code": c.code, "title": c.title, "department": c.department} for c in courses]
+
+def _professor_dict(prof, mean_gpa, std_gpa, quarters_taught, latest_term, rmp, rollup, stored) -> dict:
+    avg_sentiment = rollup.avg_sentiment if rmp else None
+    keywords = rollup.keywords if rmp and isinstance(rollup.keywords, list) else []
+    return {
+        "id": prof.id,
+        "name": prof.name_rmp or prof.name_nexus or "Unknown",
+        "department": prof.department,
+        "mean_gpa": round(float(mean_gpa), 2) if mean_gpa else None,
+        "std_gpa": round(float(std_gpa), 2) if std_gpa else None,
+        "quarters_taught": int(quarters_taught),
+        "latest_term": latest_term,
+        "rmp_quality": rmp.overall_quality if rmp else None,
+        "rmp_difficulty": rmp.difficulty if rmp else None,
+        "rmp_would_take_again": rmp.would_take_again_pct if rmp else None,
+        "rmp_num_ratings": rmp.num_ratings if rmp else None,
+        "avg_sentiment": round(avg_sentiment, 2) if avg_sentiment else None,
+        "keywords": list(dict.fromkeys(keywords))[:8],
+        "match_confidence": prof.match_confidence,
+        # Bootstrap interval of the pipeline's stored score, at its weights
+        "score_low": stored.score_low if stored else None,
+        "score_high": stored.score_high if stored else None,
+    }
 
 
 def get_professors_for_course(session: Session, course_id: int, min_year: int | None = None) -> list[dict]:
     """Get all professors who have taught a course, with their stats."""
+    query, _ = _professor_rows(session, course_id, min_year)
+    return [_professor_dict(*row) for row in query.all()]
+
+
+def _score_column(weights: dict[str, float], mean_gpa):
+    """Gaucho score (0-100, unrounded) as SQL, from the rating rollup's stored factors.
+
+    The GPA factor depends on the course and year filter, so it is derived from
+    mean_gpa (the grade stats column) here; the rating factors are stored,
+    0.5 for professors without a rollup, as in etl.scoring.
+    """
+    gpa_f = case((mean_gpa != 0, func.greatest(0.0, func.least(1.0, mean_gpa / 4.0))), else_=0.5)
+    raw = (
+        gpa_f * weights.get("gpa", 0.25)
+        + func.coalesce(ProfessorRatingRollup.quality_factor, 0.5) * weights.get("quality", 0.25)
+        + func.coalesce(ProfessorRatingRollup.difficulty_factor, 0.5) * weights.get("difficulty", 0.25)
+        + func.coalesce(ProfessorRatingRollup.sentiment_factor, 0.5) * weights.get("sentiment", 0.25)
+    )
+    return func.greatest(0.0, func.least(100.0, raw * 100))
+
+
+def rank_professors(
+    session: Session,
+    course_id: int,
+    weights: dict[str, float] | None = None,
+    k: int = 10,
+    min_year: int | None = None,
+) -> list[dict]:
+    """Top k professors of a course by Gaucho score, scored and cut in Postgres.
+
+    Only k compact rows leave the database whatever the course size. Ties are
+    broken by professor id, matching get_professor_ranking_page.
+    """
+    if weights is None:
+        weights = {"gpa": 0.25, "quality": 0.25, "difficulty": 0.25, "sentiment": 0.25}
+    stats = (
+        course_stats_query(session, min_year)
+        .filter(professor_course_stats.c.course_id == course_id)
+        .subquery()
+    )
+    score = _score_column(weights, stats.c.mean_gpa)
+    rows = session.execute(
+        select(
+            Professor.id, Professor.name_rmp, Professor.name_nexus,
+            stats.c.mean_gpa, stats.c.quarters_taught, score.label("score"),
+        )
+        .join(stats, stats.c.professor_id == Professor.id)
+        .outerjoin(ProfessorRatingRollup, ProfessorRatingRollup.professor_id == Professor.id)
+        .order_by(score.desc(), Professor.id)
+        .limit(k)
+    ).all()
+    return [
+        {
+            "rank": i,
+            "id": r.id,
+            "name": r.name_rmp or r.name_nexus or "Unknown",
+            "gaucho_score": round(r.score, 2),
+            "mean_gpa": round(float(r.mean_gpa), 2) if r.mean_gpa else None,
+            "quarters_taught": int(r.quarters_taught),
+        }
+        for i, r in enumerate(rows, 1)
+    ]
+
+
+def get_professor_ranking_page(
+    session: Session,
+    course_id: int,
+    weights: dict[str, float],
+    min_year: int | None = None,
+    cursor: tuple[float, int] | None = None,
+    page_size: int = RANKING_PAGE_SIZE,
+) -> dict:
+    """One page of a course's professors ranked by Gaucho score under the given weights.
+
+    Scores are computed in Postgres and pages are keyset-paginated on
+    (score desc, professor id), so a page never repeats or skips a professor
+    however deep it is. Pass the previous page's next_cursor to continue;
+    next_cursor is None on the last page. Returns
+    {"professors": [...], "next_cursor": [score, id] | None, "remaining": int},
+    with professors shaped like get_professors_for_course plus "gaucho_score".
+    """
+    query, stats = _professor_rows(session, course_id, min_year)
+    score = _score_column(weights, stats.c.mean_gpa)
+    query = query.add_columns(score.label("score"), func.count().over().label("total"))
+    if cursor is not None:
+        after_score, after_id = cursor
+        query = query.filter(or_(score < after_score, and_(score == after_score, Professor.id > after_id)))
+    rows = query.order_by(score.desc(), Professor.id).limit(page_size + 1).all()
+
+    page = rows[:page_size]
+    professors = []
+    for *row, row_score, _ in page:
+        prof = _professor_dict(*row)
+        prof["gaucho_score"] = round(row_score, 2)
+        professors.append(prof)
+    more = len(rows) > page_size
+    return {
+        "professors": professors,
+        "next_cursor": [page[-1].score, page[-1][0].id] if more else None,
+        "remaining": page[0].total - len(page) if page else 0,
+    }
+
+
+def _history_row(g: GradeDistribution) -> dict:
+    return {
+        "quarter": f"{g.quarter} {g.year}",
+        "avg_gpa": g.avg_gpa,
+        "a_plus": g.a_plus, "a": g.a, "a_minus": g.a_minus,
+        "b_plus": g.b_plus, "b": g.b, "b_minus": g.b_minus,
+        "c_plus": g.c_plus, "c": g.c, "c_minus": g.c_minus,
+        "d_plus": g.d_plus, "d": g.d, "d_minus": g.d_minus,
+        "f": g.f,
+    }
+
+
+def get_grade_history(
+    session: Session, professor_id: int, course_id: int, last_n_terms: int | None = None,
+) -> list[dict]:
+    """Get quarter-by-quarter grade history for a professor+course, oldest term first.
+
+    With last_n_terms, only the most recent terms taught: a backward scan of
+    the (professor, course, term) index that stops after N rows.
+    """
+    q = session.query(GradeDistribution).filter_by(professor_id=professor_id, course_id=course_id)
+    if last_n_terms is None:
+        return [_history_row(g) for g in q.order_by(GradeDistribution.term_ordinal)]
+    grades = q.order_by(GradeDistribution.term_ordinal.desc()).limit(last_n_terms).all()
+    return [_history_row(g) for g in reversed(grades)]
+
+
+def get_course_grade_history(
+    session: Session, course_id: int, min_year: int | None = None,
+) -> dict[int, list[dict]]:
+    """Grade history for every instructor of a course in one query, keyed by professor id."""
+    q = session.query(GradeDistribution).filter_by(course_id=course_id)
+    if min_year is not None:
+        q = q.filter(GradeDistribution.year >= min_year)
+    grades = q.order_by(GradeDistribution.professor_id, GradeDistribution.term_ordinal).all()
+    history: dict[int, list[dict]] = {}
+    for g in grades:
+        history.setdefault(g.professor_id, []).append(_history_row(g))
+    return history
+
+
+def get_course_grade_trends(
+    session: Session, course_id: int, min_year: int | None = None, last_n_terms: int = TREND_TERMS,
+) -> dict[int, float]:
+    """GPA change per year over each instructor's last N graded terms, keyed by professor id.
+
+    The least-squares slope of quarter GPA on term ordinal, fitted in Postgres
+    (regr_slope) and scaled to a year of four terms. Instructors with fewer
+    than two graded terms have no trend and are left out.
+    """
+    g = GradeDistribution
+    recent = (
+        select(
+            g.professor_id, g.avg_gpa, g.term_ordinal,
+            func.row_number().over(partition_by=g.professor_id, order_by=g.term_ordinal.desc()).label("rn"),
+        )
+        .where(g.course_id == course_id, g.avg_gpa.isnot(None))
+    )
+    if min_year is not None:
+        recent = recent.where(g.year >= min_year)
+    recent = recent.subquery("recent")
+    rows = session.execute(
+        select(recent.c.professor_id, func.regr_slope(recent.c.avg_gpa, recent.c.term_ordinal))
+        .where(recent.c.rn <= last_n_terms)
+        .group_by(recent.c.professor_id)
+    )
+    return {prof_id: round(slope * 4, 3) for prof_id, slope in rows if slope is not None}
+
+
+def _histogram_query(session: Session, course_id: int, min_year: int | None):
+    """SUM each grade bucket, total students and the enrollment-weighted mean GPA per professor."""
+    row_students = GradeDistribution.total_students
+    graded_students = func.sum(row_students).filter(GradeDistribution.avg_gpa.isnot(None))
     q = (
         session.query(
-            Professor,
-            func.avg(GradeDistribution.avg_gpa).label("mean_gpa"),
-            func.stddev(GradeDistribution.avg_gpa).label("std_gpa"),
-            func.count(GradeDistribution.id).label("quarters_taught"),
+            GradeDistribution.professor_id,
+            *[func.sum(getattr(GradeDistribution, k)) for k in GRADE_KEYS],
+            func.sum(row_students),
+            func.sum(GradeDistribution.avg_gpa * row_students) / func.nullif(graded_students, 0),
         )
-        .join(GradeDistribution, GradeDistribution.professor_id == Professor.id)
         .filter(GradeDistribution.course_id == course_id)
+        .group_by(GradeDistribution.professor_id)
     )
     if min_year is not None:
         q = q.filter(GradeDistribution.year >= min_year)
-    results = q.group_by(Professor.id).all()
+    return q
 
-    professors = []
-    for prof, mean_gpa, std_gpa, quarters_taught in results:
-        # Get latest RMP rating
-        rmp = (
-            session.query(RmpRating)
-            .filter_by(professor_id=prof.id)
-            .order_by(RmpRating.fetched_at.desc())
-            .first()
-        )
 
-        # Get sentiment stats
-        avg_sentiment = None
-        keywords = []
-        if rmp:
-            sentiment_result = (
-                session.query(func.avg(RmpComment.sentiment_score))
-                .filter(RmpComment.rmp_rating_id == rmp.id)
-                .scalar()
-            )
-            avg_sentiment = float(sentiment_result) if sentiment_result else None
+def _histogram(row) -> dict:
+    weighted_gpa = row[-1]
+    return {
+        "counts": [int(n) for n in row[1:-2]],
+        "students": int(row[-2]),
+        "weighted_gpa": round(float(weighted_gpa), 3) if weighted_gpa is not None else None,
+    }
 
-            keyword_rows = (
-                session.query(RmpComment.keywords)
-                .filter(RmpComment.rmp_rating_id == rmp.id, RmpComment.keywords.isnot(None))
-                .all()
-            )
-            for (kw,) in keyword_rows:
-                if isinstance(kw, list):
-                    keywords.extend(kw)
-
-        professors.append({
-            "id": prof.id,
-            "name": prof.name_rmp or prof.name_nexus or "Unknown",
-            "department": prof.department,
-            "mean_gpa": round(float(mean_gpa), 2) if mean_gpa else None,
-            "std_gpa": round(float(std_gpa), 2) if std_gpa else None,
-            "quarters_taught": quarters_taught,
-            "rmp_quality": rmp.overall_quality if rmp else None,
-            "rmp_difficulty": rmp.difficulty if rmp else None,
-            "rmp_would_take_again": rmp.would_take_again_pct if rmp else None,
-            "rmp_num_ratings": rmp.num_ratings if rmp else None,
-            "avg_sentiment": round(avg_sentiment, 2) if avg_sentiment else None,
-            "keywords": list(set(keywords))[:8],
-            "match_confidence": prof.match_confidence,
-        })
-
-    return professors
-
-
-def get_grade_history(session: Session, professor_id: int, course_id: int) -> list[dict]:
-    """Get quarter-by-quarter grade history for a professor+course."""
-    grades = (
-        session.query(GradeDistribution)
-        .filter_by(professor_id=professor_id, course_id=course_id)
-        .order_by(GradeDistribution.year, GradeDistribution.quarter)
-        .all()
+
+def get_grade_histogram(
+    session: Session, professor_id: int, course_id: int, min_year: int | None = None,
+) -> dict:
+    """Aggregated grade histogram for a professor+course, summed in Postgres.
+
+    Returns {"counts": [13 bucket totals in GRADE_KEYS order], "students": total,
+    "weighted_gpa": mean GPA weighted by each quarter's enrollment}.
+    """
+    row = (
+        _histogram_query(session, course_id, min_year)
+        .filter(GradeDistribution.professor_id == professor_id)
+        .first()
     )
-    return [
-        {
-            "quarter": f"{g.quarter} {g.year}",
-            "avg_gpa": g.avg_gpa,
-            "a_plus": g.a_plus, "a": g.a, "a_minus": g.a_minus,
-            "b_plus": g.b_plus, "b": g.b, "b_minus": g.b_minus,
-            "c_plus": g.c_plus, "c": g.c, "c_minus": g.c_minus,
-            "d_plus": g.d_plus, "d": g.d, "d_minus": g.d_minus,
-            "f": g.f,
-        }
-        for g in grades
-    ]
+    if row is None:
+        return {"counts": [0] * len(GRADE_KEYS), "students": 0, "weighted_gpa": None}
+    return _histogram(row)
+
+
+def get_course_grade_histograms(
+    session: Session, course_id: int, min_year: int | None = None,
+) -> dict[int, dict]:
+    """get_grade_histogram for every professor of a course in one query, keyed by professor id."""
+    return {row[0]: _histogram(row) for row in _histogram_query(session, course_id, min_year)}
+
+
+def _comment_row(c: RmpComment) -> dict:
+    if c.created_at:
+        formatted_date = f"{MONTH_NAMES[c.created_at.month]} {c.created_at.year}"
+    else:
+        formatted_date = None
+    return {
+        "text": c.comment_text,
+        "sentiment_score": c.sentiment_score,
+        "keywords": c.keywords,
+        "created_at": formatted_date,
+    }
 
 
 def get_comments_for_professor(session: Session, professor_id: int, limit: int = 5) -> list[dict]:
@@ -120,16 +397,37 @@ def get_comments_for_professor(session: Session, professor_id: int, limit: int =
         .limit(limit)
         .all()
     )
-    results = []
-    for c in comments:
-        if c.created_at:
-            formatted_date = f"{MONTH_NAMES[c.created_at.month]} {c.created_at.year}"
-        else:
-            formatted_date = None
-        results.append({
-            "text": c.comment_text,
-            "sentiment_score": c.sentiment_score,
-            "keywords": c.keywords,
-            "created_at": formatted_date,
-        })
-    return results
+    return [_comment_row(c) for c in comments]
+
+
+def get_course_comments(session: Session, course_id: int, limit: int = 5) -> dict[int, list[dict]]:
+    """Most recent RMP comments for every instructor of a course in one query.
+
+    row_number() over each professor's comments applies the per-professor
+    limit in SQL, so only the rows shown are fetched. Keyed by professor id.
+    """
+    ranked = (
+        select(
+            RmpComment,
+            RmpRating.professor_id.label("professor_id"),
+            func.row_number().over(
+                partition_by=RmpRating.professor_id,
+                order_by=RmpComment.created_at.desc().nullslast(),
+            ).label("rn"),
+        )
+        .join(RmpRating, RmpComment.rmp_rating_id == RmpRating.id)
+        .where(RmpRating.professor_id.in_(
+            select(GradeDistribution.professor_id).where(GradeDistribution.course_id == course_id)
+        ))
+        .subquery()
+    )
+    comment = aliased(RmpComment, ranked)
+    rows = session.execute(
+        select(comment, ranked.c.professor_id)
+        .where(ranked.c.rn <= limit)
+        .order_by(ranked.c.professor_id, ranked.c.rn)
+    ).all()
+    comments: dict[int, list[dict]] = {}
+    for c, professor_id in rows:
+        comments.setdefault(professor_id, []).append(_comment_row(c))
+    return comments
@@ -0,0 +1,309 @@
+"""Pluggable result cache for dashboard queries, shareable across replicas.
+
+st.cache_data is per process, so every dashboard container warms its own copy
+and queries Postgres separately. ResultCache stores query results in a
+backend chosen by DASHBOARD_CACHE_URL:
+
+    memory://?max_entries=4096       in-process LRU (the default)
+    sqlite:////shared/cache.db       one SQLite file on a volume all replicas mount
+    redis://host:6379/0              any server speaking the Redis protocol
+
+Keys are built from the function name, the data version and the arguments, so
+a pipeline run that bumps the version makes every replica miss at once. Values
+are compact JSON, zlib-compressed when large; every backend stores bytes, so a
+hit always returns a fresh copy the caller may mutate. A backend that fails
+(shared volume gone, Redis down) degrades to a miss rather than an error.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Entries written for superseded data versions expire from shared stores after this
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+# Payloads at least this large are zlib-compressed
+_COMPRESS_MIN_BYTES = 512
+_RAW, _ZLIB = b"j", b"z"
+
+
+def dumps(value) -> bytes:
+    """Serialize a JSON-compatible value; large payloads are compressed."""
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    if len(raw) >= _COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(raw)
+    return _RAW + raw
+
+
+def loads(data: bytes):
+    body = data[1:]
+    if data[:1] == _ZLIB:
+        body = zlib.decompress(body)
+    return json.loads(body)
+
+
+def cache_key(name: str, data_version: int, arguments: dict) -> str:
+    """Key for one call: function name, data version and a digest of the arguments by parameter name."""
+    payload = json.dumps(arguments, separators=(",", ":"), sort_keys=True, default=str)
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+    return f"gco:{name}:v{data_version}:{digest}"
+
+
+class LRUBackend:
+    """In-process LRU bounded by entry count."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class SQLiteBackend:
+    """Key/value table in one SQLite file, safe to share between processes."""
+
+    def __init__(self, path: str, ttl: int = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            # set() purges expired entries on every write
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_results_expires_at ON results (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared across threads; Streamlit runs sessions on several
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        row = self._conn().execute(
+            "SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + self.ttl),
+            )
+            conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+
+
+class RedisBackend:
+    """GET/SET over the Redis serialization protocol (RESP), with no client library.
+
+    Works against Redis, Valkey, KeyDB or anything else speaking RESP. One
+    connection per thread, reopened after a failure.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0,
+                 ttl: int = DEFAULT_TTL_SECONDS, timeout: float = 1.0):
+        self.host, self.port, self.db = host, port, db
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _file(self):
+        f = getattr(self._local, "file", None)
+        if f is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            f = sock.makefile("rwb")
+            self._local.sock, self._local.file = sock, f
+            if self.db:
+                self._command(b"SELECT", str(self.db).encode())
+        return f
+
+    def _command(self, *parts: bytes):
+        f = self._file()
+        try:
+            f.write(b"*%d\r\n" % len(parts))
+            for part in parts:
+                f.write(b"$%d\r\n%s\r\n" % (len(part), part))
+            f.flush()
+            return self._reply(f)
+        except OSError:
+            self._close()
+            raise
+        except ValueError as e:
+            # A malformed length; the stream is out of step with the server
+            self._close()
+            raise ConnectionError(f"malformed reply from cache server: {e}") from e
+
+    def _close(self) -> None:
+        f, sock = getattr(self._local, "file", None), getattr(self._local, "sock", None)
+        self._local.file = self._local.sock = None
+        for handle in (f, sock):
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+
+    def _reply(self, f):
+        line = f.readline()
+        if not line:
+            raise ConnectionError("connection closed by cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise ConnectionError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            n = int(body)
+            if n < 0:
+                return None
+            data = f.read(n + 2)
+            return data[:-2]
+        raise ConnectionError(f"unexpected reply {line!r}")
+
+    def get(self, key: str) -> bytes | None:
+        return self._command(b"GET", key.encode())
+
+    def set(self, key: str, value: bytes) -> None:
+        self._command(b"SET", key.encode(), value, b"EX", str(self.ttl).encode())
+
+
+def backend_from_url(url: str | None):
+    """Build a backend from a DASHBOARD_CACHE_URL value (memory:// when unset)."""
+    parsed = urlparse(url or "memory://")
+    params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+    ttl = int(params.get("ttl", DEFAULT_TTL_SECONDS))
+    if parsed.scheme == "memory":
+        return LRUBackend(int(params.get("max_entries", 4096)))
+    if parsed.scheme == "sqlite":
+        return SQLiteBackend(parsed.path, ttl=ttl)
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisBackend(parsed.hostname or "localhost", parsed.port or 6379, db, ttl=ttl)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+class CacheStats:
+    """Hit/miss/error counts and time spent in the backend vs computing misses.
+
+    Streamlit serves sessions from several threads, so every update goes
+    through record() under a lock and as_dict() reads a consistent snapshot.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.lookup_seconds = 0.0
+        self.compute_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, **deltas) -> None:
+        """Add each delta to the counter of the same name."""
+        with self._lock:
+            for field, delta in deltas.items():
+                setattr(self, field, getattr(self, field) + delta)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+            lookup_seconds, compute_seconds = self.lookup_seconds, self.compute_seconds
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "avg_lookup_ms": round(lookup_seconds * 1000 / lookups, 3) if lookups else None,
+            "avg_compute_ms": round(compute_seconds * 1000 / misses, 3) if misses else None,
+        }
+
+
+class ResultCache:
+    """Memoizes dashboard loaders in a backend, keyed by data version and arguments."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._stats: dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, dict]:
+        """Counters per cached function."""
+        with self._lock:
+            return {name: s.as_dict() for name, s in self._stats.items()}
+
+    def cached(self, fn):
+        """Decorate fn(data_version, *args, **kwargs); its result must be JSON-compatible."""
+        name = fn.__qualname__
+        signature = inspect.signature(fn)
+        version_param = next(iter(signature.parameters))
+        with self._lock:
+            stats = self._stats.setdefault(name, CacheStats())
+
+        @functools.wraps(fn)
+        def wrapper(data_version: int, *args, **kwargs):
+            # Positional, keyword and defaulted spellings of a call share a key
+            bound = signature.bind(data_version, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k != version_param}
+            key = cache_key(name, data_version, arguments)
+            start = time.perf_counter()
+            try:
+                data = self.backend.get(key)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Cache lookup failed for {name}: {e}")
+                stats.record(errors=1)
+                data = None
+            lookup_seconds = time.perf_counter() - start
+            if data is not None:
+                stats.record(hits=1, lookup_seconds=lookup_seconds)
+                return loads(data)
+
+            start = time.perf_counter()
+            value = fn(data_version, *args, **kwargs)
+            stats.record(misses=1, lookup_seconds=lookup_seconds, compute_seconds=time.perf_counter() - start)
+            data = dumps(value)
+            try:
+                self.backend.set(key, data)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Cache store failed for {name}: {e}")
+                stats.record(errors=1)
+            return loads(data)
+
+        return wrapper
+
+
+def result_cache_from_env() -> ResultCache:
+    return ResultCache(backend_from_url(os.environ.get("DASHBOARD_CACHE_URL")))
@@ -0,0 +1,20 @@
+"""Normalized keys for course search.
+
+Course codes are matched on an uppercase, alphanumeric-only form, so "cmpsc 8",
+"CMPSC8" and "CMPSC-8" all look the same to a prefix lookup. The search text
+adds the lowercased title for trigram similarity ranking.
+"""
+
+import re
+
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+
+
+def normalize_course_code(code: str | None) -> str:
+    """Uppercase a course code (or query) and drop everything but letters and digits."""
+    return _NON_ALNUM.sub("", (code or "").upper())
+
+
+def course_search_text(code: str | None, title: str | None) -> str:
+    """Text the trigram index covers: normalized code plus lowercased title."""
+    return f"{normalize_course_code(code)} {(title or '').strip().lower()}".strip()
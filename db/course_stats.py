@@ -0,0 +1,45 @@
+"""Reading and refreshing the professor_course_stats materialized view (defined in db.models)."""
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.orm import Session
+
+from db.models import professor_course_stats
+
+
+def refresh_professor_course_stats(session: Session) -> None:
+    """Recompute the view in the caller's transaction.
+
+    CONCURRENTLY keeps the old contents readable while the refresh runs, so the
+    dashboard never waits on the pipeline. Pending ORM changes are flushed
+    first so the refresh sees them.
+    """
+    session.flush()
+    session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY professor_course_stats"))
+
+
+def course_stats_query(session: Session, min_year: int | None = None):
+    """Per (professor, course) grade stats, combined from professor_course_stats year buckets.
+
+    Columns: professor_id, course_id, mean_gpa, std_gpa (sample stddev of the
+    quarter GPAs), quarters_taught, total_students, weighted_gpa, latest_term.
+    """
+    s = professor_course_stats.c
+    n = func.sum(s.gpa_count)
+    variance = (func.sum(s.gpa_sq_sum) - func.pow(func.sum(s.gpa_sum), 2) / func.nullif(n, 0)) / func.nullif(n - 1, 0)
+    q = (
+        session.query(
+            s.professor_id,
+            s.course_id,
+            (func.sum(s.gpa_sum) / func.nullif(n, 0)).label("mean_gpa"),
+            func.sqrt(func.greatest(variance, 0)).label("std_gpa"),
+            func.sum(s.quarters_taught).label("quarters_taught"),
+            func.sum(s.total_students).label("total_students"),
+            (func.sum(s.weighted_gpa_sum) / func.nullif(func.sum(s.graded_students), 0)).label("weighted_gpa"),
+            array_agg(aggregate_order_by(s.latest_term, s.year.desc()))[1].label("latest_term"),
+        )
+        .group_by(s.professor_id, s.course_id)
+    )
+    if min_year is not None:
+        q = q.filter(s.year >= min_year)
+    return q
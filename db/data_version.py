@@ -0,0 +1,27 @@
+"""The pipeline's data version: a single counter row readers use to invalidate caches."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db.models import DataVersion
+
+_ROW_ID = 1
+
+
+def current_data_version(session: Session) -> int:
+    """The current data version, 0 before the pipeline has written anything."""
+    return session.scalar(select(DataVersion.version).where(DataVersion.id == _ROW_ID)) or 0
+
+
+def bump_data_version(session: Session) -> int:
+    """Increment the data version in the caller's transaction and return the new value."""
+    now = datetime.now(timezone.utc)
+    stmt = insert(DataVersion).values(id=_ROW_ID, version=1, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.id],
+        set_={"version": DataVersion.version + 1, "updated_at": now},
+    ).returning(DataVersion.version)
+    return session.execute(stmt).scalar_one()
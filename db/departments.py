@@ -0,0 +1,158 @@
+"""Canonical departments: Nexus department codes and RMP department names resolved to one key.
+
+Pure data and functions with no database or ETL dependencies; the models
+resolve department_id with canonical_department, and etl.department_mapper
+matches departments with the same map.
+"""
+
+from functools import lru_cache
+
+from thefuzz import fuzz
+
+# Nexus dept code -> RMP department name(s)
+# Built from UCSB's department list and common RMP naming
+DEPT_MAP: dict[str, list[str]] = {
+    "ANTH": ["Anthropology"],
+    "ART": ["Art", "Art Studio"],
+    "ARTHI": ["Art History", "History Of Art And Architecture"],
+    "ARTST": ["Art Studio"],
+    "ASTRO": ["Astronomy", "Physics"],
+    "BIOE": ["Bioengineering"],
+    "BIOL": ["Biology", "Biological Sciences"],
+    "BMSE": ["Biomolecular Science And Engineering"],
+    "BL ST": ["Black Studies"],
+    "CH E": ["Chemical Engineering"],
+    "CHEM": ["Chemistry", "Chemistry And Biochemistry"],
+    "CHIN": ["Chinese"],
+    "CLASS": ["Classics"],
+    "COMM": ["Communication"],
+    "CMPSC": ["Computer Science"],
+    "CMPTG": ["Computing"],
+    "CNCSP": ["Counseling, Clinical & School Psychology"],
+    "DANCE": ["Dance"],
+    "DYNS": ["Dynamical Neuroscience"],
+    "EARTH": ["Earth Science"],
+    "EACS": ["East Asian Cultural Studies"],
+    "ECON": ["Economics"],
+    "ED": ["Education"],
+    "ECE": ["Electrical And Computer Engineering", "Electrical Engineering"],
+    "ENGL": ["English"],
+    "ENGR": ["Engineering"],
+    "ENV S": ["Environmental Studies"],
+    "ESM": ["Environmental Science And Management"],
+    "ES": ["Ethnic Studies"],
+    "FAMST": ["Film And Media Studies"],
+    "FEMST": ["Feminist Studies"],
+    "FR": ["French", "French And Italian"],
+    "GEOG": ["Geography"],
+    "GER": ["German", "Germanic And Slavic Studies"],
+    "GPS": ["Global Studies", "Global & International Studies"],
+    "GREEK": ["Classics"],
+    "HIST": ["History"],
+    "INT": ["Interdisciplinary"],
+    "ITAL": ["Italian", "French And Italian"],
+    "JAPAN": ["Japanese"],
+    "KOR": ["Korean"],
+    "LATIN": ["Classics"],
+    "LAIS": ["Latin American And Iberian Studies"],
+    "LING": ["Linguistics"],
+    "LIT": ["Comparative Literature", "Literature"],
+    "MARSC": ["Marine Science"],
+    "MATRL": ["Materials"],
+    "MATH": ["Mathematics"],
+    "ME": ["Mechanical Engineering"],
+    "MAT": ["Media Arts And Technology"],
+    "MCDB": ["Molecular, Cellular & Developmental Biology", "Biology"],
+    "MUS": ["Music"],
+    "PHIL": ["Philosophy"],
+    "PHYS": ["Physics"],
+    "POL S": ["Political Science"],
+    "PORT": ["Portuguese"],
+    "PSTAT": ["Statistics And Applied Probability", "Statistics"],
+    "PSY": ["Psychology", "Psychological & Brain Sciences"],
+    "RG ST": ["Religious Studies"],
+    "RENST": ["Renaissance Studies"],
+    "SLAV": ["Slavic Languages And Literature", "Germanic And Slavic Studies"],
+    "SOC": ["Sociology"],
+    "SPAN": ["Spanish", "Spanish And Portuguese"],
+    "SHS": ["Society And Health Sciences"],
+    "TMP": ["Technology Management"],
+    "THTR": ["Theater", "Theater And Dance"],
+    "WRIT": ["Writing"],
+    "W&L": ["Writing And Literature"],
+}
+
+# Build reverse map: lowercase RMP name -> list of Nexus codes
+REVERSE_MAP: dict[str, list[str]] = {}
+for code, rmp_names in DEPT_MAP.items():
+    for rmp_name in rmp_names:
+        key = rmp_name.lower()
+        if key not in REVERSE_MAP:
+            REVERSE_MAP[key] = []
+        REVERSE_MAP[key].append(code)
+
+
+def _build_canonical() -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
+    """Group codes that share an RMP name into canonical departments.
+
+    Returns (code -> key, lowercase RMP name -> key, key -> display name). A key
+    joins the group's codes ("ASTRO+PHYS"); its display name is the RMP name
+    shared by the most codes in the group.
+    """
+    parent = {code: code for code in DEPT_MAP}
+
+    def find(code: str) -> str:
+        while parent[code] != code:
+            parent[code] = parent[parent[code]]
+            code = parent[code]
+        return code
+
+    for codes in REVERSE_MAP.values():
+        for other in codes[1:]:
+            parent[find(other)] = find(codes[0])
+
+    groups: dict[str, list[str]] = {}
+    for code in DEPT_MAP:
+        groups.setdefault(find(code), []).append(code)
+
+    code_to_key: dict[str, str] = {}
+    name_to_key: dict[str, str] = {}
+    key_names: dict[str, str] = {}
+    for codes in groups.values():
+        key = "+".join(sorted(codes))
+        names = [name for code in codes for name in DEPT_MAP[code]]
+        key_names[key] = max(dict.fromkeys(names), key=names.count)
+        for code in codes:
+            code_to_key[code] = key
+        for name in names:
+            name_to_key[name.lower()] = key
+    return code_to_key, name_to_key, key_names
+
+
+_CODE_TO_KEY, _NAME_TO_KEY, CANONICAL_NAMES = _build_canonical()
+
+
+@lru_cache(maxsize=4096)
+def canonical_department(dept: str | None) -> str | None:
+    """Resolve a Nexus code or RMP department name to its canonical department key.
+
+    Known codes and RMP names resolve through DEPT_MAP; other names fall back to
+    the best fuzzy match among known RMP names (threshold 80). Anything still
+    unresolved keeps its own uppercased string as the key.
+    """
+    if not dept or not dept.strip():
+        return None
+
+    upper = dept.strip().upper()
+    lower = dept.strip().lower()
+    if upper in _CODE_TO_KEY:
+        return _CODE_TO_KEY[upper]
+    if lower in _NAME_TO_KEY:
+        return _NAME_TO_KEY[lower]
+
+    best_key, best_score = None, 0
+    for name, key in _NAME_TO_KEY.items():
+        score = fuzz.ratio(name, lower)
+        if score >= 80 and score > best_score:
+            best_key, best_score = key, score
+    return best_key or upper
@@ -0,0 +1,55 @@
+"""add rating factors and course stats index
+
+Revision ID: 25c2bd69c380
+Revises: 84c13210b131
+Create Date: 2026-10-19 01:19:45.819839
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '25c2bd69c380'
+down_revision: Union[str, Sequence[str], None] = '84c13210b131'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same factors db.rating_rollup.refresh_rating_rollups writes
+BACKFILL_SQL = """
+UPDATE professor_rating_rollups p SET
+    quality_factor = CASE
+        WHEN r.num_ratings <> 0 AND r.overall_quality <> 0 THEN greatest(0.0, least(1.0,
+            (r.num_ratings * r.overall_quality + 5 * 3.0) / (r.num_ratings + 5) / 5.0))
+        WHEN r.overall_quality <> 0 THEN greatest(0.0, least(1.0, r.overall_quality / 5.0))
+        ELSE 0.5 END,
+    difficulty_factor = CASE
+        WHEN r.difficulty <> 0 THEN greatest(0.0, least(1.0, (5.0 - r.difficulty) / 5.0))
+        ELSE 0.5 END,
+    sentiment_factor = coalesce((p.avg_sentiment + 1) / 2, 0.5)
+FROM rmp_ratings r
+WHERE r.id = p.latest_rating_id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in ("quality_factor", "difficulty_factor", "sentiment_factor"):
+        op.add_column(
+            'professor_rating_rollups',
+            sa.Column(column, sa.Float(), nullable=False, server_default="0.5"),
+        )
+        op.alter_column('professor_rating_rollups', column, server_default=None)
+    op.execute(BACKFILL_SQL)
+    op.execute("CREATE INDEX ix_professor_course_stats_course ON professor_course_stats (course_id, year)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX ix_professor_course_stats_course")
+    op.drop_column('professor_rating_rollups', 'sentiment_factor')
+    op.drop_column('professor_rating_rollups', 'difficulty_factor')
+    op.drop_column('professor_rating_rollups', 'quality_factor')
@@ -0,0 +1,66 @@
+"""add professor course stats view
+
+Revision ID: 31639a6cc33d
+Revises: ad53aa1eade9
+Create Date: 2026-10-19 01:11:13.165363
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '31639a6cc33d'
+down_revision: Union[str, Sequence[str], None] = 'ad53aa1eade9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PROFESSOR_COURSE_STATS_SQL = """
+CREATE MATERIALIZED VIEW professor_course_stats AS
+SELECT
+    professor_id,
+    course_id,
+    year,
+    count(*) AS quarters_taught,
+    count(avg_gpa) AS gpa_count,
+    sum(avg_gpa) AS gpa_sum,
+    sum(avg_gpa * avg_gpa) AS gpa_sq_sum,
+    avg(avg_gpa) AS mean_gpa,
+    stddev(avg_gpa) AS std_gpa,
+    sum(students) AS total_students,
+    sum(students) FILTER (WHERE avg_gpa IS NOT NULL) AS graded_students,
+    sum(avg_gpa * students) AS weighted_gpa_sum,
+    sum(avg_gpa * students) / nullif(sum(students) FILTER (WHERE avg_gpa IS NOT NULL), 0)
+        AS weighted_gpa,
+    (array_agg(quarter || ' ' || year ORDER BY CASE quarter
+        WHEN 'Winter' THEN 0 WHEN 'Spring' THEN 1 WHEN 'Summer' THEN 2 ELSE 3 END DESC))[1]
+        AS latest_term
+FROM (
+    SELECT
+        professor_id, course_id, year, quarter, avg_gpa,
+        coalesce(a_plus, 0) + coalesce(a, 0) + coalesce(a_minus, 0)
+        + coalesce(b_plus, 0) + coalesce(b, 0) + coalesce(b_minus, 0)
+        + coalesce(c_plus, 0) + coalesce(c, 0) + coalesce(c_minus, 0)
+        + coalesce(d_plus, 0) + coalesce(d, 0) + coalesce(d_minus, 0)
+        + coalesce(f, 0) AS students
+    FROM grade_distributions
+) g
+GROUP BY professor_id, course_id, year
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Created populated from existing grades; the unique index allows REFRESH ... CONCURRENTLY
+    op.execute(PROFESSOR_COURSE_STATS_SQL)
+    op.execute(
+        "CREATE UNIQUE INDEX ix_professor_course_stats_key "
+        "ON professor_course_stats (professor_id, course_id, year)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW professor_course_stats")
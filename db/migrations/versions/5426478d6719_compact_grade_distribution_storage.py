@@ -0,0 +1,196 @@
+"""compact grade distribution storage
+
+The grade counts become NOT NULL smallints: a NULL count is copied as 0.
+This is one-way; downgrade() restores nullable integer columns but cannot
+tell which zeros were NULL before the upgrade.
+
+Revision ID: 5426478d6719
+Revises: 5892f42ec4f0
+Create Date: 2026-10-19 01:38:41.785221
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5426478d6719'
+down_revision: Union[str, Sequence[str], None] = '5892f42ec4f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+GRADE_COLUMNS = (
+    "a_plus", "a", "a_minus", "b_plus", "b", "b_minus",
+    "c_plus", "c", "c_minus", "d_plus", "d", "d_minus", "f",
+)
+QUARTERS = ("Winter", "Spring", "Summer", "Fall")
+QUARTER_NAME_SQL = "(ARRAY['Winter', 'Spring', 'Summer', 'Fall'])[season + 1]"
+SEASON_SQL = "CASE quarter WHEN 'Winter' THEN 0 WHEN 'Spring' THEN 1 WHEN 'Summer' THEN 2 WHEN 'Fall' THEN 3 END"
+
+# Fixed-width columns widest first, so rows pack without alignment padding
+COMPACT_TABLE_SQL = f"""
+CREATE TABLE grade_distributions_new (
+    id integer NOT NULL DEFAULT nextval('grade_distributions_id_seq'),
+    professor_id integer NOT NULL,
+    course_id integer NOT NULL,
+    term_ordinal integer NOT NULL,
+    avg_gpa double precision,
+    total_students integer NOT NULL GENERATED ALWAYS AS (
+        a_plus::integer + {" + ".join(GRADE_COLUMNS[1:])}
+    ) STORED,
+    year smallint NOT NULL,
+    season smallint NOT NULL,
+    {", ".join(f"{c} smallint NOT NULL DEFAULT 0" for c in GRADE_COLUMNS)}
+)
+"""
+COMPACT_COPY_SQL = f"""
+INSERT INTO grade_distributions_new
+    (id, professor_id, course_id, term_ordinal, avg_gpa, year, season, {", ".join(GRADE_COLUMNS)})
+SELECT id, professor_id, course_id, term_ordinal, avg_gpa, year, {SEASON_SQL},
+    {", ".join(f"coalesce({c}, 0)" for c in GRADE_COLUMNS)}
+FROM grade_distributions
+"""
+
+WIDE_TABLE_SQL = f"""
+CREATE TABLE grade_distributions_new (
+    id integer NOT NULL DEFAULT nextval('grade_distributions_id_seq'),
+    professor_id integer NOT NULL,
+    course_id integer NOT NULL,
+    quarter text NOT NULL,
+    year integer NOT NULL,
+    {", ".join(f"{c} integer" for c in GRADE_COLUMNS)},
+    avg_gpa double precision,
+    term_ordinal integer NOT NULL
+)
+"""
+WIDE_COPY_SQL = f"""
+INSERT INTO grade_distributions_new
+    (id, professor_id, course_id, quarter, year, {", ".join(GRADE_COLUMNS)}, avg_gpa, term_ordinal)
+SELECT id, professor_id, course_id, {QUARTER_NAME_SQL}, year, {", ".join(GRADE_COLUMNS)}, avg_gpa, term_ordinal
+FROM grade_distributions
+"""
+
+COMPACT_STATS_SQL = f"""
+CREATE MATERIALIZED VIEW professor_course_stats AS
+SELECT
+    professor_id,
+    course_id,
+    year,
+    count(*) AS quarters_taught,
+    count(avg_gpa) AS gpa_count,
+    sum(avg_gpa) AS gpa_sum,
+    sum(avg_gpa * avg_gpa) AS gpa_sq_sum,
+    avg(avg_gpa) AS mean_gpa,
+    stddev(avg_gpa) AS std_gpa,
+    sum(total_students) AS total_students,
+    sum(total_students) FILTER (WHERE avg_gpa IS NOT NULL) AS graded_students,
+    sum(avg_gpa * total_students) AS weighted_gpa_sum,
+    sum(avg_gpa * total_students) / nullif(sum(total_students) FILTER (WHERE avg_gpa IS NOT NULL), 0)
+        AS weighted_gpa,
+    (array_agg({QUARTER_NAME_SQL} || ' ' || year ORDER BY season DESC))[1] AS latest_term
+FROM grade_distributions
+GROUP BY professor_id, course_id, year
+"""
+
+WIDE_STATS_SQL = """
+CREATE MATERIALIZED VIEW professor_course_stats AS
+SELECT
+    professor_id,
+    course_id,
+    year,
+    count(*) AS quarters_taught,
+    count(avg_gpa) AS gpa_count,
+    sum(avg_gpa) AS gpa_sum,
+    sum(avg_gpa * avg_gpa) AS gpa_sq_sum,
+    avg(avg_gpa) AS mean_gpa,
+    stddev(avg_gpa) AS std_gpa,
+    sum(students) AS total_students,
+    sum(students) FILTER (WHERE avg_gpa IS NOT NULL) AS graded_students,
+    sum(avg_gpa * students) AS weighted_gpa_sum,
+    sum(avg_gpa * students) / nullif(sum(students) FILTER (WHERE avg_gpa IS NOT NULL), 0)
+        AS weighted_gpa,
+    (array_agg(quarter || ' ' || year ORDER BY CASE quarter
+        WHEN 'Winter' THEN 0 WHEN 'Spring' THEN 1 WHEN 'Summer' THEN 2 ELSE 3 END DESC))[1]
+        AS latest_term
+FROM (
+    SELECT
+        professor_id, course_id, year, quarter, avg_gpa,
+        coalesce(a_plus, 0) + coalesce(a, 0) + coalesce(a_minus, 0)
+        + coalesce(b_plus, 0) + coalesce(b, 0) + coalesce(b_minus, 0)
+        + coalesce(c_plus, 0) + coalesce(c, 0) + coalesce(c_minus, 0)
+        + coalesce(d_plus, 0) + coalesce(d, 0) + coalesce(d_minus, 0)
+        + coalesce(f, 0) AS students
+    FROM grade_distributions
+) g
+GROUP BY professor_id, course_id, year
+"""
+
+LEGACY_VIEW_SQL = f"""
+CREATE VIEW legacy_grade_distributions AS
+SELECT
+    id, professor_id, course_id,
+    {QUARTER_NAME_SQL} AS quarter,
+    year::integer AS year,
+    {", ".join(f"{c}::integer AS {c}" for c in GRADE_COLUMNS)},
+    avg_gpa, term_ordinal, total_students
+FROM grade_distributions
+"""
+
+
+def _check_quarters() -> None:
+    """Refuse to convert rows whose quarter has no season, as db.terms.season_of does."""
+    bad = op.get_bind().execute(
+        sa.text("SELECT DISTINCT quarter FROM grade_distributions WHERE quarter <> ALL(:quarters)"),
+        {"quarters": list(QUARTERS)},
+    ).scalars().all()
+    if bad:
+        raise ValueError(f"Unknown quarter(s) in grade_distributions: {sorted(bad)}")
+
+
+def _rebuild_table(create_sql: str, copy_sql: str, stats_sql: str) -> None:
+    """Copy grade_distributions into a table of a new layout and swap it in, keeping ids and constraints."""
+    op.execute("DROP MATERIALIZED VIEW professor_course_stats")
+    op.execute(create_sql)
+    op.execute(copy_sql)
+    # The id sequence outlives the old table
+    op.execute("ALTER SEQUENCE grade_distributions_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE grade_distributions")
+    op.execute("ALTER TABLE grade_distributions_new RENAME TO grade_distributions")
+    op.execute("ALTER SEQUENCE grade_distributions_id_seq OWNED BY grade_distributions.id")
+    op.create_primary_key("grade_distributions_pkey", "grade_distributions", ["id"])
+    op.create_foreign_key(
+        "grade_distributions_professor_id_fkey", "grade_distributions", "professors", ["professor_id"], ["id"],
+    )
+    op.create_foreign_key(
+        "grade_distributions_course_id_fkey", "grade_distributions", "courses", ["course_id"], ["id"],
+    )
+    op.create_index(
+        "ix_grade_distributions_pair_term", "grade_distributions",
+        ["professor_id", "course_id", "term_ordinal"], unique=False,
+    )
+    op.execute(stats_sql)
+    op.execute(
+        "CREATE UNIQUE INDEX ix_professor_course_stats_key "
+        "ON professor_course_stats (professor_id, course_id, year)"
+    )
+    op.execute("CREATE INDEX ix_professor_course_stats_course ON professor_course_stats (course_id, year)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rebuilt rather than altered in place: ALTER COLUMN TYPE keeps each
+    # column's position, and with it the alignment padding
+    _check_quarters()
+    _rebuild_table(COMPACT_TABLE_SQL, COMPACT_COPY_SQL, COMPACT_STATS_SQL)
+    op.execute(LEGACY_VIEW_SQL)
+    op.execute("ANALYZE grade_distributions")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP VIEW legacy_grade_distributions")
+    _rebuild_table(WIDE_TABLE_SQL, WIDE_COPY_SQL, WIDE_STATS_SQL)
+    op.execute("ANALYZE grade_distributions")
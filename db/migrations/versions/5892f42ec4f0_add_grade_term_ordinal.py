@@ -0,0 +1,96 @@
+"""add grade term ordinal
+
+Revision ID: 5892f42ec4f0
+Revises: 72b9b3284be3
+Create Date: 2026-10-19 01:34:27.280979
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5892f42ec4f0'
+down_revision: Union[str, Sequence[str], None] = '72b9b3284be3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+QUARTERS = ("Winter", "Spring", "Summer", "Fall")
+
+# year * 4 + season, as db.terms.term_ordinal computes it for new rows
+BACKFILL_SQL = """
+UPDATE grade_distributions SET term_ordinal = year * 4 + CASE quarter
+    WHEN 'Winter' THEN 0 WHEN 'Spring' THEN 1 WHEN 'Summer' THEN 2 WHEN 'Fall' THEN 3 END
+"""
+
+# The stats view as of this revision (31639a6cc33d, indexed in 25c2bd69c380)
+PROFESSOR_COURSE_STATS_SQL = """
+CREATE MATERIALIZED VIEW professor_course_stats AS
+SELECT
+    professor_id,
+    course_id,
+    year,
+    count(*) AS quarters_taught,
+    count(avg_gpa) AS gpa_count,
+    sum(avg_gpa) AS gpa_sum,
+    sum(avg_gpa * avg_gpa) AS gpa_sq_sum,
+    avg(avg_gpa) AS mean_gpa,
+    stddev(avg_gpa) AS std_gpa,
+    sum(students) AS total_students,
+    sum(students) FILTER (WHERE avg_gpa IS NOT NULL) AS graded_students,
+    sum(avg_gpa * students) AS weighted_gpa_sum,
+    sum(avg_gpa * students) / nullif(sum(students) FILTER (WHERE avg_gpa IS NOT NULL), 0)
+        AS weighted_gpa,
+    (array_agg(quarter || ' ' || year ORDER BY CASE quarter
+        WHEN 'Winter' THEN 0 WHEN 'Spring' THEN 1 WHEN 'Summer' THEN 2 ELSE 3 END DESC))[1]
+        AS latest_term
+FROM (
+    SELECT
+        professor_id, course_id, year, quarter, avg_gpa,
+        coalesce(a_plus, 0) + coalesce(a, 0) + coalesce(a_minus, 0)
+        + coalesce(b_plus, 0) + coalesce(b, 0) + coalesce(b_minus, 0)
+        + coalesce(c_plus, 0) + coalesce(c, 0) + coalesce(c_minus, 0)
+        + coalesce(d_plus, 0) + coalesce(d, 0) + coalesce(d_minus, 0)
+        + coalesce(f, 0) AS students
+    FROM grade_distributions
+) g
+GROUP BY professor_id, course_id, year
+"""
+
+
+def _check_quarters() -> None:
+    """Refuse to backfill rows whose quarter has no season, as db.terms.season_of does."""
+    bad = op.get_bind().execute(
+        sa.text("SELECT DISTINCT quarter FROM grade_distributions WHERE quarter <> ALL(:quarters)"),
+        {"quarters": list(QUARTERS)},
+    ).scalars().all()
+    if bad:
+        raise ValueError(f"Unknown quarter(s) in grade_distributions: {sorted(bad)}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _check_quarters()
+    op.add_column('grade_distributions', sa.Column('term_ordinal', sa.Integer(), nullable=True))
+    op.execute(BACKFILL_SQL)
+    op.alter_column('grade_distributions', 'term_ordinal', nullable=False)
+    op.drop_index(op.f('ix_grade_distributions_professor_id'), table_name='grade_distributions')
+    op.create_index('ix_grade_distributions_pair_term', 'grade_distributions', ['professor_id', 'course_id', 'term_ordinal'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_grade_distributions_pair_term', table_name='grade_distributions')
+    op.create_index(op.f('ix_grade_distributions_professor_id'), 'grade_distributions', ['professor_id'], unique=False)
+    # A stats view recreated while term_ordinal existed may depend on it
+    op.execute("DROP MATERIALIZED VIEW professor_course_stats")
+    op.drop_column('grade_distributions', 'term_ordinal')
+    op.execute(PROFESSOR_COURSE_STATS_SQL)
+    op.execute(
+        "CREATE UNIQUE INDEX ix_professor_course_stats_key "
+        "ON professor_course_stats (professor_id, course_id, year)"
+    )
+    op.execute("CREATE INDEX ix_professor_course_stats_course ON professor_course_stats (course_id, year)")
@@ -0,0 +1,30 @@
+"""add gaucho score intervals
+
+Revision ID: 61b24ea2d596
+Revises: 25c2bd69c380
+Create Date: 2026-10-19 01:25:48.306183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '61b24ea2d596'
+down_revision: Union[str, Sequence[str], None] = '25c2bd69c380'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('gaucho_scores', sa.Column('score_low', sa.Float(), nullable=True))
+    op.add_column('gaucho_scores', sa.Column('score_high', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('gaucho_scores', 'score_high')
+    op.drop_column('gaucho_scores', 'score_low')
@@ -0,0 +1,200 @@
+"""add canonical departments
+
+Revision ID: 71984130db71
+Revises: 9e7918082ec6
+Create Date: 2026-10-19 00:55:25.189773
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71984130db71'
+down_revision: Union[str, Sequence[str], None] = '9e7918082ec6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of the department map and resolver the model used when this
+# revision was written (db.departments), so later edits to the map don't
+# change what this backfill writes
+_DEPT_MAP: dict[str, list[str]] = {
+    "ANTH": ["Anthropology"],
+    "ART": ["Art", "Art Studio"],
+    "ARTHI": ["Art History", "History Of Art And Architecture"],
+    "ARTST": ["Art Studio"],
+    "ASTRO": ["Astronomy", "Physics"],
+    "BIOE": ["Bioengineering"],
+    "BIOL": ["Biology", "Biological Sciences"],
+    "BMSE": ["Biomolecular Science And Engineering"],
+    "BL ST": ["Black Studies"],
+    "CH E": ["Chemical Engineering"],
+    "CHEM": ["Chemistry", "Chemistry And Biochemistry"],
+    "CHIN": ["Chinese"],
+    "CLASS": ["Classics"],
+    "COMM": ["Communication"],
+    "CMPSC": ["Computer Science"],
+    "CMPTG": ["Computing"],
+    "CNCSP": ["Counseling, Clinical & School Psychology"],
+    "DANCE": ["Dance"],
+    "DYNS": ["Dynamical Neuroscience"],
+    "EARTH": ["Earth Science"],
+    "EACS": ["East Asian Cultural Studies"],
+    "ECON": ["Economics"],
+    "ED": ["Education"],
+    "ECE": ["Electrical And Computer Engineering", "Electrical Engineering"],
+    "ENGL": ["English"],
+    "ENGR": ["Engineering"],
+    "ENV S": ["Environmental Studies"],
+    "ESM": ["Environmental Science And Management"],
+    "ES": ["Ethnic Studies"],
+    "FAMST": ["Film And Media Studies"],
+    "FEMST": ["Feminist Studies"],
+    "FR": ["French", "French And Italian"],
+    "GEOG": ["Geography"],
+    "GER": ["German", "Germanic And Slavic Studies"],
+    "GPS": ["Global Studies", "Global & International Studies"],
+    "GREEK": ["Classics"],
+    "HIST": ["History"],
+    "INT": ["Interdisciplinary"],
+    "ITAL": ["Italian", "French And Italian"],
+    "JAPAN": ["Japanese"],
+    "KOR": ["Korean"],
+    "LATIN": ["Classics"],
+    "LAIS": ["Latin American And Iberian Studies"],
+    "LING": ["Linguistics"],
+    "LIT": ["Comparative Literature", "Literature"],
+    "MARSC": ["Marine Science"],
+    "MATRL": ["Materials"],
+    "MATH": ["Mathematics"],
+    "ME": ["Mechanical Engineering"],
+    "MAT": ["Media Arts And Technology"],
+    "MCDB": ["Molecular, Cellular & Developmental Biology", "Biology"],
+    "MUS": ["Music"],
+    "PHIL": ["Philosophy"],
+    "PHYS": ["Physics"],
+    "POL S": ["Political Science"],
+    "PORT": ["Portuguese"],
+    "PSTAT": ["Statistics And Applied Probability", "Statistics"],
+    "PSY": ["Psychology", "Psychological & Brain Sciences"],
+    "RG ST": ["Religious Studies"],
+    "RENST": ["Renaissance Studies"],
+    "SLAV": ["Slavic Languages And Literature", "Germanic And Slavic Studies"],
+    "SOC": ["Sociology"],
+    "SPAN": ["Spanish", "Spanish And Portuguese"],
+    "SHS": ["Society And Health Sciences"],
+    "TMP": ["Technology Management"],
+    "THTR": ["Theater", "Theater And Dance"],
+    "WRIT": ["Writing"],
+    "W&L": ["Writing And Literature"],
+}
+
+
+def _canonical_resolver():
+    """(canonical_department, canonical display names) over the frozen map."""
+    from thefuzz import fuzz
+
+    reverse: dict[str, list[str]] = {}
+    for code, rmp_names in _DEPT_MAP.items():
+        for rmp_name in rmp_names:
+            reverse.setdefault(rmp_name.lower(), []).append(code)
+
+    parent = {code: code for code in _DEPT_MAP}
+
+    def find(code: str) -> str:
+        while parent[code] != code:
+            parent[code] = parent[parent[code]]
+            code = parent[code]
+        return code
+
+    for codes in reverse.values():
+        for other in codes[1:]:
+            parent[find(other)] = find(codes[0])
+    groups: dict[str, list[str]] = {}
+    for code in _DEPT_MAP:
+        groups.setdefault(find(code), []).append(code)
+
+    code_to_key: dict[str, str] = {}
+    name_to_key: dict[str, str] = {}
+    key_names: dict[str, str] = {}
+    for codes in groups.values():
+        key = "+".join(sorted(codes))
+        names = [name for code in codes for name in _DEPT_MAP[code]]
+        key_names[key] = max(dict.fromkeys(names), key=names.count)
+        for code in codes:
+            code_to_key[code] = key
+        for name in names:
+            name_to_key[name.lower()] = key
+
+    def canonical_department(dept: str | None) -> str | None:
+        if not dept or not dept.strip():
+            return None
+        upper, lower = dept.strip().upper(), dept.strip().lower()
+        if upper in code_to_key:
+            return code_to_key[upper]
+        if lower in name_to_key:
+            return name_to_key[lower]
+        best_key, best_score = None, 0
+        for name, key in name_to_key.items():
+            score = fuzz.ratio(name, lower)
+            if score >= 80 and score > best_score:
+                best_key, best_score = key, score
+        return best_key or upper
+
+    return canonical_department, key_names
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('departments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.Text(), nullable=False),
+    sa.Column('name', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    for table in ('professors', 'courses'):
+        op.add_column(table, sa.Column('department_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(
+            op.f(f'{table}_department_id_fkey'), table, 'departments', ['department_id'], ['id'],
+        )
+
+    # Resolve every distinct department string once
+    canonical_department, canonical_names = _canonical_resolver()
+
+    bind = op.get_bind()
+    raw = [
+        row[0] for row in bind.execute(sa.text(
+            "SELECT department FROM professors UNION SELECT department FROM courses"
+        ))
+    ]
+    keys = {dept: canonical_department(dept) for dept in raw}
+    names = {key: canonical_names.get(key, dept.strip()) for dept, key in keys.items() if key}
+    if names:
+        bind.execute(
+            sa.text("INSERT INTO departments (code, name) VALUES (:code, :name)"),
+            [{"code": key, "name": name} for key, name in names.items()],
+        )
+        ids = dict(bind.execute(sa.text("SELECT code, id FROM departments")).fetchall())
+        params = [{"dept": dept, "dept_id": ids[key]} for dept, key in keys.items() if key]
+        for table in ('professors', 'courses'):
+            bind.execute(
+                sa.text(f"UPDATE {table} SET department_id = :dept_id WHERE department = :dept"),
+                params,
+            )
+
+    op.create_index(op.f('ix_professors_department_id'), 'professors', ['department_id'], unique=False)
+    op.create_index(op.f('ix_courses_department_id'), 'courses', ['department_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_courses_department_id'), table_name='courses')
+    op.drop_index(op.f('ix_professors_department_id'), table_name='professors')
+    for table in ('professors', 'courses'):
+        op.drop_constraint(op.f(f'{table}_department_id_fkey'), table, type_='foreignkey')
+        op.drop_column(table, 'department_id')
+    op.drop_table('departments')
@@ -0,0 +1,28 @@
+"""add gaucho score decay_used
+
+Revision ID: 72b9b3284be3
+Revises: 61b24ea2d596
+Create Date: 2026-10-19 01:31:09.079579
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '72b9b3284be3'
+down_revision: Union[str, Sequence[str], None] = '61b24ea2d596'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('gaucho_scores', sa.Column('decay_used', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('gaucho_scores', 'decay_used')
@@ -0,0 +1,62 @@
+"""add professor rating rollups
+
+Revision ID: 84c13210b131
+Revises: 31639a6cc33d
+Create Date: 2026-10-19 01:15:35.003843
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '84c13210b131'
+down_revision: Union[str, Sequence[str], None] = '31639a6cc33d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same rows db.rating_rollup.refresh_rating_rollups writes, for every professor
+BACKFILL_SQL = """
+INSERT INTO professor_rating_rollups
+    (professor_id, latest_rating_id, latest_fetched_at, avg_sentiment, comment_count, keywords)
+SELECT
+    latest.professor_id,
+    latest.id,
+    latest.fetched_at,
+    (SELECT avg(c.sentiment_score) FROM rmp_comments c WHERE c.rmp_rating_id = latest.id),
+    (SELECT count(*) FROM rmp_comments c WHERE c.rmp_rating_id = latest.id),
+    (SELECT c.keywords FROM rmp_comments c
+        WHERE c.rmp_rating_id = latest.id AND json_typeof(c.keywords) = 'array'
+        ORDER BY c.id LIMIT 1)
+FROM (
+    SELECT DISTINCT ON (professor_id) id, professor_id, fetched_at
+    FROM rmp_ratings
+    ORDER BY professor_id, fetched_at DESC NULLS LAST, id DESC
+) latest
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('professor_rating_rollups',
+    sa.Column('professor_id', sa.Integer(), nullable=False),
+    sa.Column('latest_rating_id', sa.Integer(), nullable=True),
+    sa.Column('latest_fetched_at', sa.DateTime(), nullable=True),
+    sa.Column('avg_sentiment', sa.Float(), nullable=True),
+    sa.Column('comment_count', sa.Integer(), nullable=False),
+    sa.Column('keywords', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['latest_rating_id'], ['rmp_ratings.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['professor_id'], ['professors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('professor_id')
+    )
+    op.create_index(op.f('ix_rmp_comments_rmp_rating_id'), 'rmp_comments', ['rmp_rating_id'], unique=False)
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_rmp_comments_rmp_rating_id'), table_name='rmp_comments')
+    op.drop_table('professor_rating_rollups')
@@ -0,0 +1,45 @@
+"""add professor timestamps and matching runs
+
+Revision ID: 9e7918082ec6
+Revises: b0cf9e1b1575
+Create Date: 2026-10-19 00:48:24.150811
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e7918082ec6'
+down_revision: Union[str, Sequence[str], None] = 'b0cf9e1b1575'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('matching_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('full_rebuild', sa.Boolean(), nullable=False),
+    sa.Column('stats', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Existing rows count as changed now, so the first run after this is a full one
+    for name in ('created_at', 'updated_at'):
+        op.add_column('professors', sa.Column(
+            name, sa.DateTime(), nullable=False, server_default=sa.func.now(),
+        ))
+        op.alter_column('professors', name, server_default=None)
+    op.create_index(op.f('ix_professors_updated_at'), 'professors', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_professors_updated_at'), table_name='professors')
+    op.drop_column('professors', 'updated_at')
+    op.drop_column('professors', 'created_at')
+    op.drop_table('matching_runs')
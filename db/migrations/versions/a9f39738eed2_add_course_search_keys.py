@@ -0,0 +1,85 @@
+"""add course search keys
+
+Revision ID: a9f39738eed2
+Revises: 71984130db71
+Create Date: 2026-10-19 00:56:36.974377
+
+"""
+import logging
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9f39738eed2'
+down_revision: Union[str, Sequence[str], None] = '71984130db71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of the search keys the model derived when this revision was
+# written (db.course_search), so later changes there don't change this backfill
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+
+
+def _normalize_course_code(code: str | None) -> str:
+    return _NON_ALNUM.sub("", (code or "").upper())
+
+
+def _course_search_text(code: str | None, title: str | None) -> str:
+    return f"{_normalize_course_code(code)} {(title or '').strip().lower()}".strip()
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column('code_normalized', sa.Text(), nullable=True))
+    op.add_column('courses', sa.Column('search_text', sa.Text(), nullable=True))
+
+    # Backfill from the existing codes and titles
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, code, title FROM courses")).fetchall()
+    params = [
+        {
+            "id": row.id,
+            "code_normalized": _normalize_course_code(row.code),
+            "search_text": _course_search_text(row.code, row.title),
+        }
+        for row in rows
+    ]
+    if params:
+        bind.execute(
+            sa.text(
+                "UPDATE courses SET code_normalized = :code_normalized, "
+                "search_text = :search_text WHERE id = :id"
+            ),
+            params,
+        )
+
+    op.create_index(
+        'ix_courses_code_normalized', 'courses', ['code_normalized'], unique=False,
+        postgresql_ops={'code_normalized': 'text_pattern_ops'},
+    )
+
+    # Fuzzy search needs pg_trgm; without it the dashboard falls back to ILIKE
+    try:
+        with bind.begin_nested():
+            bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except sa.exc.DBAPIError:
+        logging.getLogger("alembic.runtime.migration").warning(
+            "pg_trgm is not available; skipping the trigram index on courses.search_text"
+        )
+        return
+    op.create_index(
+        'ix_courses_search_text_trgm', 'courses', ['search_text'], unique=False,
+        postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_courses_search_text_trgm")
+    op.drop_index('ix_courses_code_normalized', table_name='courses')
+    op.drop_column('courses', 'search_text')
+    op.drop_column('courses', 'code_normalized')
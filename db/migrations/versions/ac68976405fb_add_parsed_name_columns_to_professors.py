@@ -0,0 +1,96 @@
+"""add parsed name columns to professors
+
+Revision ID: ac68976405fb
+Revises: 3ee0c9e2add3
+Create Date: 2026-10-19 00:03:02.065190
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac68976405fb'
+down_revision: Union[str, Sequence[str], None] = '3ee0c9e2add3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of the name parsing the model used when this revision was written
+# (db.names), so later changes there don't change what this backfill writes
+_TITLE_PATTERNS = re.compile(r"\b(dr|prof|professor|mr|ms|mrs|phd|md)\b\.?", re.IGNORECASE)
+
+
+def _normalize(name: str) -> str:
+    return " ".join(_TITLE_PATTERNS.sub("", name).lower().split())
+
+
+def _normalize_nexus(name: str) -> str:
+    parts = name.split(",", 1)
+    if len(parts) == 2:
+        name = f"{parts[1].strip()} {parts[0].strip()}"
+    return _normalize(name)
+
+
+def _parse_professor_name(name_nexus: str | None, name_rmp: str | None) -> dict:
+    if name_nexus and name_nexus.strip():
+        name = name_nexus.strip()
+        if "," in name:
+            last, first = (part.strip().lower() for part in name.split(",", 1))
+        else:
+            tokens = name.split()
+            last, first = tokens[0].lower(), " ".join(tokens[1:]).lower()
+        return {
+            "last_name": last,
+            "first_name": first,
+            "is_initial": len(first) == 1 and first.isalpha(),
+            "name_normalized": _normalize_nexus(name_nexus),
+        }
+    if name_rmp and name_rmp.strip():
+        parts = name_rmp.strip().split()
+        return {
+            "last_name": parts[-1].lower(),
+            "first_name": parts[0].lower(),
+            "is_initial": False,
+            "name_normalized": _normalize(name_rmp),
+        }
+    return {"last_name": None, "first_name": None, "is_initial": False, "name_normalized": None}
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('professors', sa.Column('last_name', sa.Text(), nullable=True))
+    op.add_column('professors', sa.Column('first_name', sa.Text(), nullable=True))
+    op.add_column('professors', sa.Column(
+        'is_initial', sa.Boolean(), nullable=False, server_default=sa.false(),
+    ))
+    op.add_column('professors', sa.Column('name_normalized', sa.Text(), nullable=True))
+
+    # Backfill from the existing names
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, name_nexus, name_rmp FROM professors")).fetchall()
+    params = [
+        {"id": row.id, **_parse_professor_name(row.name_nexus, row.name_rmp)}
+        for row in rows
+    ]
+    if params:
+        bind.execute(
+            sa.text(
+                "UPDATE professors SET last_name = :last_name, first_name = :first_name, "
+                "is_initial = :is_initial, name_normalized = :name_normalized WHERE id = :id"
+            ),
+            params,
+        )
+
+    op.create_index('ix_professors_last_name', 'professors', ['last_name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_professors_last_name', table_name='professors')
+    op.drop_column('professors', 'name_normalized')
+    op.drop_column('professors', 'is_initial')
+    op.drop_column('professors', 'first_name')
+    op.drop_column('professors', 'last_name')
@@ -0,0 +1,33 @@
+"""index professor foreign keys
+
+Revision ID: b0cf9e1b1575
+Revises: ac68976405fb
+Create Date: 2026-10-19 00:43:27.044898
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0cf9e1b1575'
+down_revision: Union[str, Sequence[str], None] = 'ac68976405fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_TABLES = ("grade_distributions", "rmp_ratings", "gaucho_scores")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Professor merges/deletes check these FKs once per deleted row
+    for table in _TABLES:
+        op.create_index(op.f(f"ix_{table}_professor_id"), table, ["professor_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(_TABLES):
+        op.drop_index(op.f(f"ix_{table}_professor_id"), table_name=table)
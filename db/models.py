@@ -1,12 +1,31 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, Float, Text, ForeignKey, DateTime, JSON
-from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy import (
+    Column, Integer, SmallInteger, Float, Text, ForeignKey, DateTime, JSON, Boolean, Index, MetaData,
+    Table, Computed, DDL, case, event, inspect,
+)
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import DeclarativeBase, Session, relationship, validates
+
+from db.course_search import course_search_text, normalize_course_code
+from db.departments import CANONICAL_NAMES, canonical_department
+from db.names import parse_professor_name
+from db.terms import QUARTERS, season_of
 
 
 class Base(DeclarativeBase):
     pass
 
 
+class Department(Base):
+    """Canonical department; Nexus codes and RMP names resolve to one of these."""
+
+    __tablename__ = "departments"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(Text, unique=True, nullable=False)
+    name = Column(Text)
+
+
 class Professor(Base):
     __tablename__ = "professors"
 
@@ -15,57 +34,153 @@ class Professor(Base):
     name_rmp = Column(Text)
     rmp_id = Column(Integer, unique=True, nullable=True)
     department = Column(Text)
+    # Resolved from department on flush (see _resolve_departments)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True, index=True)
     match_confidence = Column(Float, nullable=True)
 
+    # Parsed from name_nexus (or name_rmp for RMP-only rows) whenever a name is set
+    last_name = Column(Text, nullable=True, index=True)
+    first_name = Column(Text, nullable=True)
+    is_initial = Column(Boolean, nullable=False, default=False)
+    name_normalized = Column(Text, nullable=True)
+
+    # Change tracking for incremental matching; loaders touch updated_at when
+    # they add grades, since that can make a professor newly matchable
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime, nullable=False, index=True,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    canonical_department = relationship("Department")
     grades = relationship("GradeDistribution", back_populates="professor")
     rmp_ratings = relationship("RmpRating", back_populates="professor")
     scores = relationship("GauchoScore", back_populates="professor")
 
+    @validates("name_nexus", "name_rmp")
+    def _sync_parsed_name(self, key, value):
+        name_nexus = value if key == "name_nexus" else self.name_nexus
+        name_rmp = value if key == "name_rmp" else self.name_rmp
+        for column, parsed in parse_professor_name(name_nexus, name_rmp).items():
+            setattr(self, column, parsed)
+        return value
+
 
 class Course(Base):
     __tablename__ = "courses"
+    # The pg_trgm GIN index on search_text is created by migration only, since
+    # it needs the extension (search falls back to ILIKE without it)
+    __table_args__ = (
+        Index(
+            "ix_courses_code_normalized", "code_normalized",
+            postgresql_ops={"code_normalized": "text_pattern_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     code = Column(Text, unique=True, nullable=False)
     title = Column(Text, nullable=True)
     department = Column(Text)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True, index=True)
 
+    # Search keys derived from code/title whenever they are set
+    code_normalized = Column(Text, nullable=True)
+    search_text = Column(Text, nullable=True)
+
+    canonical_department = relationship("Department")
     grades = relationship("GradeDistribution", back_populates="course")
     scores = relationship("GauchoScore", back_populates="course")
 
+    @validates("code", "title")
+    def _sync_search_keys(self, key, value):
+        code = value if key == "code" else self.code
+        title = value if key == "title" else self.title
+        self.code_normalized = normalize_course_code(code)
+        self.search_text = course_search_text(code, title)
+        return value
+
+
+# Letter-grade count columns of grade_distributions, best grade first
+GRADE_COUNT_COLUMNS = [
+    "a_plus", "a", "a_minus", "b_plus", "b", "b_minus",
+    "c_plus", "c", "c_minus", "d_plus", "d", "d_minus", "f",
+]
+
+# Stored per grade row; the first cast keeps the sum out of SMALLINT arithmetic
+GRADE_TOTAL_SQL = "a_plus::integer + " + " + ".join(GRADE_COUNT_COLUMNS[1:])
+
 
 class GradeDistribution(Base):
+    """One professor's grades for one course in one term.
+
+    Stored compactly: SMALLINT counts, the year and season (db.terms) instead
+    of the quarter name, and a generated total_students, with fixed-width
+    columns widest first so rows pack without alignment padding. The quarter
+    attribute still reads, writes and filters by quarter name; raw SQL can
+    read the old row shape from the legacy_grade_distributions view.
+    """
+
     __tablename__ = "grade_distributions"
+    # One pair's history in term order, and its last N terms, are range scans;
+    # the leading professor_id also serves per-professor lookups
+    __table_args__ = (
+        Index("ix_grade_distributions_pair_term", "professor_id", "course_id", "term_ordinal"),
+    )
 
     id = Column(Integer, primary_key=True)
     professor_id = Column(Integer, ForeignKey("professors.id"), nullable=False)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
-    quarter = Column(Text, nullable=False)
-    year = Column(Integer, nullable=False)
-    a_plus = Column(Integer, default=0)
-    a = Column(Integer, default=0)
-    a_minus = Column(Integer, default=0)
-    b_plus = Column(Integer, default=0)
-    b = Column(Integer, default=0)
-    b_minus = Column(Integer, default=0)
-    c_plus = Column(Integer, default=0)
-    c = Column(Integer, default=0)
-    c_minus = Column(Integer, default=0)
-    d_plus = Column(Integer, default=0)
-    d = Column(Integer, default=0)
-    d_minus = Column(Integer, default=0)
-    f = Column(Integer, default=0)
+    # year * 4 + season, derived from year/season whenever they are set
+    term_ordinal = Column(Integer, nullable=False)
     avg_gpa = Column(Float)
+    total_students = Column(Integer, Computed(GRADE_TOTAL_SQL), nullable=False)
+    year = Column(SmallInteger, nullable=False)
+    season = Column(SmallInteger, nullable=False)
+    a_plus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    a = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    a_minus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    b_plus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    b = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    b_minus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    c_plus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    c = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    c_minus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    d_plus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    d = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    d_minus = Column(SmallInteger, nullable=False, default=0, server_default="0")
+    f = Column(SmallInteger, nullable=False, default=0, server_default="0")
 
     professor = relationship("Professor", back_populates="grades")
     course = relationship("Course", back_populates="grades")
 
+    @hybrid_property
+    def quarter(self) -> str | None:
+        return None if self.season is None else QUARTERS[self.season]
+
+    @quarter.inplace.setter
+    def _quarter_setter(self, value: str) -> None:
+        self.season = season_of(value)
+
+    @quarter.inplace.expression
+    @classmethod
+    def _quarter_expression(cls):
+        return case(dict(enumerate(QUARTERS)), value=cls.season)
+
+    @validates("year", "season")
+    def _sync_term_ordinal(self, key, value):
+        year = value if key == "year" else self.year
+        season = value if key == "season" else self.season
+        if year is not None and season is not None:
+            self.term_ordinal = year * 4 + season
+        return value
+
 
 class RmpRating(Base):
     __tablename__ = "rmp_ratings"
 
     id = Column(Integer, primary_key=True)
-    professor_id = Column(Integer, ForeignKey("professors.id"), nullable=False)
+    professor_id = Column(Integer, ForeignKey("professors.id"), nullable=False, index=True)
     overall_quality = Column(Float)
     difficulty = Column(Float)
     would_take_again_pct = Column(Float, nullable=True)
@@ -80,7 +195,7 @@ class RmpComment(Base):
     __tablename__ = "rmp_comments"
 
     id = Column(Integer, primary_key=True)
-    rmp_rating_id = Column(Integer, ForeignKey("rmp_ratings.id"), nullable=False)
+    rmp_rating_id = Column(Integer, ForeignKey("rmp_ratings.id"), nullable=False, index=True)
     comment_text = Column(Text)
     sentiment_score = Column(Float, nullable=True)
     keywords = Column(JSON, nullable=True)
@@ -89,15 +204,170 @@ class RmpComment(Base):
     rating = relationship("RmpRating", back_populates="comments")
 
 
+class ProfessorRatingRollup(Base):
+    """Latest RMP rating and its comment sentiment per professor, kept by db.rating_rollup.
+
+    Rows are rewritten whenever ratings or comment sentiment change, so readers
+    get "latest rating" and "average sentiment" with a primary-key lookup.
+    """
+
+    __tablename__ = "professor_rating_rollups"
+
+    professor_id = Column(Integer, ForeignKey("professors.id", ondelete="CASCADE"), primary_key=True)
+    latest_rating_id = Column(Integer, ForeignKey("rmp_ratings.id", ondelete="SET NULL"), nullable=True)
+    latest_fetched_at = Column(DateTime, nullable=True)
+    # Over the latest rating's comments
+    avg_sentiment = Column(Float, nullable=True)
+    comment_count = Column(Integer, nullable=False, default=0)
+    keywords = Column(JSON, nullable=True)
+    # Normalized 0-1 Gaucho score factors of the latest rating (see etl.scoring),
+    # 0.5 where the input is missing; ranking queries weight them in SQL
+    quality_factor = Column(Float, nullable=False, default=0.5)
+    difficulty_factor = Column(Float, nullable=False, default=0.5)
+    sentiment_factor = Column(Float, nullable=False, default=0.5)
+
+
 class GauchoScore(Base):
     __tablename__ = "gaucho_scores"
 
     id = Column(Integer, primary_key=True)
-    professor_id = Column(Integer, ForeignKey("professors.id"), nullable=False)
+    professor_id = Column(Integer, ForeignKey("professors.id"), nullable=False, index=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     score = Column(Float)
+    # Bootstrap confidence interval of score (etl.score_bootstrap)
+    score_low = Column(Float, nullable=True)
+    score_high = Column(Float, nullable=True)
     weights_used = Column(JSON)
+    # Recency half-lives behind score (db.recency); None values mean flat averages
+    decay_used = Column(JSON, nullable=True)
     computed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     professor = relationship("Professor", back_populates="scores")
     course = relationship("Course", back_populates="scores")
+
+
+class MatchingRun(Base):
+    """One enhanced-matching run; finished runs provide the incremental watermark."""
+
+    __tablename__ = "matching_runs"
+
+    id = Column(Integer, primary_key=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    full_rebuild = Column(Boolean, nullable=False, default=False)
+    stats = Column(JSON, nullable=True)
+
+
+class DataVersion(Base):
+    """Single-row counter bumped whenever the pipeline writes data the dashboard shows."""
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+# Quarter name of a grade row's season, in SQL (db.terms.QUARTERS order)
+QUARTER_NAME_SQL = "(ARRAY[{}])[season + 1]".format(", ".join(f"'{q}'" for q in QUARTERS))
+
+# Per (professor, course, year) grade aggregates, refreshed by the pipeline after
+# grade loads and matching (db.course_stats). Year buckets let readers apply a
+# minimum year; the *_sum/*_count columns let them re-combine buckets exactly.
+PROFESSOR_COURSE_STATS_SQL = f"""
+CREATE MATERIALIZED VIEW professor_course_stats AS
+SELECT
+    professor_id,
+    course_id,
+    year,
+    count(*) AS quarters_taught,
+    count(avg_gpa) AS gpa_count,
+    sum(avg_gpa) AS gpa_sum,
+    sum(avg_gpa * avg_gpa) AS gpa_sq_sum,
+    avg(avg_gpa) AS mean_gpa,
+    stddev(avg_gpa) AS std_gpa,
+    sum(total_students) AS total_students,
+    sum(total_students) FILTER (WHERE avg_gpa IS NOT NULL) AS graded_students,
+    sum(avg_gpa * total_students) AS weighted_gpa_sum,
+    sum(avg_gpa * total_students) / nullif(sum(total_students) FILTER (WHERE avg_gpa IS NOT NULL), 0)
+        AS weighted_gpa,
+    (array_agg({QUARTER_NAME_SQL} || ' ' || year ORDER BY season DESC))[1] AS latest_term
+FROM grade_distributions
+GROUP BY professor_id, course_id, year
+"""
+
+# REFRESH ... CONCURRENTLY needs a unique index on the view
+PROFESSOR_COURSE_STATS_INDEX_SQL = (
+    "CREATE UNIQUE INDEX ix_professor_course_stats_key "
+    "ON professor_course_stats (professor_id, course_id, year)"
+)
+# Course pages and rankings read one course's rows
+PROFESSOR_COURSE_STATS_COURSE_INDEX_SQL = (
+    "CREATE INDEX ix_professor_course_stats_course ON professor_course_stats (course_id, year)"
+)
+
+# Readable through this Table, which is kept out of Base.metadata so create_all
+# and Alembic autogenerate leave the view to the DDL below and the migration
+professor_course_stats = Table(
+    "professor_course_stats", MetaData(),
+    Column("professor_id", Integer, primary_key=True),
+    Column("course_id", Integer, primary_key=True),
+    Column("year", Integer, primary_key=True),
+    Column("quarters_taught", Integer),
+    Column("gpa_count", Integer),
+    Column("gpa_sum", Float),
+    Column("gpa_sq_sum", Float),
+    Column("mean_gpa", Float),
+    Column("std_gpa", Float),
+    Column("total_students", Integer),
+    Column("graded_students", Integer),
+    Column("weighted_gpa_sum", Float),
+    Column("weighted_gpa", Float),
+    Column("latest_term", Text),
+)
+
+event.listen(Base.metadata, "after_create", DDL(PROFESSOR_COURSE_STATS_SQL))
+event.listen(Base.metadata, "after_create", DDL(PROFESSOR_COURSE_STATS_INDEX_SQL))
+event.listen(Base.metadata, "after_create", DDL(PROFESSOR_COURSE_STATS_COURSE_INDEX_SQL))
+event.listen(Base.metadata, "before_drop", DDL("DROP MATERIALIZED VIEW IF EXISTS professor_course_stats"))
+
+# grade_distributions in its pre-compaction shape (quarter name, INTEGER
+# counts), for raw SQL and exports written against it
+LEGACY_GRADE_DISTRIBUTIONS_SQL = f"""
+CREATE VIEW legacy_grade_distributions AS
+SELECT
+    id, professor_id, course_id,
+    {QUARTER_NAME_SQL} AS quarter,
+    year::integer AS year,
+    {", ".join(f"{c}::integer AS {c}" for c in GRADE_COUNT_COLUMNS)},
+    avg_gpa, term_ordinal, total_students
+FROM grade_distributions
+"""
+
+event.listen(Base.metadata, "after_create", DDL(LEGACY_GRADE_DISTRIBUTIONS_SQL))
+event.listen(Base.metadata, "before_drop", DDL("DROP VIEW IF EXISTS legacy_grade_distributions"))
+
+
+@event.listens_for(Session, "before_flush")
+def _resolve_departments(session, flush_context, instances):
+    """Point new or re-departmented professors and courses at their canonical Department."""
+    pending = [
+        obj for obj in (*session.new, *session.dirty)
+        if isinstance(obj, (Professor, Course))
+        and (obj in session.new or inspect(obj).attrs.department.history.has_changes())
+    ]
+    if not pending:
+        return
+
+    keys = {obj: canonical_department(obj.department) for obj in pending}
+    wanted = {key for key in keys.values() if key is not None}
+    with session.no_autoflush:
+        by_key = {
+            dept.code: dept
+            for dept in session.query(Department).filter(Department.code.in_(wanted))
+        } if wanted else {}
+    for obj, key in keys.items():
+        if key is not None and key not in by_key:
+            by_key[key] = Department(code=key, name=CANONICAL_NAMES.get(key, obj.department.strip()))
+            session.add(by_key[key])
+        obj.canonical_department = by_key.get(key)
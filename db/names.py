@@ -0,0 +1,88 @@
+"""Professor name parsing and normalization behind the professors table's derived columns.
+
+Pure functions with no database or ETL dependencies, so the models (and the
+matching code in etl/) share one definition.
+"""
+
+import re
+
+TITLE_PATTERNS = re.compile(r"\b(dr|prof|professor|mr|ms|mrs|phd|md)\b\.?", re.IGNORECASE)
+
+
+def parse_nexus_name(name: str) -> dict:
+    """Parse a Nexus-format professor name into components.
+
+    Handles formats:
+      - "HUANG L"       -> {last: "huang", first: "l", is_initial: True}
+      - "CHANG SHIYU"   -> {last: "chang", first: "shiyu", is_initial: False}
+      - "SMITH, JOHN"   -> {last: "smith", first: "john", is_initial: False}
+      - "SMITH, J"      -> {last: "smith", first: "j", is_initial: True}
+      - "O'BRIEN SEAN"  -> {last: "o'brien", first: "sean", is_initial: False}
+    """
+    if not name or not name.strip():
+        return {"last": "", "first": "", "is_initial": False}
+
+    name = name.strip()
+
+    # Comma-separated: "LAST, FIRST"
+    if "," in name:
+        parts = name.split(",", 1)
+        last = parts[0].strip().lower()
+        first = parts[1].strip().lower()
+    else:
+        # Space-separated: "LAST FIRST" — first token is last name
+        # Handle multi-word last names with apostrophes: "O'BRIEN SEAN"
+        tokens = name.split()
+        if len(tokens) == 1:
+            return {"last": tokens[0].lower(), "first": "", "is_initial": False}
+        last = tokens[0].lower()
+        first = " ".join(tokens[1:]).lower()
+
+    is_initial = len(first) == 1 and first.isalpha()
+    return {"last": last, "first": first, "is_initial": is_initial}
+
+
+def normalize_nexus_name(name: str) -> str:
+    """Convert 'LAST, FIRST' to normalized 'first last'."""
+    parts = name.split(",", 1)
+    if len(parts) == 2:
+        last, first = parts[0].strip(), parts[1].strip()
+        name = f"{first} {last}"
+    name = TITLE_PATTERNS.sub("", name)
+    return " ".join(name.lower().split())
+
+
+def normalize_rmp_name(name: str) -> str:
+    """Convert 'First Last' to normalized 'first last'."""
+    name = TITLE_PATTERNS.sub("", name)
+    return " ".join(name.lower().split())
+
+
+def parse_professor_name(name_nexus: str | None, name_rmp: str | None) -> dict:
+    """Derive the persisted parsed-name columns for a professor row.
+
+    The Nexus name wins when present (it is what the matching passes parse);
+    RMP-only rows use "First Last" order from the RMP name.
+
+    Returns dict: {last_name, first_name, is_initial, name_normalized}.
+    Values are None when neither name is usable.
+    """
+    if name_nexus and name_nexus.strip():
+        parsed = parse_nexus_name(name_nexus)
+        return {
+            "last_name": parsed["last"],
+            "first_name": parsed["first"],
+            "is_initial": parsed["is_initial"],
+            "name_normalized": normalize_nexus_name(name_nexus),
+        }
+
+    if name_rmp and name_rmp.strip():
+        parts = name_rmp.strip().split()
+        return {
+            "last_name": parts[-1].lower(),
+            "first_name": parts[0].lower(),
+            "is_initial": False,
+            "name_normalized": normalize_rmp_name(name_rmp),
+        }
+
+    return {"last_name": None, "first_name": None, "is_initial": False, "name_normalized": None}
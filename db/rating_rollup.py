@@ -0,0 +1,105 @@
+"""Maintaining professor_rating_rollups: each professor's latest RMP rating and sentiment."""
+
+from collections.abc import Iterable
+
+from sqlalchemy import and_, case, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db.models import ProfessorRatingRollup, RmpComment, RmpRating
+
+
+def _clamp01(expr):
+    return func.greatest(0.0, func.least(1.0, expr))
+
+
+def _factor_columns(quality, difficulty, num_ratings, avg_sentiment) -> list:
+    """SQL for the quality, difficulty and sentiment factors of etl.scoring.
+
+    Quality is Bayesian-adjusted toward 3.0 over five ratings when there are
+    ratings; a missing (or zero) input scores 0.5, as in compute_all_scores.
+    """
+    return [
+        case(
+            (and_(num_ratings != 0, quality != 0),
+             _clamp01((num_ratings * quality + 5 * 3.0) / (num_ratings + 5) / 5.0)),
+            (quality != 0, _clamp01(quality / 5.0)),
+            else_=0.5,
+        ),
+        case((difficulty != 0, _clamp01((5.0 - difficulty) / 5.0)), else_=0.5),
+        func.coalesce((avg_sentiment + 1) / 2, 0.5),
+    ]
+
+
+def refresh_rating_rollups(session: Session, professor_ids: Iterable[int] | None = None) -> None:
+    """Rewrite the rollup rows of the given professors (all professors when None).
+
+    One upsert picks each professor's latest rating (DISTINCT ON, newest
+    fetched_at), aggregates that rating's comments and derives its normalized
+    score factors; professors left with no ratings lose their row. Runs in the
+    caller's transaction, after a flush.
+    """
+    session.flush()
+    ids = None if professor_ids is None else list(set(professor_ids))
+    if ids == []:
+        return
+
+    latest = (
+        select(
+            RmpRating.id, RmpRating.professor_id, RmpRating.fetched_at,
+            RmpRating.overall_quality, RmpRating.difficulty, RmpRating.num_ratings,
+        )
+        .distinct(RmpRating.professor_id)
+        .order_by(RmpRating.professor_id, RmpRating.fetched_at.desc().nullslast(), RmpRating.id.desc())
+    )
+    if ids is not None:
+        latest = latest.where(RmpRating.professor_id.in_(ids))
+    latest = latest.subquery("latest")
+
+    of_latest = RmpComment.rmp_rating_id == latest.c.id
+    agg = select(
+        latest,
+        select(func.avg(RmpComment.sentiment_score)).where(of_latest).scalar_subquery().label("avg_sentiment"),
+        select(func.count()).select_from(RmpComment).where(of_latest).scalar_subquery().label("comment_count"),
+        # NLP stores a rating's keywords on one of its comments
+        select(RmpComment.keywords)
+        .where(of_latest, func.json_typeof(RmpComment.keywords) == "array")
+        .order_by(RmpComment.id)
+        .limit(1)
+        .scalar_subquery()
+        .label("keywords"),
+    ).subquery("agg")
+    rows = select(
+        agg.c.professor_id, agg.c.id, agg.c.fetched_at,
+        agg.c.avg_sentiment, agg.c.comment_count, agg.c.keywords,
+        *_factor_columns(agg.c.overall_quality, agg.c.difficulty, agg.c.num_ratings, agg.c.avg_sentiment),
+    )
+    stmt = insert(ProfessorRatingRollup).from_select(
+        ["professor_id", "latest_rating_id", "latest_fetched_at",
+         "avg_sentiment", "comment_count", "keywords",
+         "quality_factor", "difficulty_factor", "sentiment_factor"],
+        rows,
+    )
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[ProfessorRatingRollup.professor_id],
+        set_={
+            "latest_rating_id": stmt.excluded.latest_rating_id,
+            "latest_fetched_at": stmt.excluded.latest_fetched_at,
+            "avg_sentiment": stmt.excluded.avg_sentiment,
+            "comment_count": stmt.excluded.comment_count,
+            "keywords": stmt.excluded.keywords,
+            "quality_factor": stmt.excluded.quality_factor,
+            "difficulty_factor": stmt.excluded.difficulty_factor,
+            "sentiment_factor": stmt.excluded.sentiment_factor,
+        },
+    ))
+
+    stale = delete(ProfessorRatingRollup).where(
+        ProfessorRatingRollup.professor_id.not_in(select(RmpRating.professor_id))
+    )
+    if ids is not None:
+        stale = stale.where(ProfessorRatingRollup.professor_id.in_(ids))
+    session.execute(stale.execution_options(synchronize_session=False))
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, ProfessorRatingRollup):
+            session.expire(obj)
@@ -0,0 +1,83 @@
+"""Recency-weighted GPA and comment sentiment, computed set-based in Postgres.
+
+Flat averages weigh a professor's 2010 grading as much as last quarter's.
+With a half-life h, each observation is weighted 0.5 ** (age / h), where age
+is measured back from the pair's latest term (GPA, in term ordinals, see
+db.terms) or the professor's newest comment (sentiment, in days), both found
+with window functions. A weighted mean does not change if all its weights are scaled, so
+measuring from the pair's own latest observation ranks the same as measuring
+from today. A half-life of None weighs everything 1 (the flat average).
+"""
+
+from sqlalchemy import extract, func, literal, select
+
+from db.models import GradeDistribution, ProfessorRatingRollup, RmpComment
+
+
+def _decay(age, half_life: float | None):
+    return literal(1.0) if half_life is None else func.power(0.5, age / float(half_life))
+
+
+def gpa_terms_query(half_life_terms: float | None, min_year: int | None = None):
+    """Quarter GPAs with their recency weights: professor_id, course_id, avg_gpa, weight."""
+    g = GradeDistribution
+    terms = (
+        select(
+            g.professor_id, g.course_id, g.avg_gpa,
+            (func.max(g.term_ordinal).over(partition_by=(g.professor_id, g.course_id)) - g.term_ordinal)
+            .label("age"),
+        )
+        .where(g.avg_gpa.isnot(None))
+    )
+    if min_year is not None:
+        terms = terms.where(g.year >= min_year)
+    terms = terms.subquery("terms")
+    return select(
+        terms.c.professor_id, terms.c.course_id, terms.c.avg_gpa,
+        _decay(terms.c.age, half_life_terms).label("weight"),
+    )
+
+
+def sentiment_comments_query(half_life_days: float | None):
+    """Sentiments of each professor's latest-rating comments with recency weights.
+
+    Columns professor_id, sentiment_score, weight. Undated comments count as
+    old as the oldest dated one; with no dated comments all weigh the same.
+    """
+    partition = {"partition_by": ProfessorRatingRollup.professor_id}
+    created = func.coalesce(RmpComment.created_at, func.min(RmpComment.created_at).over(**partition))
+    age_days = extract("epoch", func.max(RmpComment.created_at).over(**partition) - created) / 86400.0
+    comments = (
+        select(
+            ProfessorRatingRollup.professor_id,
+            RmpComment.sentiment_score,
+            func.coalesce(age_days, 0).label("age"),
+        )
+        .join(RmpComment, RmpComment.rmp_rating_id == ProfessorRatingRollup.latest_rating_id)
+        .where(RmpComment.sentiment_score.isnot(None))
+        .subquery("comments")
+    )
+    return select(
+        comments.c.professor_id, comments.c.sentiment_score,
+        _decay(comments.c.age, half_life_days).label("weight"),
+    )
+
+
+def recency_gpa_query(half_life_terms: float | None, min_year: int | None = None):
+    """Per (professor, course) recency-weighted GPA: professor_id, course_id, mean_gpa."""
+    terms = gpa_terms_query(half_life_terms, min_year).subquery("weighted_terms")
+    return select(
+        terms.c.professor_id,
+        terms.c.course_id,
+        (func.sum(terms.c.weight * terms.c.avg_gpa) / func.sum(terms.c.weight)).label("mean_gpa"),
+    ).group_by(terms.c.professor_id, terms.c.course_id)
+
+
+def recency_sentiment_query(half_life_days: float | None):
+    """Per professor recency-weighted comment sentiment: professor_id, avg_sentiment."""
+    comments = sentiment_comments_query(half_life_days).subquery("weighted_comments")
+    return select(
+        comments.c.professor_id,
+        (func.sum(comments.c.weight * comments.c.sentiment_score) / func.sum(comments.c.weight))
+        .label("avg_sentiment"),
+    ).group_by(comments.c.professor_id)
@@ -0,0 +1,25 @@
+"""Academic terms as integers.
+
+UCSB terms run Winter, Spring, Summer, Fall within a year. Grade rows store
+the season (its index in QUARTERS) rather than the quarter name, and the term
+ordinal, year * 4 + season, orders terms correctly (the quarter names sort
+Fall before Spring and Winter) and makes consecutive terms differ by 1, so
+"the last N terms" and per-term trends are plain integer ranges and slopes.
+"""
+
+QUARTERS = ["Winter", "Spring", "Summer", "Fall"]
+
+SEASONS = {quarter: season for season, quarter in enumerate(QUARTERS)}
+
+
+def season_of(quarter: str) -> int:
+    """Season number of a quarter name; raises ValueError for anything else."""
+    try:
+        return SEASONS[quarter]
+    except KeyError:
+        raise ValueError(f"Unknown quarter {quarter!r}; expected one of {', '.join(QUARTERS)}") from None
+
+
+def term_ordinal(year: int, quarter: str) -> int:
+    """year * 4 + season."""
+    return year * 4 + season_of(quarter)
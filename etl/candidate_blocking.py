@@ -0,0 +1,126 @@
+"""Blocked, vectorized candidate scoring for full-name fuzzy matching.
+
+Scores are identical to ``etl.name_matcher.match_confidence`` (thefuzz
+``token_sort_ratio``), but each name is processed and token-sorted once and
+whole blocks of candidates are scored with rapidfuzz's multithreaded ``cdist``.
+
+Candidates are blocked by the length of their token-sorted key. A
+``token_sort_ratio`` of at least ``cutoff`` requires the two keys' lengths to
+be within a fixed ratio of each other, so the blocking never drops a pair that
+could reach the cutoff and results stay identical to a full pairwise scan.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from thefuzz.utils import full_process
+
+# Rows per cdist call, bounding the score matrix to ROW_CHUNK x block size
+ROW_CHUNK = 256
+
+
+def sort_key(name: str) -> str:
+    """Return the processed, token-sorted form that token_sort_ratio compares."""
+    return " ".join(sorted(full_process(name, force_ascii=True).split()))
+
+
+def _length_window(length: int, cutoff: int) -> tuple[int, int]:
+    """Smallest/largest key length that can still round up to ``cutoff``."""
+    # ratio = 100 * (1 - indel / (la + lb)) and indel >= |la - lb|
+    slack = 1 - (cutoff - 0.5) / 100 + 1e-9
+    lo = int(np.floor(length * (1 - slack) / (1 + slack)))
+    hi = int(np.ceil(length * (1 + slack) / (1 - slack)))
+    return lo, hi
+
+
+class CandidatePool:
+    """A pool of candidate names that can be scored in blocks and taken once.
+
+    ``names`` entries may be None for records without a usable name; they are
+    never returned as candidates. Indices always refer to positions in
+    ``names``.
+    """
+
+    def __init__(self, names: list[str | None]):
+        self._taken = np.zeros(len(names), dtype=bool)
+        by_length: dict[int, list[tuple[int, str]]] = defaultdict(list)
+        for idx, name in enumerate(names):
+            if name is None:
+                continue
+            key = sort_key(name)
+            by_length[len(key)].append((idx, key))
+        self._by_length = {
+            length: (np.array([i for i, _ in items], dtype=np.int64), [k for _, k in items])
+            for length, items in by_length.items()
+        }
+
+    def __len__(self) -> int:
+        return int((~self._taken).sum())
+
+    def _block(self, length: int, cutoff: int) -> tuple[np.ndarray, list[str]]:
+        lo, hi = _length_window(length, cutoff)
+        idxs, keys = [], []
+        for cand_len in sorted(self._by_length):
+            if lo <= cand_len <= hi:
+                block_idxs, block_keys = self._by_length[cand_len]
+                idxs.append(block_idxs)
+                keys.extend(block_keys)
+        if not idxs:
+            return np.empty(0, dtype=np.int64), []
+        return np.concatenate(idxs), keys
+
+    def ranked_candidates(
+        self,
+        queries: list[str],
+        cutoff: int = 85,
+    ) -> list[list[tuple[int, int]]]:
+        """For each query, list (index, score) of candidates scoring >= cutoff.
+
+        Scores are the same rounded integers as match_confidence. Each list is
+        ordered best first, ties broken by lower index, which is exactly the
+        order a sequential "strictly better wins" scan would prefer.
+        """
+        results: list[list[tuple[int, int]]] = [[] for _ in queries]
+
+        by_length: dict[int, list[tuple[int, str]]] = defaultdict(list)
+        for qi, query in enumerate(queries):
+            key = sort_key(query)
+            by_length[len(key)].append((qi, key))
+
+        # int(round(x)) >= cutoff  <=>  x > cutoff - 0.5 (round-half-to-even)
+        raw_cutoff = cutoff - 0.5
+        for length, items in by_length.items():
+            block_idxs, block_keys = self._block(length, cutoff)
+            if not block_keys:
+                continue
+            for start in range(0, len(items), ROW_CHUNK):
+                chunk = items[start:start + ROW_CHUNK]
+                matrix = process.cdist(
+                    [k for _, k in chunk], block_keys,
+                    scorer=fuzz.ratio,
+                    score_cutoff=raw_cutoff,
+                    dtype=np.float64,
+                    workers=-1,
+                )
+                for (qi, _), row in zip(chunk, matrix):
+                    hits = np.flatnonzero(row > raw_cutoff)
+                    if hits.size == 0:
+                        continue
+                    scores = np.rint(row[hits]).astype(np.int64)
+                    cand = block_idxs[hits]
+                    order = np.lexsort((cand, -scores))
+                    results[qi] = [(int(cand[o]), int(scores[o])) for o in order]
+
+        return results
+
+    def take(self, idx: int) -> None:
+        """Remove a candidate from the pool (O(1))."""
+        self._taken[idx] = True
+
+    def first_available(self, candidates: list[tuple[int, int]]) -> tuple[int, int] | None:
+        """Return the best (index, score) not yet taken, or None."""
+        for idx, score in candidates:
+            if not self._taken[idx]:
+                return idx, score
+        return None
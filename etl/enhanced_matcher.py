@@ -6,13 +6,23 @@ against existing RMP professors already in the database.
 
 import logging
 from collections import defaultdict
-
-from sqlalchemy.orm import Session
-
-from db.models import Professor, GradeDistribution
-from etl.name_utils import parse_nexus_name, is_initial_only, initial_matches, find_duplicate_pairs
-from etl.department_mapper import departments_match
-from etl.name_matcher import normalize_nexus_name, normalize_rmp_name, match_confidence
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Float, Integer, Text, and_, column, delete, func, literal, select, union_all, update,
+    values,
+)
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.util import identity_key
+
+from db.course_stats import refresh_professor_course_stats
+from db.data_version import bump_data_version
+from db.rating_rollup import refresh_rating_rollups
+from db.models import Professor, GradeDistribution, RmpRating, GauchoScore, MatchingRun
+from etl.name_utils import initial_matches, find_duplicate_pairs
+from etl.department_mapper import same_department
+from etl.candidate_blocking import CandidatePool
+from etl.sharded_matching import sharded_initial_candidates
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +54,202 @@ def _get_unlinked_rmp(session: Session) -> list[Professor]:
     )
 
 
+def _initial_candidates(session: Session, min_year: int = 2023) -> dict[int, list[Professor]]:
+    """Map each unmatched initial-only Nexus professor id to its RMP candidates.
+
+    Candidates are unlinked RMP professors with the same last name and first
+    initial, found with one self-join on the indexed last_name column.
+    """
+    nexus = aliased(Professor)
+    rmp = aliased(Professor)
+    active = (
+        select(GradeDistribution.id)
+        .where(GradeDistribution.professor_id == nexus.id, GradeDistribution.year >= min_year)
+        .exists()
+    )
+    rows = (
+        session.query(nexus.id, rmp)
+        .join(rmp, and_(
+            rmp.last_name == nexus.last_name,
+            func.substr(rmp.first_name, 1, 1) == func.substr(nexus.first_name, 1, 1),
+            rmp.rmp_id.isnot(None),
+            rmp.name_nexus.is_(None),
+            rmp.name_rmp.isnot(None),
+            rmp.name_rmp != "",
+        ))
+        .filter(
+            nexus.is_initial.is_(True),
+            nexus.name_nexus.isnot(None),
+            nexus.rmp_id.is_(None),
+            active,
+        )
+        .order_by(nexus.id, rmp.id)
+        .all()
+    )
+
+    candidates: dict[int, list[Professor]] = defaultdict(list)
+    for nexus_id, rmp_prof in rows:
+        candidates[nexus_id].append(rmp_prof)
+    return candidates
+
+
+def _last_watermark(session: Session) -> datetime | None:
+    """Start time of the last successful matching run, or None if there is none."""
+    return (
+        session.query(func.max(MatchingRun.started_at))
+        .filter(MatchingRun.finished_at.isnot(None))
+        .scalar()
+    )
+
+
+def _changed_ids(session: Session, since: datetime | None) -> set[int] | None:
+    """Ids of professors created or updated since the watermark (None means all)."""
+    if since is None:
+        return None
+    session.flush()
+    return set(session.scalars(select(Professor.id).where(Professor.updated_at >= since)))
+
+
+def _scope_by_last_name(
+    nexus_profs: list,
+    rmp_profs: list,
+    changed: set[int] | None,
+) -> tuple[list, list]:
+    """Keep professors whose last-name group has a changed member.
+
+    Passes 1, 3 and 4 only pair professors that share a last name, so a group
+    with no changes on either side would get the same answer as last run.
+    """
+    if changed is None:
+        return nexus_profs, rmp_profs
+    keys = {p.last_name for p in (*nexus_profs, *rmp_profs) if p.id in changed}
+    return (
+        [p for p in nexus_profs if p.last_name in keys],
+        [r for r in rmp_profs if r.last_name in keys],
+    )
+
+
+def _fuzzy_scope(
+    queries: list[Professor],
+    rmp_profs: list[Professor],
+    changed: set[int] | None,
+    cutoff: int = 85,
+) -> list[Professor]:
+    """Keep full-name queries that changed, or that could pair with a changed RMP record."""
+    if changed is None:
+        return queries
+    changed_rmp = [r for r in rmp_profs if r.id in changed]
+    reachable: set[int] = set()
+    if changed_rmp:
+        pool = CandidatePool([r.name_normalized if r.name_rmp else None for r in changed_rmp])
+        ranked = pool.ranked_candidates([q.name_normalized or "" for q in queries], cutoff)
+        reachable = {i for i, candidates in enumerate(ranked) if candidates}
+    return [q for i, q in enumerate(queries) if q.id in changed or i in reachable]
+
+
+def _sync_after_bulk(session: Session, deleted_professor_ids: list[int]) -> None:
+    """Bring the identity map in line after bulk UPDATE/DELETE statements."""
+    for prof_id in deleted_professor_ids:
+        deleted = session.identity_map.get(identity_key(Professor, prof_id))
+        if deleted is not None:
+            session.expunge(deleted)
+    session.expire_all()
+
+
+class LinkPlan:
+    """Link decisions collected by the matching passes, applied in bulk.
+
+    Passes add (nexus, rmp, confidence) decisions; collisions are resolved in
+    memory as they are added. apply() then writes every link with three
+    set-based statements in the session's current transaction.
+    """
+
+    def __init__(self):
+        # (nexus_id, rmp_row_id, rmp_id, name_rmp, confidence)
+        self.links: list[tuple[int, int, int, str | None, float]] = []
+        self._linked_nexus_ids: set[int] = set()
+        self._claimed_rmp_ids: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+    def is_linked(self, prof: Professor) -> bool:
+        """True if this Nexus professor already has a planned link."""
+        return prof.id in self._linked_nexus_ids
+
+    def is_claimed(self, rmp_prof: Professor) -> bool:
+        """True if this RMP professor's rmp_id is already planned for a Nexus professor."""
+        return rmp_prof.rmp_id in self._claimed_rmp_ids
+
+    def add(self, nexus_prof: Professor, rmp_prof: Professor, confidence: float) -> bool:
+        """Plan a link. Returns True if accepted, False if collision detected."""
+        if rmp_prof.name_nexus is not None or self.is_claimed(rmp_prof):
+            logger.warning(
+                f"Collision: RMP ID {rmp_prof.rmp_id} already linked, "
+                f"skipping {nexus_prof.name_nexus}"
+            )
+            return False
+        if self.is_linked(nexus_prof):
+            return False
+
+        self.links.append(
+            (nexus_prof.id, rmp_prof.id, rmp_prof.rmp_id, rmp_prof.name_rmp, confidence)
+        )
+        self._linked_nexus_ids.add(nexus_prof.id)
+        self._claimed_rmp_ids.add(rmp_prof.rmp_id)
+        return True
+
+    def apply(self, session: Session) -> int:
+        """Write all planned links. Returns the number of links applied.
+
+        Moves ratings from each RMP-only row to its Nexus professor, deletes the
+        orphaned RMP-only rows (freeing their rmp_id), then sets rmp_id,
+        name_rmp and match_confidence on the Nexus professors.
+        """
+        if not self.links:
+            return 0
+
+        session.flush()
+
+        plan = values(
+            column("nexus_id", Integer),
+            column("rmp_row_id", Integer),
+            column("rmp_id", Integer),
+            column("name_rmp", Text),
+            column("confidence", Float),
+            name="link_plan",
+        ).data(self.links)
+        rmp_row_ids = [link[1] for link in self.links]
+
+        session.execute(
+            update(RmpRating)
+            .where(RmpRating.professor_id == plan.c.rmp_row_id)
+            .values(professor_id=plan.c.nexus_id)
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(
+            delete(Professor)
+            .where(Professor.id.in_(rmp_row_ids))
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(
+            update(Professor)
+            .where(Professor.id == plan.c.nexus_id)
+            .values(
+                rmp_id=plan.c.rmp_id,
+                name_rmp=plan.c.name_rmp,
+                match_confidence=plan.c.confidence,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        _sync_after_bulk(session, rmp_row_ids)
+
+        applied = len(self.links)
+        self.links.clear()
+        return applied
+
+
 def _link_professor(
     session: Session,
     nexus_prof: Professor,
@@ -51,52 +257,24 @@ def _link_professor(
     confidence: float,
     dry_run: bool = False,
 ) -> bool:
-    """Link a Nexus professor to an RMP professor.
+    """Link a single Nexus professor to an RMP professor immediately.
 
     Copies rmp_id, name_rmp, and match_confidence from rmp_prof to nexus_prof.
     Returns True if linked, False if collision detected.
     """
-    # Collision guard: check rmp_id uniqueness
-    existing = (
-        session.query(Professor)
-        .filter(Professor.rmp_id == rmp_prof.rmp_id, Professor.id != nexus_prof.id)
-        .first()
-    )
-    if existing and existing.name_nexus is not None:
-        logger.warning(
-            f"Collision: RMP ID {rmp_prof.rmp_id} already linked to "
-            f"{existing.name_nexus} (id={existing.id}), skipping {nexus_prof.name_nexus}"
-        )
+    plan = LinkPlan()
+    if not plan.add(nexus_prof, rmp_prof, confidence):
         return False
+    if not dry_run:
+        plan.apply(session)
+    return True
 
-    if dry_run:
-        return True
-
-    # Save values before clearing to avoid unique constraint violation
-    saved_rmp_id = rmp_prof.rmp_id
-    saved_name_rmp = rmp_prof.name_rmp
-
-    # Transfer ratings from the RMP-only professor to the Nexus professor
-    for rating in list(rmp_prof.rmp_ratings):
-        rating.professor_id = nexus_prof.id
-
-    # Clear rmp_id on the RMP-only row and flush the rating transfers
-    rmp_prof.rmp_id = None
-    session.flush()
-
-    # Expire so SQLAlchemy doesn't try to cascade-nullify already-transferred ratings
-    session.expire(rmp_prof)
-
-    # Remove the now-orphaned RMP-only row
-    session.delete(rmp_prof)
-    session.flush()
 
-    # Now safe to set the rmp_id on the Nexus professor
-    nexus_prof.rmp_id = saved_rmp_id
-    nexus_prof.name_rmp = saved_name_rmp
-    nexus_prof.match_confidence = confidence
-    session.flush()
-    return True
+def _finish_pass(session: Session, plan: LinkPlan, own_plan: bool, dry_run: bool) -> None:
+    """Apply and commit a pass's links when it was run on its own."""
+    if own_plan and not dry_run:
+        plan.apply(session)
+        session.commit()
 
 
 def _pass1_initial_match(
@@ -104,43 +282,54 @@ def _pass1_initial_match(
     unmatched: list[Professor],
     rmp_profs: list[Professor],
     dry_run: bool = False,
+    plan: LinkPlan | None = None,
+    since: datetime | None = None,
+    scored: dict[int, list[tuple[Professor, bool]]] | None = None,
 ) -> dict:
     """Pass 1: Match initial-only Nexus names to RMP professors by last name + initial.
 
     Links only when exactly 1 candidate exists. Confidence 90 (dept match) or 75 (no dept).
+    Decisions go into plan; without one, the pass applies and commits its own links.
+    With since, only last-name groups changed after that watermark are considered.
+    scored optionally supplies precomputed (rmp, dept_match) candidates per
+    professor id, as from sharded_initial_candidates.
     """
     stats = {"matched": 0, "ambiguous": 0, "no_candidate": 0}
+    own_plan = plan is None
+    if own_plan:
+        plan = LinkPlan()
+
+    unmatched, rmp_profs = _scope_by_last_name(unmatched, rmp_profs, _changed_ids(session, since))
 
-    # Index RMP professors by lowercase last name
+    # Index RMP professors by their persisted (lowercase) last name
     rmp_by_last: dict[str, list[Professor]] = defaultdict(list)
     for rmp in rmp_profs:
-        if rmp.name_rmp:
-            parts = rmp.name_rmp.strip().split()
-            if parts:
-                last = parts[-1].lower()
-                rmp_by_last[last].append(rmp)
+        if rmp.name_rmp and rmp.last_name:
+            rmp_by_last[rmp.last_name].append(rmp)
 
     for prof in unmatched:
-        if not is_initial_only(prof.name_nexus):
+        if not prof.is_initial:
             continue
 
-        parsed = parse_nexus_name(prof.name_nexus)
-        last = parsed["last"]
-        initial = parsed["first"]
-
-        candidates = [
-            rmp for rmp in rmp_by_last.get(last, [])
-            if rmp.name_rmp and initial_matches(initial, rmp.name_rmp.split()[0])
-        ]
+        if scored is not None:
+            candidates = [rmp for rmp, _ in scored.get(prof.id, [])]
+        else:
+            candidates = [
+                rmp for rmp in rmp_by_last.get(prof.last_name, [])
+                if initial_matches(prof.first_name, rmp.first_name)
+            ]
 
         if len(candidates) == 0:
             stats["no_candidate"] += 1
         elif len(candidates) == 1:
             rmp_prof = candidates[0]
-            dept_match = departments_match(prof.department, rmp_prof.department)
+            if scored is not None:
+                dept_match = scored[prof.id][0][1]
+            else:
+                dept_match = same_department(prof.department_id, rmp_prof.department_id)
             confidence = 90.0 if dept_match else 75.0
 
-            if _link_professor(session, prof, rmp_prof, confidence, dry_run):
+            if plan.add(prof, rmp_prof, confidence):
                 stats["matched"] += 1
                 logger.info(
                     f"Pass 1: {prof.name_nexus} -> {rmp_prof.name_rmp} "
@@ -152,9 +341,7 @@ def _pass1_initial_match(
                 f"Pass 1: {prof.name_nexus} ambiguous — {len(candidates)} candidates"
             )
 
-    if not dry_run:
-        session.commit()
-
+    _finish_pass(session, plan, own_plan, dry_run)
     return stats
 
 
@@ -162,45 +349,50 @@ def _pass2_fullname_fuzzy(
     session: Session,
     min_year: int = 2023,
     dry_run: bool = False,
+    plan: LinkPlan | None = None,
+    since: datetime | None = None,
 ) -> dict:
     """Pass 2: Fuzzy match full-name Nexus professors against unlinked RMP records.
 
-    Threshold 85+. Department match boosts confidence by 5.
+    Threshold 85+. Department match boosts confidence by 5. With since, only
+    names changed after that watermark, or that could pair with a changed RMP
+    record, are matched.
     """
     stats = {"matched": 0, "below_threshold": 0}
+    own_plan = plan is None
+    if own_plan:
+        plan = LinkPlan()
 
-    # Re-query after Pass 1 may have changed state
-    unmatched = _get_unmatched_nexus(session, min_year)
-    rmp_profs = _get_unlinked_rmp(session)
+    # Re-query, leaving out professors already linked by Pass 1's plan
+    unmatched = [p for p in _get_unmatched_nexus(session, min_year) if not plan.is_linked(p)]
+    rmp_profs = [r for r in _get_unlinked_rmp(session) if not plan.is_claimed(r)]
 
     if not rmp_profs:
         return stats
 
-    for prof in unmatched:
-        if is_initial_only(prof.name_nexus):
-            continue
+    queries = [prof for prof in unmatched if not prof.is_initial]
+    queries = _fuzzy_scope(queries, rmp_profs, _changed_ids(session, since))
 
-        norm_nexus = normalize_nexus_name(prof.name_nexus)
-        best_score = 0
-        best_rmp = None
+    # Names are normalized at write time; score blocks of candidates in one vectorized call
+    pool = CandidatePool([
+        rmp.name_normalized if rmp.name_rmp else None
+        for rmp in rmp_profs
+    ])
+    ranked = pool.ranked_candidates([prof.name_normalized or "" for prof in queries], cutoff=85)
 
-        for rmp in rmp_profs:
-            if not rmp.name_rmp:
-                continue
-            norm_rmp = normalize_rmp_name(rmp.name_rmp)
-            score = match_confidence(norm_nexus, norm_rmp)
-            if score > best_score:
-                best_score = score
-                best_rmp = rmp
-
-        if best_score >= 85 and best_rmp:
-            dept_match = departments_match(prof.department, best_rmp.department)
+    for prof, candidates in zip(queries, ranked):
+        best = pool.first_available(candidates)
+
+        if best is not None:
+            best_idx, best_score = best
+            best_rmp = rmp_profs[best_idx]
+            dept_match = same_department(prof.department_id, best_rmp.department_id)
             confidence = min(best_score + (5 if dept_match else 0), 100.0)
 
-            if _link_professor(session, prof, best_rmp, confidence, dry_run):
+            if plan.add(prof, best_rmp, confidence):
                 stats["matched"] += 1
                 # Remove from candidate pool
-                rmp_profs.remove(best_rmp)
+                pool.take(best_idx)
                 logger.info(
                     f"Pass 2: {prof.name_nexus} -> {best_rmp.name_rmp} "
                     f"(conf={confidence})"
@@ -208,9 +400,7 @@ def _pass2_fullname_fuzzy(
         else:
             stats["below_threshold"] += 1
 
-    if not dry_run:
-        session.commit()
-
+    _finish_pass(session, plan, own_plan, dry_run)
     return stats
 
 
@@ -218,37 +408,44 @@ def _pass3_dept_disambiguation(
     session: Session,
     min_year: int = 2023,
     dry_run: bool = False,
+    plan: LinkPlan | None = None,
+    since: datetime | None = None,
+    scored: dict[int, list[tuple[Professor, bool]]] | None = None,
 ) -> dict:
-    """Pass 3: For ambiguous initial-only names, use department to narrow to 1 candidate."""
-    stats = {"matched": 0, "still_ambiguous": 0, "no_dept": 0}
+    """Pass 3: For ambiguous initial-only names, use department to narrow to 1 candidate.
 
-    unmatched = _get_unmatched_nexus(session, min_year)
-    rmp_profs = _get_unlinked_rmp(session)
-
-    # Index RMP by last name
-    rmp_by_last: dict[str, list[Professor]] = defaultdict(list)
-    for rmp in rmp_profs:
-        if rmp.name_rmp:
-            parts = rmp.name_rmp.strip().split()
-            if parts:
-                last = parts[-1].lower()
-                rmp_by_last[last].append(rmp)
+    scored optionally supplies precomputed (rmp, dept_match) candidates, as in pass 1.
+    """
+    stats = {"matched": 0, "still_ambiguous": 0, "no_dept": 0}
+    own_plan = plan is None
+    if own_plan:
+        plan = LinkPlan()
+
+    unmatched = [p for p in _get_unmatched_nexus(session, min_year) if not plan.is_linked(p)]
+    if since is not None:
+        unmatched, _ = _scope_by_last_name(
+            unmatched, _get_unlinked_rmp(session), _changed_ids(session, since),
+        )
+    # (rmp, dept_match) per professor; dept_match is None until it is needed
+    if scored is None:
+        candidates_by_prof = {
+            prof_id: [(rmp, None) for rmp in rmps]
+            for prof_id, rmps in _initial_candidates(session, min_year).items()
+        }
+    else:
+        candidates_by_prof = scored
 
     for prof in unmatched:
-        if not is_initial_only(prof.name_nexus):
+        if not prof.is_initial:
             continue
-        if not prof.department:
+        if prof.department_id is None:
             stats["no_dept"] += 1
             continue
 
-        parsed = parse_nexus_name(prof.name_nexus)
-        last = parsed["last"]
-        initial = parsed["first"]
-
-        # Find all candidates matching last name + initial
+        # All unlinked RMP candidates matching last name + initial
         candidates = [
-            rmp for rmp in rmp_by_last.get(last, [])
-            if rmp.name_rmp and initial_matches(initial, rmp.name_rmp.split()[0])
+            (rmp, dept_match) for rmp, dept_match in candidates_by_prof.get(prof.id, [])
+            if not plan.is_claimed(rmp)
         ]
 
         if len(candidates) <= 1:
@@ -256,13 +453,14 @@ def _pass3_dept_disambiguation(
 
         # Filter by department
         dept_matches = [
-            rmp for rmp in candidates
-            if departments_match(prof.department, rmp.department)
+            rmp for rmp, dept_match in candidates
+            if (dept_match if dept_match is not None
+                else same_department(prof.department_id, rmp.department_id))
         ]
 
         if len(dept_matches) == 1:
             rmp_prof = dept_matches[0]
-            if _link_professor(session, prof, rmp_prof, 90.0, dry_run):
+            if plan.add(prof, rmp_prof, 90.0):
                 stats["matched"] += 1
                 logger.info(
                     f"Pass 3: {prof.name_nexus} ({prof.department}) -> "
@@ -271,91 +469,179 @@ def _pass3_dept_disambiguation(
         else:
             stats["still_ambiguous"] += 1
 
-    if not dry_run:
-        session.commit()
-
+    _finish_pass(session, plan, own_plan, dry_run)
     return stats
 
 
+def _merge_duplicates(
+    session: Session,
+    merges: list[tuple[int, int]],
+    rmp_transfers: list[tuple[int, int, str | None, float | None]],
+) -> None:
+    """Merge abbreviated professors into full-name ones with set-based statements.
+
+    merges: (abbr_id, full_id) in pass order. Grade rows that collide on
+    (course_id, term) with the full professor, or with a grade moved
+    from an earlier abbreviation, are deleted; the rest are reassigned.
+    Scores and ratings move over, the abbreviated rows are deleted, and
+    rmp_transfers (full_id, rmp_id, name_rmp, match_confidence) then land on
+    the full professors once the abbreviated rows have released their rmp_id.
+    """
+    session.flush()
+
+    merge_map = values(
+        column("abbr_id", Integer),
+        column("full_id", Integer),
+        column("merge_order", Integer),
+        name="merge_map",
+    ).data([(abbr_id, full_id, i) for i, (abbr_id, full_id) in enumerate(merges)])
+    abbr_ids = [abbr_id for abbr_id, _ in merges]
+    full_ids = sorted({full_id for _, full_id in merges})
+    # The explicit id lists next to the merge_map joins keep plans sane when
+    # the planner's row estimates are stale right after a bulk load.
+
+    # Rank every grade that will belong to a full professor per (course, term):
+    # the full professor's own rows first (order -1), then moved rows in pass
+    # order. Any moved row that is not ranked first is a duplicate.
+    gd = GradeDistribution
+    term_rows = union_all(
+        select(
+            gd.id, gd.professor_id.label("full_id"), gd.course_id, gd.term_ordinal,
+            literal(-1).label("merge_order"), literal(False).label("moved"),
+        ).where(gd.professor_id.in_(full_ids)),
+        select(
+            gd.id, merge_map.c.full_id, gd.course_id, gd.term_ordinal,
+            merge_map.c.merge_order, literal(True).label("moved"),
+        )
+        .join(merge_map, gd.professor_id == merge_map.c.abbr_id)
+        .where(gd.professor_id.in_(abbr_ids)),
+    ).subquery("term_rows")
+    ranked = select(
+        term_rows.c.id,
+        term_rows.c.moved,
+        func.row_number().over(
+            partition_by=(term_rows.c.full_id, term_rows.c.course_id, term_rows.c.term_ordinal),
+            order_by=(term_rows.c.merge_order, term_rows.c.id),
+        ).label("rn"),
+    ).subquery("ranked")
+    # Resolved up front: as an IN (subquery) the window could be re-run per row
+    duplicate_ids = session.scalars(
+        select(ranked.c.id).where(ranked.c.moved, ranked.c.rn > 1)
+    ).all()
+    if duplicate_ids:
+        session.execute(
+            delete(gd)
+            .where(gd.id.in_(duplicate_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    for model in (GradeDistribution, GauchoScore, RmpRating):
+        session.execute(
+            update(model)
+            .where(model.professor_id == merge_map.c.abbr_id, model.professor_id.in_(abbr_ids))
+            .values(professor_id=merge_map.c.full_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    session.execute(
+        delete(Professor)
+        .where(Professor.id.in_(abbr_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+    if rmp_transfers:
+        transfer = values(
+            column("full_id", Integer),
+            column("rmp_id", Integer),
+            column("name_rmp", Text),
+            column("confidence", Float),
+            name="rmp_transfer",
+        ).data(rmp_transfers)
+        session.execute(
+            update(Professor)
+            .where(Professor.id == transfer.c.full_id)
+            .values(
+                rmp_id=transfer.c.rmp_id,
+                name_rmp=transfer.c.name_rmp,
+                match_confidence=transfer.c.confidence,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    _sync_after_bulk(session, abbr_ids)
+
+
 def _pass4_deduplication(
     session: Session,
     min_year: int = 2023,
     dry_run: bool = False,
+    since: datetime | None = None,
 ) -> dict:
     """Pass 4: Merge duplicate Nexus professor pairs (abbreviated + full name).
 
     Transfers grade records from the abbreviated-name professor to the full-name one.
+    Each abbreviation merges into the first full name it pairs with. Pairs where
+    both sides already have different RMP links are left alone (conflicts).
+    With since, only last-name groups changed after that watermark are checked.
     """
-    stats = {"merged": 0}
+    stats = {"merged": 0, "conflicts": 0}
 
     # Get all Nexus professors (not just unmatched — we want to find duplicates)
     all_nexus = (
-        session.query(Professor)
+        session.query(
+            Professor.id, Professor.name_nexus, Professor.department,
+            Professor.last_name, Professor.first_name, Professor.is_initial,
+            Professor.rmp_id, Professor.name_rmp, Professor.match_confidence,
+        )
         .filter(Professor.name_nexus.isnot(None))
         .all()
     )
+    all_nexus, _ = _scope_by_last_name(all_nexus, [], _changed_ids(session, since))
+    by_id = {p.id: p for p in all_nexus}
 
     names_with_dept = [
-        {"id": p.id, "name": p.name_nexus, "department": p.department or ""}
+        {
+            "id": p.id, "name": p.name_nexus, "department": p.department or "",
+            "parsed": {"last": p.last_name, "first": p.first_name, "is_initial": p.is_initial},
+        }
         for p in all_nexus
     ]
 
     pairs = find_duplicate_pairs(names_with_dept)
 
-    for abbr_info, full_info in pairs:
-        abbr = session.get(Professor, abbr_info["id"])
-        full = session.get(Professor, full_info["id"])
+    merges: list[tuple[int, int]] = []
+    rmp_transfers: list[tuple[int, int, str | None, float | None]] = []
+    merged_abbr: set[int] = set()
+    full_has_rmp = {p.id: p.rmp_id is not None for p in all_nexus}
 
-        if not abbr or not full:
+    for abbr_info, full_info in pairs:
+        abbr = by_id[abbr_info["id"]]
+        full = by_id[full_info["id"]]
+        if abbr.id in merged_abbr:
             continue
 
         # If the abbreviated one has an RMP link but the full one doesn't, transfer it
-        if abbr.rmp_id and not full.rmp_id:
-            saved_rmp_id = abbr.rmp_id
-            full.name_rmp = abbr.name_rmp
-            full.match_confidence = abbr.match_confidence
-            for rating in list(abbr.rmp_ratings):
-                rating.professor_id = full.id
-            abbr.rmp_id = None
-            session.flush()
-            full.rmp_id = saved_rmp_id
-
-        # Transfer grade records from abbreviated to full
-        if not dry_run:
-            for grade in list(abbr.grades):
-                # Check for duplicate (same course + quarter + year)
-                existing = (
-                    session.query(GradeDistribution)
-                    .filter_by(
-                        professor_id=full.id,
-                        course_id=grade.course_id,
-                        quarter=grade.quarter,
-                        year=grade.year,
-                    )
-                    .first()
+        if abbr.rmp_id:
+            if full_has_rmp[full.id]:
+                stats["conflicts"] += 1
+                logger.warning(
+                    f"Pass 4: {abbr.name_nexus} and {full.name_nexus} both have RMP links, "
+                    f"not merging"
                 )
-                if existing:
-                    # Duplicate — delete the abbreviated prof's copy
-                    session.delete(grade)
-                else:
-                    grade.professor_id = full.id
-
-            # Transfer any scores
-            for score in list(abbr.scores):
-                score.professor_id = full.id
-
-            session.flush()
-            session.expire(abbr)
-            session.delete(abbr)
-            session.flush()
+                continue
+            rmp_transfers.append((full.id, abbr.rmp_id, abbr.name_rmp, abbr.match_confidence))
+            full_has_rmp[full.id] = True
 
+        merges.append((abbr.id, full.id))
+        merged_abbr.add(abbr.id)
         stats["merged"] += 1
         logger.info(
             f"Pass 4: Merged {abbr_info['name']} -> {full_info['name']} "
             f"(dept={full_info['department']})"
         )
 
-    if not dry_run:
+    if merges and not dry_run:
+        _merge_duplicates(session, merges, rmp_transfers)
         session.commit()
 
     return stats
@@ -365,43 +651,76 @@ def run_enhanced_matching(
     session: Session,
     min_year: int = 2023,
     dry_run: bool = False,
+    full_rebuild: bool = False,
+    workers: int = 1,
 ) -> dict:
     """Orchestrate all four matching passes.
 
+    By default only professors created or updated since the last successful run
+    (and the candidates they could pair with) are considered. Each real run
+    records itself in matching_runs once it finishes.
+
     Args:
         session: SQLAlchemy session
         min_year: Only consider professors active since this year
-        dry_run: If True, don't modify the database
+        dry_run: If True, don't modify the database (stats are the same as a real run
+            for passes 1-3, since their links are planned in memory either way)
+        full_rebuild: Ignore the watermark and reconsider every professor
+        workers: With more than 1, passes 1 and 3 share candidates scored once up
+            front, sharded by last name (in process); links are the same as a serial run
 
     Returns:
         Combined stats dict with per-pass results
     """
     logger.info("=== Enhanced Professor Matching ===")
 
+    started_at = datetime.now(timezone.utc)
+    since = None if full_rebuild else _last_watermark(session)
+    if since is None:
+        logger.info("Full rebuild: considering all professors")
+    else:
+        logger.info(f"Incremental: considering changes since {since}")
+
     # Get initial state
     unmatched = _get_unmatched_nexus(session, min_year)
     rmp_profs = _get_unlinked_rmp(session)
 
     logger.info(f"Starting: {len(unmatched)} unmatched Nexus, {len(rmp_profs)} unlinked RMP")
 
+    # Passes 1-3 only plan links; they are written together afterwards
+    plan = LinkPlan()
+
+    scored = None
+    if workers > 1:
+        scored = sharded_initial_candidates(unmatched, rmp_profs, workers)
+
     # Pass 1
     logger.info("--- Pass 1: Initial Match ---")
-    p1 = _pass1_initial_match(session, unmatched, rmp_profs, dry_run)
+    p1 = _pass1_initial_match(
+        session, unmatched, rmp_profs, dry_run, plan=plan, since=since, scored=scored,
+    )
     logger.info(f"Pass 1 results: {p1}")
 
     # Pass 2
     logger.info("--- Pass 2: Full-Name Fuzzy ---")
-    p2 = _pass2_fullname_fuzzy(session, min_year, dry_run)
+    p2 = _pass2_fullname_fuzzy(session, min_year, dry_run, plan=plan, since=since)
     logger.info(f"Pass 2 results: {p2}")
 
     # Pass 3
     logger.info("--- Pass 3: Department Disambiguation ---")
-    p3 = _pass3_dept_disambiguation(session, min_year, dry_run)
+    p3 = _pass3_dept_disambiguation(
+        session, min_year, dry_run, plan=plan, since=since, scored=scored,
+    )
     logger.info(f"Pass 3 results: {p3}")
 
+    if not dry_run:
+        applied = plan.apply(session)
+        session.commit()
+        logger.info(f"Applied {applied} links")
+
     # Pass 4
     logger.info("--- Pass 4: Nexus Deduplication ---")
-    p4 = _pass4_deduplication(session, min_year, dry_run)
+    p4 = _pass4_deduplication(session, min_year, dry_run, since=since)
     logger.info(f"Pass 4 results: {p4}")
 
     total_new = p1["matched"] + p2["matched"] + p3["matched"]
@@ -410,11 +729,28 @@ def run_enhanced_matching(
         f"=== Done: {total_new} new matches, {total_merged} merges ==="
     )
 
-    return {
+    stats = {
         "pass1": p1,
         "pass2": p2,
         "pass3": p3,
         "pass4": p4,
         "total_new_matches": total_new,
         "total_merges": total_merged,
+        "incremental_since": since.isoformat() if since else None,
     }
+
+    if not dry_run:
+        session.add(MatchingRun(
+            started_at=started_at,
+            finished_at=datetime.now(timezone.utc),
+            full_rebuild=since is None,
+            stats=stats,
+        ))
+        # Links and pass-4 merges move grades and ratings between professor
+        # rows and change the names the dashboard shows
+        refresh_professor_course_stats(session)
+        refresh_rating_rollups(session)
+        bump_data_version(session)
+        session.commit()
+
+    return stats
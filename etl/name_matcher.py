@@ -1,54 +1,152 @@
-import re
+from collections import defaultdict
+
+import numpy as np
+from rapidfuzz import fuzz as rfuzz
 from thefuzz import fuzz
 
-TITLE_PATTERNS = re.compile(r"\b(dr|prof|professor|mr|ms|mrs|phd|md)\b\.?", re.IGNORECASE)
+from db.names import TITLE_PATTERNS, normalize_nexus_name, normalize_rmp_name  # noqa: F401 (re-exported)
+from etl.candidate_blocking import sort_key
 
 
-def normalize_nexus_name(name: str) -> str:
-    """Convert 'LAST, FIRST' to normalized 'first last'."""
-    parts = name.split(",", 1)
-    if len(parts) == 2:
-        last, first = parts[0].strip(), parts[1].strip()
-        name = f"{first} {last}"
-    name = TITLE_PATTERNS.sub("", name)
-    return " ".join(name.lower().split())
+def match_confidence(name_a: str, name_b: str) -> int:
+    """Return fuzzy match confidence (0-100) using token_sort_ratio."""
+    return fuzz.token_sort_ratio(name_a, name_b)
 
 
-def normalize_rmp_name(name: str) -> str:
-    """Convert 'First Last' to normalized 'first last'."""
-    name = TITLE_PATTERNS.sub("", name)
-    return " ".join(name.lower().split())
+# Characters of a token-sorted key (etl.candidate_blocking.sort_key): full_process
+# leaves lowercase ASCII letters, digits and single spaces
+_KEY_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+_KEY_CHAR_INDEX = {ch: i for i, ch in enumerate(_KEY_ALPHABET)}
 
 
-def match_confidence(name_a: str, name_b: str) -> int:
-    """Return fuzzy match confidence (0-100) using token_sort_ratio."""
-    return fuzz.token_sort_ratio(name_a, name_b)
+def _char_counts(key: str) -> np.ndarray:
+    counts = np.zeros(len(_KEY_ALPHABET), dtype=np.int32)
+    for ch in key:
+        counts[_KEY_CHAR_INDEX[ch]] += 1
+    return counts
+
+
+def _trigrams(normalized: str) -> set[str]:
+    """Character trigrams of each token, padded so word boundaries count.
+
+    Built per token so the set is independent of word order, like token_sort_ratio.
+    """
+    grams = set()
+    for token in normalized.split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class RmpNameIndex:
+    """Character-trigram inverted index over normalized RMP names.
+
+    Build once per roster and pass to match_names. Each lookup first scores
+    the top_k names sharing the most trigrams, then any other name whose
+    character counts could still reach the best score so far. A common first
+    name can crowd the true match out of the top_k, but the second step still
+    finds it, so lookups return what a full scan would.
+    """
+
+    def __init__(self, rmp_names: list[str], top_k: int = 50):
+        self.top_k = top_k
+        self.names = list(rmp_names)
+        self.normalized = [normalize_rmp_name(name) for name in self.names]
+        # token_sort_ratio is fuzz.ratio on these keys
+        self._keys = [sort_key(norm) for norm in self.normalized]
+        self._key_lengths = np.array([len(key) for key in self._keys], dtype=np.float64)
+        self._key_chars = (
+            np.stack([_char_counts(key) for key in self._keys])
+            if self._keys else np.zeros((0, len(_KEY_ALPHABET)), dtype=np.int32)
+        )
+        postings: dict[str, list[int]] = defaultdict(list)
+        gram_counts = []
+        for idx, norm in enumerate(self.normalized):
+            grams = _trigrams(norm)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings[gram].append(idx)
+        self._gram_counts = np.array(gram_counts, dtype=np.float64)
+        self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def candidates(self, norm_query: str) -> list[int]:
+        """Indices of the top_k names by trigram Dice overlap with the query."""
+        query_grams = _trigrams(norm_query)
+        hits = [self._postings[g] for g in query_grams if g in self._postings]
+        if not hits:
+            return []
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        dice = 2 * overlap / (len(query_grams) + self._gram_counts)
+        matched = np.flatnonzero(overlap)
+        if matched.size > self.top_k:
+            # Stable sort keeps lower indices first among equal overlaps
+            order = np.argsort(-dice[matched], kind="stable")[:self.top_k]
+            matched = np.sort(matched[order])
+        return matched.tolist()
+
+    def _score_bounds(self, key: str) -> np.ndarray:
+        """Upper bound on each name's fuzz.ratio against key.
+
+        ratio = 200 * LCS / (la + lb), and a common subsequence cannot use a
+        character more often than both keys contain it.
+        """
+        shared = np.minimum(self._key_chars, _char_counts(key)).sum(axis=1)
+        total = self._key_lengths + len(key)
+        return np.divide(200.0 * shared, total, out=np.full(len(total), 100.0), where=total > 0)
+
+    def best_match(self, norm_query: str, min_score: int = 0) -> tuple[str | None, int]:
+        """Return (raw RMP name, confidence) of the best name for a normalized query.
+
+        Ties go to the earlier name, as in a sequential scan. A best score of
+        at least min_score is exact; a lower one may miss names outside the
+        trigram candidates.
+        """
+        key = sort_key(norm_query)
+        scores: dict[int, int] = {}
+
+        def score(idxs):
+            for idx in idxs:
+                # Rounded like thefuzz, so scores equal match_confidence
+                scores[idx] = int(round(rfuzz.ratio(key, self._keys[idx])))
+
+        score(self.candidates(norm_query))
+        best_score = max(scores.values(), default=0)
+        # int(round(x)) >= s needs x >= s - 0.5; the epsilon absorbs float error
+        cutoff = max(best_score, min_score) - 0.5 - 1e-9
+        reachable = np.flatnonzero(self._score_bounds(key) >= cutoff)
+        score(idx for idx in reachable.tolist() if idx not in scores)
+
+        best_idx = min(scores, key=lambda idx: (-scores[idx], idx), default=None)
+        if best_idx is None or scores[best_idx] == 0:
+            return None, 0
+        return self.names[best_idx], scores[best_idx]
 
 
 def match_names(
     nexus_names: list[str],
-    rmp_names: list[str],
+    rmp_names: list[str] | None,
     auto_threshold: int = 85,
     review_threshold: int = 70,
+    index: RmpNameIndex | None = None,
 ) -> dict:
     """Match Nexus names to RMP names.
 
+    Pass a prebuilt RmpNameIndex as index to reuse it across calls; rmp_names
+    is then ignored. Otherwise an index over rmp_names is built for this call.
+
     Returns dict: {nexus_name: {"rmp_name": str, "confidence": int, "status": str}}
     status is "auto" (>=85), "review" (70-84), or absent if <70.
     """
     matches = {}
-    normalized_rmp = [(name, normalize_rmp_name(name)) for name in rmp_names]
+    if index is None:
+        index = RmpNameIndex(rmp_names or [])
 
     for nexus_name in nexus_names:
         norm_nexus = normalize_nexus_name(nexus_name)
-        best_score = 0
-        best_rmp_raw = None
-
-        for rmp_raw, norm_rmp in normalized_rmp:
-            score = match_confidence(norm_nexus, norm_rmp)
-            if score > best_score:
-                best_score = score
-                best_rmp_raw = rmp_raw
+        best_rmp_raw, best_score = index.best_match(norm_nexus, min_score=review_threshold)
 
         if best_score >= auto_threshold:
             matches[nexus_name] = {
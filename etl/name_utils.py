@@ -1,39 +1,6 @@
 """Utilities for parsing and comparing Nexus professor names."""
 
-import re
-
-
-def parse_nexus_name(name: str) -> dict:
-    """Parse a Nexus-format professor name into components.
-
-    Handles formats:
-      - "HUANG L"       -> {last: "huang", first: "l", is_initial: True}
-      - "CHANG SHIYU"   -> {last: "chang", first: "shiyu", is_initial: False}
-      - "SMITH, JOHN"   -> {last: "smith", first: "john", is_initial: False}
-      - "SMITH, J"      -> {last: "smith", first: "j", is_initial: True}
-      - "O'BRIEN SEAN"  -> {last: "o'brien", first: "sean", is_initial: False}
-    """
-    if not name or not name.strip():
-        return {"last": "", "first": "", "is_initial": False}
-
-    name = name.strip()
-
-    # Comma-separated: "LAST, FIRST"
-    if "," in name:
-        parts = name.split(",", 1)
-        last = parts[0].strip().lower()
-        first = parts[1].strip().lower()
-    else:
-        # Space-separated: "LAST FIRST" — first token is last name
-        # Handle multi-word last names with apostrophes: "O'BRIEN SEAN"
-        tokens = name.split()
-        if len(tokens) == 1:
-            return {"last": tokens[0].lower(), "first": "", "is_initial": False}
-        last = tokens[0].lower()
-        first = " ".join(tokens[1:]).lower()
-
-    is_initial = len(first) == 1 and first.isalpha()
-    return {"last": last, "first": first, "is_initial": is_initial}
+from db.names import parse_nexus_name, parse_professor_name  # noqa: F401 (re-exported)
 
 
 def is_initial_only(name: str) -> bool:
@@ -54,7 +21,8 @@ def find_duplicate_pairs(
 ) -> list[tuple[dict, dict]]:
     """Find abbreviated + full name pairs in the same department.
 
-    Each item in names_with_dept should have keys: id, name, department.
+    Each item in names_with_dept should have keys: id, name, department, and may
+    carry a precomputed "parsed" dict (as from parse_nexus_name) to skip parsing.
     Returns list of (abbreviated, full) tuples where:
       - Both share the same last name and department
       - One has an initial-only first name that matches the other's full first name
@@ -64,7 +32,7 @@ def find_duplicate_pairs(
 
     groups: dict[tuple[str, str], list[dict]] = defaultdict(list)
     for item in names_with_dept:
-        parsed = parse_nexus_name(item["name"])
+        parsed = item.get("parsed") or parse_nexus_name(item["name"])
         key = (parsed["last"], (item.get("department") or "").lower())
         groups[key].append({**item, "_parsed": parsed})
 
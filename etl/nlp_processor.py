@@ -2,7 +2,10 @@ from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 
+from etl.vader_engine import VaderCompoundEngine
+
 _sia = None
+_engine = None
 
 
 def _get_sia():
@@ -19,6 +22,24 @@ def analyze_sentiment(text: str) -> float:
     return _get_sia().polarity_scores(text)["compound"]
 
 
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = VaderCompoundEngine(_get_sia())
+    return _engine
+
+
+def analyze_sentiment_batch(texts: list[str]) -> list[float]:
+    """Return VADER compound scores for many texts, matching analyze_sentiment.
+
+    Uses the precompiled compound-only engine, so tokens and duplicate texts
+    are processed once per batch. Empty or missing texts score 0.0.
+    """
+    engine = _get_engine()
+    cleaned = [t if t and t.strip() else "" for t in texts]
+    return engine.compound_batch(cleaned)
+
+
 def extract_keywords(comments: list[str], top_n: int = 8) -> list[str]:
     """Extract top-N distinctive keywords from a list of comments using TF-IDF."""
     if not comments:
@@ -48,7 +69,9 @@ def process_all_comments(session) -> dict:
 
     Returns stats dict: {processed, keywords_set}.
     """
+    from db.data_version import bump_data_version
     from db.models import RmpRating, RmpComment
+    from db.rating_rollup import refresh_rating_rollups
 
     # Get all comments without sentiment scores
     unprocessed = (
@@ -60,8 +83,9 @@ def process_all_comments(session) -> dict:
     stats = {"processed": 0, "keywords_set": 0}
 
     # Phase 1: Sentiment scoring
-    for comment in unprocessed:
-        comment.sentiment_score = analyze_sentiment(comment.comment_text or "")
+    scores = analyze_sentiment_batch([c.comment_text or "" for c in unprocessed])
+    for comment, score in zip(unprocessed, scores):
+        comment.sentiment_score = score
         stats["processed"] += 1
 
     session.flush()
@@ -81,5 +105,12 @@ def process_all_comments(session) -> dict:
             comments_for_rating[0].keywords = keywords
             stats["keywords_set"] += 1
 
+    if stats["processed"]:
+        # Sentiment and keywords feed the per-professor rating rollups
+        professor_ids = [
+            pid for (pid,) in session.query(RmpRating.professor_id).filter(RmpRating.id.in_(rating_ids))
+        ]
+        refresh_rating_rollups(session, professor_ids)
+        bump_data_version(session)
     session.commit()
     return stats
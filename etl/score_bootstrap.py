@@ -0,0 +1,210 @@
+"""Bootstrap confidence intervals for Gaucho scores.
+
+A score is a point estimate: a professor with one quarter and three comments
+can outrank one with thirty quarters and hundreds of comments. Each
+(professor, course) pair's quarter-level GPAs and the sentiments of its latest
+rating's comments are resampled with replacement, B times, and the score
+recomputed for every resample; the interval is the middle `confidence` share
+of those scores. Quality and difficulty are single RMP aggregates with no
+per-rating data behind them, so they stay fixed (quality is already
+Bayesian-adjusted).
+
+The bootstrap is smoothed: each resampled value gets Gaussian noise with the
+pooled within-group standard deviation, so a pair with a single quarter or a
+single comment gets a wide interval instead of a falsely certain one.
+
+Groups are ragged, so values are flattened with per-group offsets and one
+chunk of groups is resampled at once: a (B x draws) index matrix, one gather,
+one np.add.reduceat for the group sums. There is no per-sample Python loop.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from db.models import ProfessorRatingRollup
+from db.recency import gpa_terms_query, sentiment_comments_query
+
+# Resamples per pair
+BOOTSTRAP_SAMPLES = 1000
+
+# Central share of the bootstrap scores reported as the interval
+CONFIDENCE = 0.95
+
+# Upper bound on resampled values drawn at once (about 64 MB per float64 array)
+MAX_CELLS = 8_000_000
+
+
+class RaggedGroups:
+    """Variable-length groups of values, flattened: group i is values[offsets[i]:offsets[i + 1]].
+
+    Values may carry weights (recency, see db.recency); group means are then
+    weighted means.
+    """
+
+    def __init__(self, groups: list[list[float]], weights: list[list[float]] | None = None):
+        self.counts = np.array([len(g) for g in groups], dtype=np.int64)
+        self.offsets = np.r_[0, np.cumsum(self.counts)]
+        self.values = np.array([v for g in groups for v in g], dtype=np.float64)
+        self.weighted = weights is not None
+        self.weights = (
+            np.array([w for g in weights for w in g], dtype=np.float64) if self.weighted
+            else np.ones(len(self.values))
+        )
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def means(self) -> np.ndarray:
+        """(Weighted) mean of each group, NaN where empty."""
+        if not len(self):
+            return np.empty(0)
+        sums = np.add.reduceat(np.r_[self.values * self.weights, 0.0], self.offsets[:-1])
+        totals = np.add.reduceat(np.r_[self.weights, 0.0], self.offsets[:-1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.counts > 0, sums / totals, np.nan)
+
+    def pooled_std(self) -> float:
+        """Within-group standard deviation pooled over groups with two or more values."""
+        multi = self.counts > 1
+        if not multi.any():
+            return 0.0
+        group = np.repeat(np.arange(len(self)), self.counts)
+        counts = np.maximum(self.counts, 1)
+        group_mean = np.bincount(group, weights=self.values, minlength=len(self)) / counts
+        dev = self.values - group_mean[group]
+        ss = np.bincount(group, weights=dev * dev, minlength=len(self))
+        return float(np.sqrt(ss[multi].sum() / (self.counts[multi] - 1).sum()))
+
+
+def bootstrap_means(
+    groups: RaggedGroups,
+    rows: np.ndarray,
+    n_samples: int,
+    rng: np.random.Generator,
+    bandwidth: float = 0.0,
+) -> np.ndarray:
+    """Smoothed-bootstrap means of the groups at `rows`: (n_samples x len(rows)), NaN for empty groups.
+
+    Each resample draws a group's (value, weight) pairs with replacement and
+    takes their weighted mean.
+    """
+    counts = groups.counts[rows]
+    out = np.full((n_samples, len(rows)), np.nan)
+    filled = np.flatnonzero(counts > 0)
+    if not len(filled):
+        return out
+    counts = counts[filled]
+    starts = groups.offsets[rows[filled]]
+    # One column per draw: group start + a uniform pick among its values
+    draw_start = np.repeat(starts, counts)
+    draw_count = np.repeat(counts, counts)
+    picks = draw_start + (rng.random((n_samples, len(draw_start))) * draw_count).astype(np.int64)
+    bounds = np.r_[0, np.cumsum(counts)[:-1]]
+    if groups.weighted:
+        w = groups.weights[picks]
+        totals = np.add.reduceat(w, bounds, axis=1)
+        means = np.add.reduceat(w * groups.values[picks], bounds, axis=1) / totals
+        if bandwidth:
+            # sum(w_i * e_i) / sum(w_i) for independent N(0, h^2) kernel draws e_i
+            spread = np.sqrt(np.add.reduceat(w * w, bounds, axis=1)) / totals
+            means += rng.normal(0.0, 1.0, means.shape) * (bandwidth * spread)
+    else:
+        sums = np.add.reduceat(groups.values[picks], bounds, axis=1)
+        if bandwidth:
+            # Sum of n independent N(0, h^2) kernel draws
+            sums += rng.normal(0.0, 1.0, sums.shape) * (bandwidth * np.sqrt(counts))
+        means = sums / counts
+    out[:, filled] = means
+    return out
+
+
+def score_intervals(
+    gpas: RaggedGroups,
+    sentiments: RaggedGroups,
+    quality_factor: np.ndarray,
+    difficulty_factor: np.ndarray,
+    weights: dict[str, float] | None = None,
+    n_samples: int = BOOTSTRAP_SAMPLES,
+    confidence: float = CONFIDENCE,
+    seed: int | None = 0,
+    max_cells: int = MAX_CELLS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(low, high) Gaucho score bounds per pair; pair i uses gpas[i] and sentiments[i].
+
+    Factors follow etl.scoring: GPA / 4 and (sentiment + 1) / 2, clipped to
+    [0, 1], 0.5 when a pair has no values. Scores are in 0-100, unrounded.
+    """
+    if weights is None:
+        weights = {"gpa": 0.25, "quality": 0.25, "difficulty": 0.25, "sentiment": 0.25}
+    rng = np.random.default_rng(seed)
+    gpa_h, sent_h = gpas.pooled_std(), sentiments.pooled_std()
+    fixed = (
+        np.asarray(quality_factor, dtype=np.float64) * weights.get("quality", 0.25)
+        + np.asarray(difficulty_factor, dtype=np.float64) * weights.get("difficulty", 0.25)
+    )
+    tail = (1 - confidence) / 2 * 100
+    n_pairs = len(gpas)
+    low, high = np.empty(n_pairs), np.empty(n_pairs)
+
+    # Chunk pairs so each chunk draws at most max_cells values
+    draws = np.cumsum(gpas.counts + sentiments.counts) * n_samples
+    start = 0
+    while start < n_pairs:
+        base = draws[start - 1] if start else 0
+        end = max(start + 1, int(np.searchsorted(draws, base + max_cells, side="right")))
+        rows = np.arange(start, min(end, n_pairs))
+
+        gpa_f = np.clip(bootstrap_means(gpas, rows, n_samples, rng, gpa_h) / 4.0, 0.0, 1.0)
+        sent_f = np.clip((bootstrap_means(sentiments, rows, n_samples, rng, sent_h) + 1) / 2, 0.0, 1.0)
+        scores = (
+            np.nan_to_num(gpa_f, nan=0.5) * weights.get("gpa", 0.25)
+            + np.nan_to_num(sent_f, nan=0.5) * weights.get("sentiment", 0.25)
+            + fixed[rows]
+        )
+        scores = np.clip(scores * 100, 0.0, 100.0)
+        low[rows], high[rows] = np.percentile(scores, [tail, 100 - tail], axis=0)
+        start = rows[-1] + 1
+
+    return low, high
+
+
+def load_score_intervals(
+    session: Session,
+    pairs: list[tuple[int, int, ProfessorRatingRollup]],
+    weights: dict[str, float] | None = None,
+    n_samples: int = BOOTSTRAP_SAMPLES,
+    confidence: float = CONFIDENCE,
+    gpa_half_life_terms: float | None = None,
+    sentiment_half_life_days: float | None = None,
+) -> list[tuple[float, float]]:
+    """Score intervals, rounded like scores, for (professor_id, course_id, rating rollup) pairs.
+
+    Loads every quarter GPA and every latest-rating comment sentiment, with
+    their recency weights when a half-life is given, in one query each, then
+    bootstraps all pairs together.
+    """
+    if not pairs:
+        return []
+    gpa_by_pair: dict[tuple[int, int], list[tuple[float, float]]] = defaultdict(list)
+    for prof_id, course_id, gpa, weight in session.execute(gpa_terms_query(gpa_half_life_terms)):
+        gpa_by_pair[prof_id, course_id].append((gpa, float(weight)))
+    sentiment_by_prof: dict[int, list[tuple[float, float]]] = defaultdict(list)
+    for prof_id, sentiment, weight in session.execute(sentiment_comments_query(sentiment_half_life_days)):
+        sentiment_by_prof[prof_id].append((sentiment, float(weight)))
+
+    def groups(observations: list[list[tuple[float, float]]], half_life: float | None) -> RaggedGroups:
+        values = [[v for v, _ in obs] for obs in observations]
+        if half_life is None:
+            return RaggedGroups(values)
+        return RaggedGroups(values, [[w for _, w in obs] for obs in observations])
+
+    low, high = score_intervals(
+        groups([gpa_by_pair.get((p, c), []) for p, c, _ in pairs], gpa_half_life_terms),
+        groups([sentiment_by_prof.get(p, []) for p, _, _ in pairs], sentiment_half_life_days),
+        np.array([r.quality_factor for _, _, r in pairs]),
+        np.array([r.difficulty_factor for _, _, r in pairs]),
+        weights, n_samples=n_samples, confidence=confidence,
+    )
+    return [(round(float(lo), 2), round(float(hi), 2)) for lo, hi in zip(low, high)]
@@ -43,69 +43,84 @@ def compute_gaucho_score(
 def compute_all_scores(
     session,
     weights: dict[str, float] | None = None,
+    gpa_half_life_terms: float | None = None,
+    sentiment_half_life_days: float | None = None,
 ) -> dict:
     """Compute Gaucho Scores for all matched professors (those with both grades and RMP data).
 
+    Flat GPA is the professor_course_stats mean, the figure the dashboard
+    shows, so the view must be refreshed after grades load. With a half-life,
+    GPA (in terms) or comment sentiment (in days) is a recency-weighted
+    average (db.recency) of the live rows instead; the half-lives are stored
+    with each score. Each score is stored with its bootstrap
+    confidence interval (etl.score_bootstrap).
     Returns stats dict: {computed, skipped}.
     """
     from datetime import datetime, timezone
-    from sqlalchemy import func
-    from db.models import (
-        Professor, Course, GradeDistribution, RmpRating, RmpComment, GauchoScore,
-    )
+    from sqlalchemy import and_, literal
+    from db.course_stats import course_stats_query
+    from db.data_version import bump_data_version
+    from db.models import Professor, RmpRating, GauchoScore, ProfessorRatingRollup
+    from db.recency import recency_gpa_query, recency_sentiment_query
+    from etl.score_bootstrap import load_score_intervals
 
     if weights is None:
         weights = {"gpa": 0.25, "quality": 0.25, "difficulty": 0.25, "sentiment": 0.25}
 
+    decay = {"gpa_half_life_terms": gpa_half_life_terms, "sentiment_half_life_days": sentiment_half_life_days}
+
     stats = {"computed": 0, "skipped": 0}
 
-    # Find all (professor, course) pairs where professor has RMP data
-    pairs = (
-        session.query(
-            Professor.id,
-            GradeDistribution.course_id,
-            func.avg(GradeDistribution.avg_gpa).label("mean_gpa"),
+    # Find all (professor, course) pairs where professor has RMP data; grade
+    # averages come from the professor_course_stats view the pipeline refreshes,
+    # the latest rating's normalized factors from the professor's rating rollup
+    stats_q = course_stats_query(session).subquery()
+    query = (
+        session.query(stats_q.c.professor_id, stats_q.c.course_id)
+        .join(Professor, Professor.id == stats_q.c.professor_id)
+        .outerjoin(ProfessorRatingRollup, ProfessorRatingRollup.professor_id == Professor.id)
+        .filter(
+            Professor.rmp_id.isnot(None),
+            Professor.id.in_(session.query(RmpRating.professor_id)),
         )
-        .join(GradeDistribution, GradeDistribution.professor_id == Professor.id)
-        .join(RmpRating, RmpRating.professor_id == Professor.id)
-        .filter(Professor.rmp_id.isnot(None))
-        .group_by(Professor.id, GradeDistribution.course_id)
-        .all()
     )
-
-    for prof_id, course_id, mean_gpa in pairs:
-        # Get latest RMP rating
-        rating = (
-            session.query(RmpRating)
-            .filter_by(professor_id=prof_id)
-            .order_by(RmpRating.fetched_at.desc())
-            .first()
+    if gpa_half_life_terms is None:
+        query = query.add_columns(stats_q.c.mean_gpa)
+    else:
+        gpa_q = recency_gpa_query(gpa_half_life_terms).subquery()
+        query = query.outerjoin(gpa_q, and_(
+            gpa_q.c.professor_id == stats_q.c.professor_id, gpa_q.c.course_id == stats_q.c.course_id,
+        )).add_columns(gpa_q.c.mean_gpa)
+    query = query.add_entity(ProfessorRatingRollup)
+    if sentiment_half_life_days is None:
+        query = query.add_columns(literal(None))
+    else:
+        sentiment_q = recency_sentiment_query(sentiment_half_life_days).subquery()
+        query = query.outerjoin(sentiment_q, sentiment_q.c.professor_id == Professor.id).add_columns(
+            sentiment_q.c.avg_sentiment
         )
-        if not rating:
+
+    scored = []
+    for prof_id, course_id, mean_gpa, rollup, avg_sentiment in query.all():
+        if rollup is None or rollup.latest_rating_id is None:
             stats["skipped"] += 1
             continue
 
-        # Compute factors
+        # Quality (Bayesian-adjusted), difficulty and flat sentiment factors are
+        # stored by db.rating_rollup; GPA depends on the course
         gpa_f = normalize_gpa(float(mean_gpa)) if mean_gpa else 0.5
-        qual_f = normalize_quality(rating.overall_quality) if rating.overall_quality else 0.5
-        diff_f = normalize_difficulty(rating.difficulty) if rating.difficulty else 0.5
-
-        # Sentiment: average of comments
-        avg_sentiment = (
-            session.query(func.avg(RmpComment.sentiment_score))
-            .join(RmpRating, RmpComment.rmp_rating_id == RmpRating.id)
-            .filter(RmpRating.professor_id == prof_id, RmpComment.sentiment_score.isnot(None))
-            .scalar()
-        )
-        sent_f = (float(avg_sentiment) + 1) / 2 if avg_sentiment is not None else 0.5
-
-        # Bayesian adjust quality
-        if rating.overall_quality and rating.num_ratings:
-            adj_qual = bayesian_adjust(rating.overall_quality, rating.num_ratings, 3.0)
-            qual_f = normalize_quality(adj_qual)
+        sent_f = rollup.sentiment_factor
+        if sentiment_half_life_days is not None:
+            sent_f = (float(avg_sentiment) + 1) / 2 if avg_sentiment is not None else 0.5
+        score = compute_gaucho_score(gpa_f, rollup.quality_factor, rollup.difficulty_factor, sent_f, weights)
 
-        score = compute_gaucho_score(gpa_f, qual_f, diff_f, sent_f, weights)
+        scored.append((prof_id, course_id, rollup, score))
 
+    intervals = load_score_intervals(
+        session, [(p, c, r) for p, c, r, _ in scored], weights,
+        gpa_half_life_terms=gpa_half_life_terms, sentiment_half_life_days=sentiment_half_life_days,
+    )
+    for (prof_id, course_id, _, score), (low, high) in zip(scored, intervals):
         # Upsert: delete old score for this pair, insert new
         session.query(GauchoScore).filter_by(
             professor_id=prof_id, course_id=course_id,
@@ -115,10 +130,15 @@ def compute_all_scores(
             professor_id=prof_id,
             course_id=course_id,
             score=score,
+            score_low=low,
+            score_high=high,
             weights_used=weights,
+            decay_used=decay,
             computed_at=datetime.now(timezone.utc),
         ))
         stats["computed"] += 1
 
+    if stats["computed"]:
+        bump_data_version(session)
     session.commit()
     return stats
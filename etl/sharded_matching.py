@@ -0,0 +1,84 @@
+"""Last-name sharded candidate scoring for the initial-only matching passes.
+
+Passes 1 and 3 only ever pair a Nexus professor with RMP professors that share
+its last name, so the unmatched and unlinked sets split into independent shards
+by last-name key. Each shard is scored independently (initial check plus
+department_id comparison), and the results come back as plain ids.
+Link decisions stay with the caller, which replays them in its own order
+through LinkPlan, so the outcome is the same as a serial run.
+
+Shards are scored in process. Since departments compare as integer ids, a
+shard's scoring costs less than pickling it to a process pool and starting
+the pool, so the pool only added overhead.
+"""
+
+import zlib
+from collections import defaultdict
+
+from db.models import Professor
+from etl.department_mapper import same_department
+from etl.name_utils import initial_matches
+
+# Shards per worker
+SHARDS_PER_WORKER = 4
+
+# (id, last_name, first_name, department_id), plain rows without ORM state
+_Row = tuple[int, str, str | None, int | None]
+
+
+def shard_index(last_name: str, n_shards: int) -> int:
+    """Stable shard for a last-name key (unlike hash(), the same in every process)."""
+    return zlib.crc32(last_name.encode("utf-8")) % n_shards
+
+
+def score_shard(shard: tuple[list[_Row], list[_Row]]) -> list[tuple[int, list[tuple[int, bool]]]]:
+    """Score one shard: each initial-only Nexus row against same-last-name RMP rows.
+
+    Returns (nexus_id, [(rmp_id, dept_match), ...]) with RMP rows in input order.
+    """
+    nexus_rows, rmp_rows = shard
+    rmp_by_last: dict[str, list[_Row]] = defaultdict(list)
+    for row in rmp_rows:
+        rmp_by_last[row[1]].append(row)
+
+    scored = []
+    for nexus_id, last_name, first_name, department_id in nexus_rows:
+        scored.append((nexus_id, [
+            (rmp_id, same_department(department_id, rmp_dept))
+            for rmp_id, _, rmp_first, rmp_dept in rmp_by_last.get(last_name, [])
+            if initial_matches(first_name, rmp_first)
+        ]))
+    return scored
+
+
+def sharded_initial_candidates(
+    nexus_profs: list[Professor],
+    rmp_profs: list[Professor],
+    workers: int,
+) -> dict[int, list[tuple[Professor, bool]]]:
+    """Map each initial-only Nexus professor id to its (RMP professor, dept_match) candidates.
+
+    Candidates are the RMP professors with a name, the same last name and a
+    matching first initial, in rmp_profs order. ``workers`` sets the number of
+    shards; they are scored one after another in this process.
+    """
+    n_shards = max(workers, 1) * SHARDS_PER_WORKER
+    shards: list[tuple[list[_Row], list[_Row]]] = [([], []) for _ in range(n_shards)]
+    for prof in nexus_profs:
+        if prof.is_initial and prof.last_name:
+            shards[shard_index(prof.last_name, n_shards)][0].append(
+                (prof.id, prof.last_name, prof.first_name, prof.department_id)
+            )
+    for rmp in rmp_profs:
+        if rmp.name_rmp and rmp.last_name:
+            shards[shard_index(rmp.last_name, n_shards)][1].append(
+                (rmp.id, rmp.last_name, rmp.first_name, rmp.department_id)
+            )
+    shards = [shard for shard in shards if shard[0] and shard[1]]
+
+    rmp_by_id = {rmp.id: rmp for rmp in rmp_profs}
+    candidates: dict[int, list[tuple[Professor, bool]]] = {}
+    for shard in shards:
+        for nexus_id, hits in score_shard(shard):
+            candidates[nexus_id] = [(rmp_by_id[rmp_id], dept) for rmp_id, dept in hits]
+    return candidates
@@ -0,0 +1,247 @@
+"""Compound-only VADER scoring engine for batches of comments.
+
+Mirrors the rules of ``vaderSentiment.SentimentIntensityAnalyzer.polarity_scores``
+but only computes the ``compound`` score, which is all the pipeline stores.
+The lexicon, booster and negation tables are compiled once, and per-token work
+(punctuation stripping, lowercasing, caps detection) is memoised across the
+whole batch so repeated words are only processed once.
+"""
+
+import math
+import string
+
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT,
+    C_INCR,
+    N_SCALAR,
+    NEGATE,
+    SPECIAL_CASES,
+    SentimentIntensityAnalyzer,
+)
+
+# Cap on memoised tokens kept between batches (long-running scheduler process)
+_MAX_TOKEN_CACHE = 200_000
+
+_SO_THIS = ("so", "this")
+_OR_NOR = ("or", "nor")
+
+
+class VaderCompoundEngine:
+    """Precompiled VADER lexicon that scores texts to a compound value only."""
+
+    def __init__(self, analyzer: SentimentIntensityAnalyzer | None = None):
+        analyzer = analyzer or SentimentIntensityAnalyzer()
+        self.lexicon: dict[str, float] = analyzer.lexicon
+        # Only single characters can ever match in polarity_scores' per-char scan
+        self.emojis: dict[str, str] = {k: v for k, v in analyzer.emojis.items() if len(k) == 1}
+        self.negate: frozenset[str] = frozenset(NEGATE)
+        # raw whitespace token -> (lowercase, isupper); shared across batches
+        self._token_cache: dict[str, tuple[str, bool]] = {}
+
+    def _replace_emojis(self, text: str) -> str:
+        out = []
+        prev_space = True
+        for ch in text:
+            description = self.emojis.get(ch)
+            if description is not None:
+                if not prev_space:
+                    out.append(" ")
+                out.append(description)
+                prev_space = False
+            else:
+                out.append(ch)
+                prev_space = ch == " "
+        return "".join(out)
+
+    def _token(self, raw: str) -> tuple[str, bool]:
+        cached = self._token_cache.get(raw)
+        if cached is None:
+            stripped = raw.strip(string.punctuation)
+            token = raw if len(stripped) <= 2 else stripped
+            cached = (token.lower(), token.isupper())
+            self._token_cache[raw] = cached
+        return cached
+
+    def _negated(self, word_lower: str) -> bool:
+        return word_lower in self.negate or "n't" in word_lower
+
+    def _scalar_inc_dec(self, lower: str, upper: bool, valence: float, is_cap_diff: bool) -> float:
+        scalar = 0.0
+        if lower in BOOSTER_DICT:
+            scalar = BOOSTER_DICT[lower]
+            if valence < 0:
+                scalar *= -1
+            if upper and is_cap_diff:
+                if valence > 0:
+                    scalar += C_INCR
+                else:
+                    scalar -= C_INCR
+        return scalar
+
+    def _negation_check(self, valence: float, lowers: list[str], start_i: int, i: int) -> float:
+        if start_i == 0:
+            if self._negated(lowers[i - 1]):
+                valence = valence * N_SCALAR
+        if start_i == 1:
+            if lowers[i - 2] == "never" and lowers[i - 1] in _SO_THIS:
+                valence = valence * 1.25
+            elif lowers[i - 2] == "without" and lowers[i - 1] == "doubt":
+                pass
+            elif self._negated(lowers[i - 2]):
+                valence = valence * N_SCALAR
+        if start_i == 2:
+            if (lowers[i - 3] == "never" and lowers[i - 2] in _SO_THIS) or lowers[i - 1] in _SO_THIS:
+                valence = valence * 1.25
+            elif lowers[i - 3] == "without" and (lowers[i - 2] == "doubt" or lowers[i - 1] == "doubt"):
+                pass
+            elif self._negated(lowers[i - 3]):
+                valence = valence * N_SCALAR
+        return valence
+
+    @staticmethod
+    def _special_idioms_check(valence: float, lowers: list[str], i: int) -> float:
+        onezero = f"{lowers[i - 1]} {lowers[i]}"
+        twoonezero = f"{lowers[i - 2]} {lowers[i - 1]} {lowers[i]}"
+        twoone = f"{lowers[i - 2]} {lowers[i - 1]}"
+        threetwoone = f"{lowers[i - 3]} {lowers[i - 2]} {lowers[i - 1]}"
+        threetwo = f"{lowers[i - 3]} {lowers[i - 2]}"
+
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASES:
+                valence = SPECIAL_CASES[seq]
+                break
+
+        if len(lowers) - 1 > i:
+            zeroone = f"{lowers[i]} {lowers[i + 1]}"
+            if zeroone in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroone]
+        if len(lowers) - 1 > i + 1:
+            zeroonetwo = f"{lowers[i]} {lowers[i + 1]} {lowers[i + 2]}"
+            if zeroonetwo in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroonetwo]
+
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in BOOSTER_DICT:
+                valence = valence + BOOSTER_DICT[n_gram]
+        return valence
+
+    def _least_check(self, valence: float, lowers: list[str], i: int) -> float:
+        lexicon = self.lexicon
+        if i > 1 and lowers[i - 1] not in lexicon and lowers[i - 1] == "least":
+            if lowers[i - 2] != "at" and lowers[i - 2] != "very":
+                valence = valence * N_SCALAR
+        elif i > 0 and lowers[i - 1] not in lexicon and lowers[i - 1] == "least":
+            valence = valence * N_SCALAR
+        return valence
+
+    @staticmethod
+    def _but_check(lowers: list[str], sentiments: list[float]) -> list[float]:
+        # Deliberately reproduces VADER's index()-based update, including its
+        # behaviour on repeated values, so scores stay bit-for-bit identical.
+        if "but" in lowers:
+            bi = lowers.index("but")
+            for sentiment in sentiments:
+                si = sentiments.index(sentiment)
+                if si < bi:
+                    sentiments.pop(si)
+                    sentiments.insert(si, sentiment * 0.5)
+                elif si > bi:
+                    sentiments.pop(si)
+                    sentiments.insert(si, sentiment * 1.5)
+        return sentiments
+
+    @staticmethod
+    def _punctuation_emphasis(text: str) -> float:
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        return ep_count * 0.292 + qm_amplifier
+
+    def compound(self, text: str) -> float:
+        """Return the VADER compound score for a single text."""
+        if not text.isascii():
+            text = self._replace_emojis(text)
+        text = text.strip()
+
+        tokens = [self._token(raw) for raw in text.split()]
+        if not tokens:
+            return 0.0
+        lowers = [t[0] for t in tokens]
+        uppers = [t[1] for t in tokens]
+        n = len(tokens)
+        allcaps = sum(uppers)
+        is_cap_diff = 0 < n - allcaps < n
+
+        lexicon = self.lexicon
+        sentiments: list[float] = []
+        for i, lower in enumerate(lowers):
+            if lower in BOOSTER_DICT:
+                sentiments.append(0)
+                continue
+            if i < n - 1 and lower == "kind" and lowers[i + 1] == "of":
+                sentiments.append(0)
+                continue
+
+            base = lexicon.get(lower)
+            if base is None:
+                sentiments.append(0)
+                continue
+
+            valence = base
+            if lower == "no" and i != n - 1 and lowers[i + 1] in lexicon:
+                valence = 0.0
+            if (i > 0 and lowers[i - 1] == "no") \
+                    or (i > 1 and lowers[i - 2] == "no") \
+                    or (i > 2 and lowers[i - 3] == "no" and lowers[i - 1] in _OR_NOR):
+                valence = base * N_SCALAR
+
+            if uppers[i] and is_cap_diff:
+                if valence > 0:
+                    valence += C_INCR
+                else:
+                    valence -= C_INCR
+
+            for start_i in range(0, 3):
+                j = i - (start_i + 1)
+                if i > start_i and lowers[j] not in lexicon:
+                    s = self._scalar_inc_dec(lowers[j], uppers[j], valence, is_cap_diff)
+                    if start_i == 1 and s != 0:
+                        s = s * 0.95
+                    if start_i == 2 and s != 0:
+                        s = s * 0.9
+                    valence = valence + s
+                    valence = self._negation_check(valence, lowers, start_i, i)
+                    if start_i == 2:
+                        valence = self._special_idioms_check(valence, lowers, i)
+
+            valence = self._least_check(valence, lowers, i)
+            sentiments.append(valence)
+
+        sentiments = self._but_check(lowers, sentiments)
+
+        sum_s = float(sum(sentiments))
+        punct_emph_amplifier = self._punctuation_emphasis(text)
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+
+        compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+        compound = max(-1.0, min(1.0, compound))
+        return round(compound, 4)
+
+    def compound_batch(self, texts: list[str]) -> list[float]:
+        """Score many texts, computing each distinct text only once."""
+        if len(self._token_cache) > _MAX_TOKEN_CACHE:
+            self._token_cache.clear()
+        seen: dict[str, float] = {}
+        scores = []
+        for text in texts:
+            score = seen.get(text)
+            if score is None:
+                score = self.compound(text)
+                seen[text] = score
+            scores.append(score)
+        return scores
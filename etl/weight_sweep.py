@@ -0,0 +1,175 @@
+"""What-if weight sweeps: how stable is each course's ranking as the weights move?
+
+Every (professor, course) pair's Gaucho score is a dot product of its four
+normalized factors with the weights, so scoring W weight vectors at once is a
+(pairs x 4) @ (4 x W) matrix product. The factor matrix is loaded with one
+query (rating factors from the rating rollups, GPA from the course stats view),
+rows sorted by course then professor id so each course is a contiguous
+segment. Per-course ranks for every weight vector come from one stable argsort
+per chunk of courses, ties going to the lower professor id as in
+dashboard.queries.rank_professors.
+"""
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db.course_stats import course_stats_query
+from db.models import ProfessorRatingRollup
+
+# Column order of the factor matrix and of weight vectors
+FACTORS = ("gpa", "quality", "difficulty", "sentiment")
+
+# Upper bound on pairs x weight vectors scored at once (about 64 MB per float64 array)
+MAX_CELLS = 8_000_000
+
+
+class FactorMatrix:
+    """Normalized score factors of every (professor, course) pair, grouped by course."""
+
+    def __init__(self, professor_ids, course_ids, factors):
+        order = np.lexsort((professor_ids, course_ids))
+        self.professor_ids = np.asarray(professor_ids, dtype=np.int64)[order]
+        self.course_ids = np.asarray(course_ids, dtype=np.int64)[order]
+        self.factors = np.asarray(factors, dtype=np.float64).reshape(-1, len(FACTORS))[order]
+        # Start row of each course's segment, plus the end sentinel
+        starts = np.flatnonzero(np.r_[True, self.course_ids[1:] != self.course_ids[:-1]])
+        self.bounds = np.r_[starts, len(self.course_ids)] if len(self.course_ids) else np.zeros(1, np.int64)
+
+    def __len__(self) -> int:
+        return len(self.course_ids)
+
+    @classmethod
+    def load(cls, session: Session, min_year: int | None = None) -> "FactorMatrix":
+        """One query over every pair the dashboard would rank (min_year as on the course page)."""
+        stats = course_stats_query(session, min_year).subquery()
+        rows = session.execute(
+            select(
+                stats.c.professor_id, stats.c.course_id, stats.c.mean_gpa,
+                func.coalesce(ProfessorRatingRollup.quality_factor, 0.5),
+                func.coalesce(ProfessorRatingRollup.difficulty_factor, 0.5),
+                func.coalesce(ProfessorRatingRollup.sentiment_factor, 0.5),
+            )
+            .outerjoin(ProfessorRatingRollup, ProfessorRatingRollup.professor_id == stats.c.professor_id)
+        ).all()
+        if not rows:
+            return cls([], [], np.empty((0, len(FACTORS))))
+        professor_ids, course_ids, mean_gpa, *rating = zip(*rows)
+        gpa = np.array([float(g) if g else np.nan for g in mean_gpa])
+        # normalize_gpa, with 0.5 for a missing (or zero) GPA
+        gpa_f = np.where(np.isnan(gpa), 0.5, np.clip(gpa / 4.0, 0.0, 1.0))
+        return cls(professor_ids, course_ids, np.column_stack([gpa_f, *rating]))
+
+
+def sample_weights(
+    n: int,
+    center: dict[str, float] | None = None,
+    concentration: float = 20.0,
+    seed: int | None = None,
+) -> np.ndarray:
+    """n weight vectors (rows summing to 1, in FACTORS order) from a Dirichlet distribution.
+
+    Uniform over all weightings when center is None; otherwise spread around
+    center, more tightly as concentration grows.
+    """
+    rng = np.random.default_rng(seed)
+    if center is None:
+        alpha = np.ones(len(FACTORS))
+    else:
+        base = np.array([center.get(f, 0.0) for f in FACTORS], dtype=np.float64)
+        alpha = np.maximum(base / base.sum() * concentration, 1e-3)
+    return rng.dirichlet(alpha, size=n)
+
+
+def _weight_matrix(weights: dict[str, float]) -> np.ndarray:
+    w = np.array([weights.get(f, 0.25) for f in FACTORS], dtype=np.float64)
+    return w / w.sum() if w.sum() > 0 else w
+
+
+def _chunk_ranks(factors: np.ndarray, local_course: np.ndarray, seg_start: np.ndarray,
+                 weights: np.ndarray) -> np.ndarray:
+    """0-based rank of each row within its course, for every weight vector (W x rows)."""
+    scores = np.clip(weights @ factors.T * 100, 0.0, 100.0)
+    # Course first, then score descending; stable, so ties keep professor id order
+    order = np.argsort(local_course * 1000.0 - scores, axis=1, kind="stable")
+    ranks = np.empty(order.shape, dtype=np.int32)
+    position = (np.arange(order.shape[1]) - seg_start).astype(np.int32)
+    np.put_along_axis(ranks, order, np.broadcast_to(position, order.shape), axis=1)
+    return ranks
+
+
+def weight_sweep(
+    matrix: FactorMatrix,
+    weights: np.ndarray,
+    baseline: dict[str, float] | None = None,
+    max_cells: int = MAX_CELLS,
+) -> list[dict]:
+    """Rank stability of every course across the rows of weights (W x 4, FACTORS order).
+
+    For each course, returns the baseline ranking's #1 and how often it stays
+    #1, how many professors are #1 under some weighting, and the mean Spearman
+    correlation of each weighting's ranking with the baseline's (1.0 for a
+    single professor). Per professor: baseline rank, share of weightings where
+    they rank #1, and their mean, best and worst rank. Ranks are 1-based;
+    baseline defaults to equal weights.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    base = _weight_matrix(baseline or {})[None, :]
+    n_weights = len(weights)
+    bounds = matrix.bounds
+    results = []
+
+    course = 0
+    n_courses = len(bounds) - 1
+    while course < n_courses:
+        # As many whole courses as fit in max_cells (at least one)
+        end = course + 1
+        while end < n_courses and (bounds[end + 1] - bounds[course]) * n_weights <= max_cells:
+            end += 1
+        lo, hi = bounds[course], bounds[end]
+        sizes = np.diff(bounds[course:end + 1])
+        local_course = np.repeat(np.arange(end - course), sizes)
+        seg_start = np.repeat(bounds[course:end] - lo, sizes)
+
+        factors = matrix.factors[lo:hi]
+        ranks = _chunk_ranks(factors, local_course, seg_start, weights)
+        base_rank = _chunk_ranks(factors, local_course, seg_start, base)[0]
+
+        is_top = ranks == 0
+        top_rate = is_top.mean(axis=0)
+        mean_rank = ranks.mean(axis=0) + 1
+        best_rank = ranks.min(axis=0) + 1
+        worst_rank = ranks.max(axis=0) + 1
+        seg_starts = bounds[course:end] - lo
+        d2 = (ranks - base_rank).astype(np.float64) ** 2
+        sum_d2 = np.add.reduceat(d2, seg_starts, axis=1)
+        n = sizes.astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spearman = np.where(n > 1, 1 - 6 * sum_d2 / (n * (n * n - 1)), 1.0).mean(axis=0)
+        ever_top = np.add.reduceat(is_top.any(axis=0).astype(np.int64), seg_starts)
+
+        for i in range(end - course):
+            a, b = seg_starts[i], seg_starts[i] + sizes[i]
+            top = a + int(np.argmin(base_rank[a:b]))
+            results.append({
+                "course_id": int(matrix.course_ids[lo + a]),
+                "professors": int(sizes[i]),
+                "baseline_top": int(matrix.professor_ids[lo + top]),
+                "baseline_top_rate": round(float(top_rate[top]), 4),
+                "distinct_tops": int(ever_top[i]),
+                "mean_spearman": round(float(spearman[i]), 4),
+                "professor_stats": [
+                    {
+                        "professor_id": int(matrix.professor_ids[lo + r]),
+                        "baseline_rank": int(base_rank[r]) + 1,
+                        "top_rate": round(float(top_rate[r]), 4),
+                        "mean_rank": round(float(mean_rank[r]), 2),
+                        "best_rank": int(best_rank[r]),
+                        "worst_rank": int(worst_rank[r]),
+                    }
+                    for r in range(a, b)
+                ],
+            })
+        course = end
+
+    return results
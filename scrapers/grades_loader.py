@@ -1,4 +1,9 @@
+from datetime import datetime, timezone
+
+from db.course_stats import refresh_professor_course_stats
+from db.data_version import bump_data_version
 from db.models import Professor, Course, GradeDistribution
+from db.terms import term_ordinal
 
 GRADE_FIELDS = [
     "a_plus", "a", "a_minus", "b_plus", "b", "b_minus",
@@ -35,8 +40,7 @@ def load_grades_to_db(rows: list[dict], session) -> int:
         existing = session.query(GradeDistribution).filter_by(
             professor_id=prof.id,
             course_id=course.id,
-            quarter=row["quarter"],
-            year=row["year"],
+            term_ordinal=term_ordinal(row["year"], row["quarter"]),
         ).first()
         if existing:
             continue
@@ -50,7 +54,12 @@ def load_grades_to_db(rows: list[dict], session) -> int:
             **{f: row.get(f, 0) for f in GRADE_FIELDS},
         )
         session.add(grade)
+        # New grades can make a professor matchable; flag it for incremental matching
+        prof.updated_at = datetime.now(timezone.utc)
         inserted += 1
 
+    if inserted:
+        refresh_professor_course_stats(session)
+        bump_data_version(session)
     session.commit()
     return inserted
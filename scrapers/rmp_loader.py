@@ -1,5 +1,7 @@
 import re
 from datetime import datetime, timezone, timedelta
+from db.data_version import bump_data_version
+from db.rating_rollup import refresh_rating_rollups
 from db.models import Professor, RmpRating, RmpComment, GradeDistribution
 
 
@@ -109,5 +111,7 @@ def load_rmp_teacher_to_db(
         )
         session.add(rmp_comment)
 
+    refresh_rating_rollups(session, [prof.id])
+    bump_data_version(session)
     session.commit()
     return prof
@@ -2,7 +2,7 @@ import logging
 import time
 import random
 
-from db.models import Professor, RmpRating
+from db.models import Professor, ProfessorRatingRollup
 from scrapers.rmp_loader import get_active_professors, is_stale, load_rmp_teacher_to_db
 from scrapers.rmp_scraper import RmpScraper
 from etl.name_matcher import normalize_nexus_name, normalize_rmp_name, match_confidence
@@ -33,13 +33,8 @@ def scrape_active_professors(
 
     for i, (prof_id, nexus_name) in enumerate(prof_ids):
         # Check if data is already fresh
-        latest_rating = (
-            session.query(RmpRating)
-            .filter_by(professor_id=prof_id)
-            .order_by(RmpRating.fetched_at.desc())
-            .first()
-        )
-        fetched_at = latest_rating.fetched_at if latest_rating else None
+        rollup = session.get(ProfessorRatingRollup, prof_id)
+        fetched_at = rollup.latest_fetched_at if rollup else None
         if not is_stale(fetched_at, max_age_days=max_age_days):
             stats["already_fresh"] += 1
             continue
@@ -0,0 +1,112 @@
+"""Latency benchmark: ILIKE '%query%' course search vs search_courses vs CourseIndex.
+
+Seeds a synthetic catalog into the database at DATABASE_URL inside a
+transaction that is rolled back, then times a mix of dashboard-style queries
+(code prefixes, spaced/lowercase codes, code fragments, titles with typos)
+through the original ILIKE scan, through search_courses and through the
+dashboard's in-memory CourseIndex, reporting median and p95 latency per query. The fuzzy tier uses pg_trgm when the extension is
+installed and an ILIKE fallback otherwise; the header says which ran.
+
+Usage:
+    python scripts/bench_course_search.py                  # 50k courses
+    python scripts/bench_course_search.py --courses 10000 --repeat 50
+"""
+import argparse
+import random
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from dashboard.course_index import CourseIndex
+from dashboard.queries import _has_trigram, search_courses
+from db.connection import get_engine
+from db.models import Course
+from db.course_search import course_search_text, normalize_course_code
+from etl.department_mapper import DEPT_MAP
+
+_WORDS = [
+    "introduction", "advanced", "topics", "theory", "methods", "analysis", "systems",
+    "design", "linear", "algebra", "probability", "statistics", "data", "structures",
+    "algorithms", "history", "literature", "culture", "society", "laboratory", "seminar",
+]
+
+QUERIES = ["CMPSC1", "cmpsc 8", "pstat 120", "130A", "linear algbra", "probabilty statistics"]
+
+
+def seed(session: Session, n_courses: int, seed_: int = 0) -> None:
+    rng = random.Random(seed_)
+    codes = [c.replace(" ", "") for c in DEPT_MAP]
+    rows, seen = [], set()
+    while len(rows) < n_courses:
+        code = f"{rng.choice(codes)}{rng.randint(1, 299)}{rng.choice(['', 'A', 'B', 'C', 'L', 'H'])}"
+        code = f"{code}X{len(rows)}" if code in seen else code
+        seen.add(code)
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 5))).title()
+        rows.append({
+            "code": code, "title": title, "department": code[:4],
+            "code_normalized": normalize_course_code(code),
+            "search_text": course_search_text(code, title),
+        })
+    session.execute(insert(Course), rows)
+    session.execute(text("ANALYZE courses"))
+
+
+def legacy_search(session: Session, query: str) -> list[Course]:
+    return (
+        session.query(Course)
+        .filter(Course.code.ilike(f"%{query.replace(' ', '')}%"))
+        .order_by(Course.code)
+        .limit(20)
+        .all()
+    )
+
+
+def _time(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard course search latency")
+    parser.add_argument("--courses", type=int, default=50_000, help="Synthetic catalog size")
+    parser.add_argument("--repeat", type=int, default=100, help="Timed runs per query")
+    args = parser.parse_args()
+
+    with get_engine().connect() as conn:
+        outer = conn.begin()
+        session = Session(bind=conn)
+        seed(session, args.courses)
+
+        mode = "pg_trgm" if _has_trigram(session) else "ILIKE fallback (pg_trgm missing)"
+        start = time.perf_counter()
+        index = CourseIndex.load(session)
+        load_ms = (time.perf_counter() - start) * 1000
+        print(f"catalog: {args.courses} courses, fuzzy tier: {mode}, index load {load_ms:.0f} ms")
+        print(f"{'query':24} {'ILIKE p50/p95 ms':>18} {'search p50/p95 ms':>19} "
+              f"{'index p50/p95 ms':>18}  top hit")
+        for query in QUERIES:
+            old = _time(lambda: legacy_search(session, query), args.repeat)
+            new = _time(lambda: search_courses(session, query), args.repeat)
+            mem = _time(lambda: index.search(query), args.repeat)
+            hits = index.search(query)
+            top = hits[0]["code"] if hits else "-"
+            print(f"{query!r:24} {old[0]:8.2f} / {old[1]:6.2f}  {new[0]:8.2f} / {new[1]:6.2f} "
+                  f"{mem[0]:8.3f} / {mem[1]:6.3f}  {top}")
+
+        session.close()
+        outer.rollback()
+
+
+if __name__ == "__main__":
+    main()
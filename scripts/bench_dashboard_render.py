@@ -0,0 +1,132 @@
+"""Rerender benchmark: cost of moving a weight slider on a large course page.
+
+Seeds one course taught by many instructors (grade history, RMP rating and
+comments each) into the database at DATABASE_URL, drives the dashboard with
+Streamlit's AppTest, and times the rerun caused by moving a weight slider,
+after a warm-up run so query results are already cached. Also counts the
+Plotly charts built per rerun. The seeded rows are deleted afterwards.
+
+Usage:
+    python scripts/bench_dashboard_render.py                    # 45 instructors
+    python scripts/bench_dashboard_render.py --app /tmp/old_app.py --instructors 60
+"""
+import argparse
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import delete, select
+from streamlit.testing.v1 import AppTest
+
+from db.connection import get_session
+from db.course_stats import refresh_professor_course_stats
+from db.data_version import bump_data_version
+from db.rating_rollup import refresh_rating_rollups
+from db.models import Course, GradeDistribution, Professor, RmpComment, RmpRating
+
+COURSE_CODE = "BENCHRENDER101"
+_QUARTERS = ["Winter", "Spring", "Fall"]
+
+
+def seed(n_instructors: int) -> None:
+    session = get_session()
+    course = Course(code=COURSE_CODE, title="Render Benchmark", department="BENCH")
+    session.add(course)
+    session.flush()
+    for i in range(n_instructors):
+        prof = Professor(
+            name_nexus=f"BENCH{i:03d}, PAT", name_rmp=f"Pat Bench{i:03d}",
+            rmp_id=990_000 + i, department="BENCH",
+        )
+        session.add(prof)
+        session.flush()
+        for q in range(8):
+            session.add(GradeDistribution(
+                professor_id=prof.id, course_id=course.id,
+                quarter=_QUARTERS[q % 3], year=2018 + q, avg_gpa=2.5 + (i % 10) / 10,
+                a=10 + i % 7, b=8, c=3, f=1,
+            ))
+        rating = RmpRating(
+            professor_id=prof.id, overall_quality=2.0 + (i % 30) / 10,
+            difficulty=1.5 + (i % 25) / 10, would_take_again_pct=60.0, num_ratings=20,
+        )
+        session.add(rating)
+        session.flush()
+        session.add_all([
+            RmpComment(rmp_rating_id=rating.id, comment_text=f"Comment {c} about bench {i}",
+                       sentiment_score=0.1 * (c - 2))
+            for c in range(5)
+        ])
+    refresh_professor_course_stats(session)
+    refresh_rating_rollups(session)
+    bump_data_version(session)
+    session.commit()
+    session.close()
+
+
+def cleanup() -> None:
+    session = get_session()
+    prof_ids = select(Professor.id).where(Professor.name_nexus.like("BENCH___, PAT"))
+    rating_ids = select(RmpRating.id).where(RmpRating.professor_id.in_(prof_ids))
+    session.execute(delete(RmpComment).where(RmpComment.rmp_rating_id.in_(rating_ids)))
+    session.execute(delete(RmpRating).where(RmpRating.professor_id.in_(prof_ids)))
+    session.execute(delete(GradeDistribution).where(GradeDistribution.professor_id.in_(prof_ids)))
+    session.execute(delete(Professor).where(Professor.name_nexus.like("BENCH___, PAT")))
+    session.execute(delete(Course).where(Course.code == COURSE_CODE))
+    refresh_professor_course_stats(session)
+    bump_data_version(session)
+    session.commit()
+    session.close()
+
+
+def _count(node, kind: str) -> int:
+    n = 1 if getattr(node, "type", None) == kind else 0
+    for child in getattr(node, "children", {}).values():
+        n += _count(child, kind)
+    return n
+
+
+def bench(app_path: str, repeat: int) -> tuple[float, float, int]:
+    """(cold page ms, median slider rerun ms, charts per rerun)."""
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.run()
+    start = time.perf_counter()
+    at.text_input[0].input(COURSE_CODE).run()
+    cold = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception)
+
+    samples = []
+    slider = at.slider[0]
+    for i in range(repeat):
+        start = time.perf_counter()
+        slider.set_value(0.30 + 0.05 * (i % 10)).run()
+        samples.append((time.perf_counter() - start) * 1000)
+        slider = at.slider[0]
+    return cold, statistics.median(samples), _count(at._tree, "plotly_chart")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard slider rerender cost")
+    parser.add_argument("--app", default=os.path.join(os.path.dirname(__file__), "..", "dashboard", "app.py"))
+    parser.add_argument("--instructors", type=int, default=45, help="Instructors on the course")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed slider moves")
+    args = parser.parse_args()
+
+    cleanup()
+    seed(args.instructors)
+    try:
+        cold, rerun, charts = bench(args.app, args.repeat)
+    finally:
+        cleanup()
+    print(f"app:          {args.app}")
+    print(f"instructors:  {args.instructors}")
+    print(f"course page:  {cold:.0f} ms (first load)")
+    print(f"slider move:  {rerun:.0f} ms median rerun, {charts} Plotly charts in the page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark pass-4 duplicate merging: per-grade-row loop vs set-based merge.
+
+Seeds synthetic abbreviated/full-name professor pairs (each abbreviation has
+grade rows, half of which collide with the full-name professor's) into the
+database at DATABASE_URL, runs the original per-row merge and the set-based
+_pass4_deduplication, and reports wall time and SQL statement counts. Each run
+happens inside a transaction that is rolled back, so the database is left
+untouched.
+
+Usage:
+    python scripts/bench_dedup.py                       # 3000 pairs x 8 grades
+    python scripts/bench_dedup.py --pairs 500 --grades 4
+"""
+import argparse
+import string
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from db.connection import get_engine
+from db.models import Course, GradeDistribution, Professor
+from etl.enhanced_matcher import _pass4_deduplication
+from etl.name_utils import find_duplicate_pairs
+from db.terms import season_of, term_ordinal
+
+_QUARTERS = ["Winter", "Spring", "Summer", "Fall"]
+
+
+def _last_name(i: int) -> str:
+    letters = []
+    for _ in range(4):
+        i, r = divmod(i, 26)
+        letters.append(string.ascii_uppercase[r])
+    return "DUP" + "".join(letters)
+
+
+def seed(session: Session, n_pairs: int, n_grades: int) -> None:
+    course_ids = session.scalars(
+        insert(Course).returning(Course.id),
+        [{"code": f"BENCH {c}", "department": "BENCH"} for c in range(n_grades)],
+    ).all()
+    prof_ids = session.scalars(
+        insert(Professor).returning(Professor.id, sort_by_parameter_order=True),
+        [
+            {"name_nexus": f"{_last_name(i)} {first}", "department": "BENCH",
+             "last_name": _last_name(i).lower(), "first_name": first.lower(),
+             "is_initial": len(first) == 1}
+            for i in range(n_pairs) for first in ("S", "SAM")
+        ],
+    ).all()
+
+    grades = []
+    for abbr_id, full_id in zip(prof_ids[::2], prof_ids[1::2]):
+        for g, course_id in enumerate(course_ids):
+            quarter = _QUARTERS[g % 4]
+            term = {"course_id": course_id, "season": season_of(quarter), "year": 2024,
+                    "term_ordinal": term_ordinal(2024, quarter), "a": 10}
+            grades.append({"professor_id": abbr_id, **term})
+            if g % 2 == 0:
+                grades.append({"professor_id": full_id, **term})
+    session.execute(insert(GradeDistribution), grades)
+    session.commit()
+
+
+def legacy_pass4(session: Session) -> dict:
+    """The per-row merge pass 4 used before the set-based rewrite."""
+    stats = {"merged": 0}
+    all_nexus = session.query(Professor).filter(Professor.name_nexus.isnot(None)).all()
+    pairs = find_duplicate_pairs([
+        {"id": p.id, "name": p.name_nexus, "department": p.department or "",
+         "parsed": {"last": p.last_name, "first": p.first_name, "is_initial": p.is_initial}}
+        for p in all_nexus
+    ])
+    for abbr_info, full_info in pairs:
+        abbr = session.get(Professor, abbr_info["id"])
+        full = session.get(Professor, full_info["id"])
+        if not abbr or not full:
+            continue
+        for grade in list(abbr.grades):
+            existing = (
+                session.query(GradeDistribution)
+                .filter_by(professor_id=full.id, course_id=grade.course_id,
+                           quarter=grade.quarter, year=grade.year)
+                .first()
+            )
+            if existing:
+                session.delete(grade)
+            else:
+                grade.professor_id = full.id
+        for score in list(abbr.scores):
+            score.professor_id = full.id
+        session.flush()
+        session.expire(abbr)
+        session.delete(abbr)
+        session.flush()
+        stats["merged"] += 1
+    session.commit()
+    return stats
+
+
+def run(engine, fn, n_pairs: int, n_grades: int) -> tuple[dict, float, int, int]:
+    """Seed, run fn, and roll everything back. Returns (stats, secs, statements, grades)."""
+    with engine.connect() as conn:
+        outer = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        seed(session, n_pairs, n_grades)
+
+        statements = 0
+
+        def count(*_args):
+            nonlocal statements
+            statements += 1
+
+        event.listen(conn, "before_cursor_execute", count)
+        start = time.perf_counter()
+        stats = fn(session)
+        secs = time.perf_counter() - start
+        event.remove(conn, "before_cursor_execute", count)
+
+        n_left = session.scalar(
+            select(func.count()).select_from(GradeDistribution)
+            .join(Course).where(Course.department == "BENCH")
+        )
+        session.close()
+        outer.rollback()
+    return stats, secs, statements, n_left
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pass-4 duplicate merging")
+    parser.add_argument("--pairs", type=int, default=3000, help="Duplicate professor pairs")
+    parser.add_argument("--grades", type=int, default=8, help="Grade rows per abbreviation")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    legacy = run(engine, legacy_pass4, args.pairs, args.grades)
+    set_based = run(engine, _pass4_deduplication, args.pairs, args.grades)
+
+    print(f"pairs:       {args.pairs} ({args.pairs * args.grades} abbreviation grade rows)")
+    print(f"per-row:     {legacy[1]:.2f}s, {legacy[2]} statements")
+    print(f"set-based:   {set_based[1]:.2f}s, {set_based[2]} statements "
+          f"({legacy[1] / set_based[1]:.0f}x)")
+    print(f"same result: {legacy[0]['merged'] == set_based[0]['merged'] and legacy[3] == set_based[3]}")
+
+
+if __name__ == "__main__":
+    main()
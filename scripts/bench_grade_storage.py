@@ -0,0 +1,170 @@
+"""Storage benchmark: the compact grade_distributions layout against the old wide one.
+
+Creates both layouts side by side in a scratch schema at DATABASE_URL: the
+pre-compaction table (INTEGER counts, quarter name) and a copy of the current
+grade_distributions definition (LIKE ... INCLUDING ALL). It fills them with
+the same synthetic grade rows, then compares table and index sizes and times
+the SQL behind get_grade_history (one pair's terms in order), the course
+grade histograms (a scan summing every bucket) and the professor_course_stats
+refresh (a scan grouping every row). The schema is dropped afterwards.
+
+Usage:
+    python scripts/bench_grade_storage.py                       # 50k pairs x 10 terms
+    python scripts/bench_grade_storage.py --pairs 200000 --terms 12
+"""
+import argparse
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import text
+
+from db.connection import get_engine
+from db.models import GRADE_COUNT_COLUMNS
+
+SCHEMA = "bench_grade_storage"
+
+WIDE_TABLE_SQL = f"""
+CREATE TABLE {SCHEMA}.wide (
+    id integer PRIMARY KEY,
+    professor_id integer NOT NULL,
+    course_id integer NOT NULL,
+    quarter text NOT NULL,
+    year integer NOT NULL,
+    {", ".join(f"{c} integer DEFAULT 0" for c in GRADE_COUNT_COLUMNS)},
+    avg_gpa double precision,
+    term_ordinal integer NOT NULL
+);
+CREATE INDEX ON {SCHEMA}.wide (professor_id, course_id, term_ordinal)
+"""
+
+# Three instructors per course on average, consecutive terms from Fall 2009,
+# counts up to 40 per bucket and a few terms without a reported GPA
+SEED_SQL = f"""
+INSERT INTO {SCHEMA}.compact
+    (id, professor_id, course_id, term_ordinal, avg_gpa, year, season, {", ".join(GRADE_COUNT_COLUMNS)})
+SELECT
+    pair * :terms + t, pair / 3 + 1, pair % (:pairs / 3 + 1) + 1, ord,
+    CASE WHEN random() < 0.05 THEN NULL ELSE round((2 + 2 * random())::numeric, 2) END,
+    ord / 4, ord % 4,
+    {", ".join("(random() * 40)::smallint" for _ in GRADE_COUNT_COLUMNS)}
+FROM generate_series(0, :pairs - 1) AS pair,
+     generate_series(0, :terms - 1) AS t,
+     LATERAL (SELECT 2009 * 4 + 3 + t AS ord) o
+"""
+
+COPY_WIDE_SQL = f"""
+INSERT INTO {SCHEMA}.wide
+SELECT id, professor_id, course_id, (ARRAY['Winter', 'Spring', 'Summer', 'Fall'])[season + 1], year,
+    {", ".join(GRADE_COUNT_COLUMNS)}, avg_gpa, term_ordinal
+FROM {SCHEMA}.compact
+"""
+
+_WIDE_STUDENTS = " + ".join(f"coalesce({c}, 0)" for c in GRADE_COUNT_COLUMNS)
+
+# The SQL each reader runs against either layout
+HISTORY_SQL = """
+SELECT {quarter}, year, avg_gpa, {counts} FROM {table}
+WHERE professor_id = :professor_id AND course_id = :course_id ORDER BY term_ordinal
+"""
+HISTOGRAM_SQL = """
+SELECT professor_id, {sums}, sum({students}),
+    sum(avg_gpa * {students}) / nullif(sum({students}) FILTER (WHERE avg_gpa IS NOT NULL), 0)
+FROM {table} WHERE course_id = :course_id GROUP BY professor_id
+"""
+STATS_SQL = """
+SELECT professor_id, course_id, year, count(*), count(avg_gpa), sum(avg_gpa), stddev(avg_gpa),
+    sum({students}), sum(avg_gpa * {students})
+FROM {table} GROUP BY professor_id, course_id, year
+"""
+
+LAYOUTS = {
+    "wide": {
+        "table": f"{SCHEMA}.wide", "quarter": "quarter", "students": f"({_WIDE_STUDENTS})",
+    },
+    "compact": {
+        "table": f"{SCHEMA}.compact",
+        "quarter": "(ARRAY['Winter', 'Spring', 'Summer', 'Fall'])[season + 1]",
+        "students": "total_students",
+    },
+}
+
+
+def _sql(template: str, layout: dict) -> str:
+    return template.format(
+        table=layout["table"],
+        quarter=layout["quarter"],
+        counts=", ".join(GRADE_COUNT_COLUMNS),
+        sums=", ".join(f"sum({c})" for c in GRADE_COUNT_COLUMNS),
+        students=layout["students"],
+    )
+
+
+def _best_ms(conn, sql: str, params: list[dict], repeat: int) -> float:
+    """Best of `repeat` runs of the statement over all params, in milliseconds."""
+    stmt = text(sql)
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for p in params:
+            conn.execute(stmt, p).all()
+        runs.append((time.perf_counter() - start) * 1000)
+    return min(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compact vs wide grade storage")
+    parser.add_argument("--pairs", type=int, default=50_000, help="(professor, course) pairs")
+    parser.add_argument("--terms", type=int, default=10, help="Terms per pair")
+    parser.add_argument("--lookups", type=int, default=2000, help="Pair histories fetched per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query, best reported")
+    args = parser.parse_args()
+
+    engine = get_engine().execution_options(isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        try:
+            conn.execute(text(f"CREATE TABLE {SCHEMA}.compact (LIKE public.grade_distributions INCLUDING ALL)"))
+            conn.execute(text(WIDE_TABLE_SQL))
+            start = time.perf_counter()
+            conn.execute(text(SEED_SQL), {"pairs": args.pairs, "terms": args.terms})
+            conn.execute(text(COPY_WIDE_SQL))
+            for name in LAYOUTS:
+                conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.{name}"))
+            rows = args.pairs * args.terms
+            print(f"rows:            {rows:,} per layout (seeded in {time.perf_counter() - start:.1f}s)")
+
+            pairs = conn.execute(text(
+                f"SELECT professor_id, course_id FROM {SCHEMA}.compact WHERE term_ordinal = {2009 * 4 + 3} "
+                "ORDER BY random() LIMIT :n"
+            ), {"n": args.lookups}).all()
+            history_params = [{"professor_id": p, "course_id": c} for p, c in pairs]
+            histogram_params = [{"course_id": c} for _, c in pairs[:20]]
+
+            results = {}
+            for name, layout in LAYOUTS.items():
+                table = layout["table"]
+                results[name] = {
+                    "table MB": conn.execute(text(f"SELECT pg_relation_size('{table}')")).scalar() / 2**20,
+                    "index MB": conn.execute(text(f"SELECT pg_indexes_size('{table}')")).scalar() / 2**20,
+                    "history ms": _best_ms(conn, _sql(HISTORY_SQL, layout), history_params, args.repeat),
+                    "histogram ms": _best_ms(conn, _sql(HISTOGRAM_SQL, layout), histogram_params, args.repeat),
+                    "stats ms": _best_ms(conn, _sql(STATS_SQL, layout), [{}], args.repeat),
+                }
+                results[name]["bytes/row"] = results[name]["table MB"] * 2**20 / rows
+        finally:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print(f"history:         {len(history_params)} pair lookups per run")
+    print(f"histogram:       {len(histogram_params)} course scans per run")
+    print(f"{'':16} {'wide':>10} {'compact':>10} {'change':>8}")
+    for metric in ("table MB", "bytes/row", "index MB", "history ms", "histogram ms", "stats ms"):
+        wide, compact = results["wide"][metric], results["compact"][metric]
+        print(f"{metric:16} {wide:>10.1f} {compact:>10.1f} {compact / wide - 1:>+8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Nightly-window benchmark: bootstrap score intervals for the whole database.
+
+Builds a synthetic catalog larger than UCSB's (pairs with heavy-tailed quarter
+and comment counts) and times score_intervals over all of it, against the
+hour the scheduler leaves between the 02:00 RMP refresh and the 03:00
+quarterly job. With --db, times load_score_intervals over every pair
+compute_all_scores would score at DATABASE_URL instead (queries included).
+
+Usage:
+    python scripts/bench_score_intervals.py                     # 40k pairs, 1000 resamples
+    python scripts/bench_score_intervals.py --pairs 100000 --samples 2000
+    python scripts/bench_score_intervals.py --db
+"""
+import argparse
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from etl.score_bootstrap import BOOTSTRAP_SAMPLES, RaggedGroups, load_score_intervals, score_intervals
+
+NIGHTLY_WINDOW_SECONDS = 3600
+
+
+def build_groups(n_pairs: int, seed: int = 0) -> tuple[RaggedGroups, RaggedGroups]:
+    rng = np.random.default_rng(seed)
+    quarters = np.minimum(rng.zipf(1.8, n_pairs), 60)
+    comments = np.minimum(rng.zipf(1.5, n_pairs) - 1, 500)
+    gpas = RaggedGroups([list(np.clip(rng.normal(3.2, 0.3, q), 0, 4)) for q in quarters])
+    sentiments = RaggedGroups([list(rng.uniform(-1, 1, c)) for c in comments])
+    return gpas, sentiments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bootstrap score intervals")
+    parser.add_argument("--pairs", type=int, default=40_000, help="Synthetic (professor, course) pairs")
+    parser.add_argument("--samples", type=int, default=BOOTSTRAP_SAMPLES, help="Bootstrap resamples")
+    parser.add_argument("--db", action="store_true", help="Time every scored pair at DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.db:
+        from db.connection import get_session
+        from db.course_stats import course_stats_query
+        from db.models import ProfessorRatingRollup
+
+        session = get_session()
+        stats = course_stats_query(session).subquery()
+        pairs = (
+            session.query(stats.c.professor_id, stats.c.course_id, ProfessorRatingRollup)
+            .join(ProfessorRatingRollup, ProfessorRatingRollup.professor_id == stats.c.professor_id)
+            .all()
+        )
+        start = time.perf_counter()
+        load_score_intervals(session, pairs, n_samples=args.samples)
+        elapsed = time.perf_counter() - start
+        session.close()
+        n_pairs, draws = len(pairs), None
+    else:
+        gpas, sentiments = build_groups(args.pairs)
+        start = time.perf_counter()
+        score_intervals(gpas, sentiments, np.full(args.pairs, 0.6), np.full(args.pairs, 0.5),
+                        n_samples=args.samples)
+        elapsed = time.perf_counter() - start
+        n_pairs, draws = args.pairs, (len(gpas.values) + len(sentiments.values)) * args.samples
+
+    print(f"pairs:          {n_pairs}")
+    print(f"resamples:      {args.samples}")
+    if draws:
+        print(f"values drawn:   {draws:,} ({draws / elapsed:,.0f}/s)")
+    print(f"intervals:      {elapsed:.1f}s")
+    print(f"nightly window: {NIGHTLY_WINDOW_SECONDS}s ({elapsed / NIGHTLY_WINDOW_SECONDS:.1%} used)")
+
+
+if __name__ == "__main__":
+    main()
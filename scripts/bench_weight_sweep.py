@@ -0,0 +1,101 @@
+"""Throughput benchmark: weight_sweep vs re-ranking once per weight vector.
+
+Builds a synthetic factor matrix shaped like the catalog (many small courses,
+a few large ones), sweeps it with W weight vectors in one batch, and times the
+old approach (score and sort every course in Python for each vector) on a
+sample of the vectors, extrapolated to W. Checks both agree on each course's #1.
+With --db, sweeps the real factor matrix at DATABASE_URL instead.
+
+Usage:
+    python scripts/bench_weight_sweep.py                     # 20k pairs, 2000 vectors
+    python scripts/bench_weight_sweep.py --pairs 50000 --weights 5000
+    python scripts/bench_weight_sweep.py --db
+"""
+import argparse
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from etl.scoring import compute_gaucho_score
+from etl.weight_sweep import FACTORS, FactorMatrix, sample_weights, weight_sweep
+
+
+def build_matrix(n_pairs: int, seed: int = 0) -> FactorMatrix:
+    # Course sizes are heavy-tailed: most have a handful of instructors
+    rng = np.random.default_rng(seed)
+    sizes = np.minimum(rng.zipf(1.6, n_pairs), 200)
+    course_ids = np.repeat(np.arange(len(sizes)), sizes)[:n_pairs]
+    factors = rng.random((n_pairs, len(FACTORS)))
+    factors[rng.random(n_pairs) < 0.3, 1:] = 0.5  # instructors without RMP data
+    return FactorMatrix(np.arange(n_pairs), course_ids, factors)
+
+
+def per_vector_tops(matrix: FactorMatrix, weights: np.ndarray) -> list[dict[int, int]]:
+    """The old way: score every pair with compute_gaucho_score and sort each course."""
+    tops = []
+    for w in weights:
+        weight_dict = dict(zip(FACTORS, w))
+        best: dict[int, tuple[float, int]] = {}
+        for course_id, prof_id, f in zip(matrix.course_ids, matrix.professor_ids, matrix.factors):
+            score = compute_gaucho_score(*f, weight_dict)
+            key = (-score, prof_id)
+            if course_id not in best or key < best[course_id]:
+                best[course_id] = key
+        tops.append({c: p for c, (_, p) in best.items()})
+    return tops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch weight sweeps")
+    parser.add_argument("--pairs", type=int, default=20_000, help="Synthetic (professor, course) pairs")
+    parser.add_argument("--weights", type=int, default=2000, help="Weight vectors")
+    parser.add_argument("--sample", type=int, default=5, help="Vectors timed the old way")
+    parser.add_argument("--db", action="store_true", help="Sweep the factor matrix at DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.db:
+        from db.connection import get_session
+
+        start = time.perf_counter()
+        with get_session() as session:
+            matrix = FactorMatrix.load(session)
+        print(f"load:           {time.perf_counter() - start:.2f}s (one query)")
+    else:
+        matrix = build_matrix(args.pairs)
+    weights = sample_weights(args.weights, seed=1)
+
+    start = time.perf_counter()
+    results = weight_sweep(matrix, weights)
+    sweep_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    old_tops = per_vector_tops(matrix, weights[:args.sample])
+    old_s = (time.perf_counter() - start) / args.sample * args.weights
+
+    # compute_gaucho_score rounds to 2 decimals, which can turn a near-tie into a
+    # tie the lower id wins, so a few #1s may legitimately differ
+    agree = total = 0
+    for w, old in zip(weights[:args.sample], old_tops):
+        for r in weight_sweep(matrix, w[None, :]):
+            top = next(p["professor_id"] for p in r["professor_stats"] if p["top_rate"] == 1.0)
+            agree += top == old[r["course_id"]]
+            total += 1
+
+    print(f"pairs:          {len(matrix)} in {len(results)} courses")
+    print(f"weight vectors: {args.weights}")
+    print(f"weight_sweep:   {sweep_s:.2f}s")
+    print(f"per vector:     {old_s:.2f}s (extrapolated from {args.sample} vectors)")
+    print(f"speedup:        {old_s / sweep_s:.1f}x")
+    print(f"same #1:        {agree}/{total} course rankings")
+    unstable = sorted(results, key=lambda r: r["baseline_top_rate"])[:5]
+    print("least stable #1s (course, professors, baseline #1 kept, distinct #1s):")
+    for r in unstable:
+        print(f"  {r['course_id']:>8} {r['professors']:>4} {r['baseline_top_rate']:>7.1%} {r['distinct_tops']:>4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,11 @@ Usage:
     python scripts/run_pipeline.py              # full pipeline
     python scripts/run_pipeline.py --scrape     # scrape only
     python scripts/run_pipeline.py --match      # enhanced matching only
+    python scripts/run_pipeline.py --match --full-rebuild  # rematch ignoring the watermark
+    python scripts/run_pipeline.py --match --workers 4     # score passes 1/3 candidates once, in 4 shards
     python scripts/run_pipeline.py --nlp        # NLP only
     python scripts/run_pipeline.py --score      # scoring only
+    python scripts/run_pipeline.py --score --gpa-half-life 8 --sentiment-half-life-days 730
 """
 import argparse
 import logging
@@ -34,10 +37,12 @@ def run_scrape(session):
     return stats
 
 
-def run_matching(session):
+def run_matching(session, full_rebuild: bool = False, workers: int = 1):
     from etl.enhanced_matcher import run_enhanced_matching
     logger.info("=== Phase 1.5: Enhanced Professor Matching ===")
-    stats = run_enhanced_matching(session, min_year=2023)
+    stats = run_enhanced_matching(
+        session, min_year=2023, full_rebuild=full_rebuild, workers=workers,
+    )
     logger.info(f"Matching complete: {stats}")
     return stats
 
@@ -50,10 +55,14 @@ def run_nlp(session):
     return stats
 
 
-def run_scoring(session):
+def run_scoring(session, gpa_half_life_terms: float | None = None, sentiment_half_life_days: float | None = None):
     from etl.scoring import compute_all_scores
     logger.info("=== Phase 3: Gaucho Score Computation ===")
-    stats = compute_all_scores(session)
+    stats = compute_all_scores(
+        session,
+        gpa_half_life_terms=gpa_half_life_terms,
+        sentiment_half_life_days=sentiment_half_life_days,
+    )
     logger.info(f"Scoring complete: {stats}")
     return stats
 
@@ -62,8 +71,24 @@ def main():
     parser = argparse.ArgumentParser(description="Run the Gaucho Course Optimizer pipeline")
     parser.add_argument("--scrape", action="store_true", help="Run RMP scrape only")
     parser.add_argument("--match", action="store_true", help="Run enhanced matching only")
+    parser.add_argument(
+        "--full-rebuild", action="store_true",
+        help="Match all professors, not just those changed since the last run",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Last-name shards for candidate scoring in matching, run in process (default: 1, per pass)",
+    )
     parser.add_argument("--nlp", action="store_true", help="Run NLP processing only")
     parser.add_argument("--score", action="store_true", help="Run scoring only")
+    parser.add_argument(
+        "--gpa-half-life", type=float, default=None, metavar="TERMS",
+        help="Recency-weight GPA with this half-life in terms (default: flat average)",
+    )
+    parser.add_argument(
+        "--sentiment-half-life-days", type=float, default=None, metavar="DAYS",
+        help="Recency-weight comment sentiment with this half-life in days (default: flat average)",
+    )
     args = parser.parse_args()
 
     run_all = not (args.scrape or args.match or args.nlp or args.score)
@@ -73,11 +98,15 @@ def main():
         if run_all or args.scrape:
             run_scrape(session)
         if run_all or args.match:
-            run_matching(session)
+            run_matching(session, full_rebuild=args.full_rebuild, workers=args.workers)
         if run_all or args.nlp:
             run_nlp(session)
         if run_all or args.score:
-            run_scoring(session)
+            run_scoring(
+                session,
+                gpa_half_life_terms=args.gpa_half_life,
+                sentiment_half_life_days=args.sentiment_half_life_days,
+            )
 
         logger.info("Pipeline finished.")
     except KeyboardInterrupt:
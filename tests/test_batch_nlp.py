@@ -69,3 +69,23 @@ def test_process_all_comments_extracts_keywords(db_session):
     )
     assert len(kw_comments) > 0
     assert any("exam" in kw.lower() for c in kw_comments for kw in (c.keywords or []))
+
+
+def test_process_all_comments_bumps_data_version(db_session):
+    """Processing comments bumps the data version; a run with nothing to do does not."""
+    from db.data_version import current_data_version
+
+    prof = Professor(name_nexus="VERSION, NLP", department="CS")
+    db_session.add(prof)
+    db_session.flush()
+    rating = RmpRating(professor_id=prof.id, overall_quality=4.0, num_ratings=1)
+    db_session.add(rating)
+    db_session.flush()
+    db_session.add(RmpComment(rmp_rating_id=rating.id, comment_text="Great lectures."))
+    db_session.commit()
+
+    before = current_data_version(db_session)
+    process_all_comments(db_session)
+    assert current_data_version(db_session) == before + 1
+    process_all_comments(db_session)
+    assert current_data_version(db_session) == before + 1
@@ -1,4 +1,6 @@
 from db.models import Professor, Course, GradeDistribution, RmpRating, GauchoScore
+from db.course_stats import refresh_professor_course_stats
+from db.rating_rollup import refresh_rating_rollups
 from etl.scoring import compute_all_scores
 
 
@@ -23,6 +25,8 @@ def test_compute_all_scores_creates_gaucho_scores(db_session):
         would_take_again_pct=85.0, num_ratings=40,
     ))
     db_session.commit()
+    refresh_professor_course_stats(db_session)
+    refresh_rating_rollups(db_session)
 
     stats = compute_all_scores(db_session)
 
@@ -31,6 +35,7 @@ def test_compute_all_scores_creates_gaucho_scores(db_session):
     assert 0 <= scores[0].score <= 100
     assert scores[0].course_id == course.id
     assert scores[0].weights_used is not None
+    assert scores[0].score_low <= scores[0].score <= scores[0].score_high
     assert stats["computed"] >= 1
 
 
@@ -49,8 +54,36 @@ def test_compute_all_scores_skips_unmatched(db_session):
         quarter="Fall", year=2024, avg_gpa=3.0,
     ))
     db_session.commit()
+    refresh_professor_course_stats(db_session)
+    refresh_rating_rollups(db_session)
 
     stats = compute_all_scores(db_session)
 
     scores = db_session.query(GauchoScore).filter_by(professor_id=prof.id).all()
     assert len(scores) == 0
+
+
+def test_compute_all_scores_bumps_data_version(db_session):
+    """New scores bump the data version so dashboard caches miss."""
+    from db.data_version import current_data_version
+
+    before = current_data_version(db_session)
+    compute_all_scores(db_session)
+    assert current_data_version(db_session) == before
+
+    prof = Professor(name_nexus="VERSION, SCORE", rmp_id=4321, department="CS")
+    db_session.add(prof)
+    db_session.flush()
+    course = Course(code="CS301", department="CS")
+    db_session.add(course)
+    db_session.flush()
+    db_session.add(GradeDistribution(
+        professor_id=prof.id, course_id=course.id, quarter="Fall", year=2024, avg_gpa=3.2,
+    ))
+    db_session.add(RmpRating(professor_id=prof.id, overall_quality=4.0, num_ratings=10))
+    db_session.commit()
+    refresh_professor_course_stats(db_session)
+    refresh_rating_rollups(db_session)
+
+    compute_all_scores(db_session)
+    assert current_data_version(db_session) == before + 1
@@ -0,0 +1,73 @@
+"""Tests for etl/candidate_blocking.py — blocked vectorized fuzzy scoring."""
+
+import random
+
+from etl.candidate_blocking import CandidatePool, sort_key
+from etl.name_matcher import normalize_nexus_name, normalize_rmp_name, match_confidence
+
+_FIRST = ["john", "jon", "jane", "maria", "mario", "wei", "lei", "shiyu", "sean", "shawn", "ann", "anne"]
+_LAST = ["smith", "smyth", "huang", "hwang", "chang", "zhang", "o'brien", "obrien", "de la cruz", "cruz", "lee", "li"]
+
+
+def _synthetic_names(n, seed):
+    rng = random.Random(seed)
+    nexus = [f"{rng.choice(_LAST).upper()}, {rng.choice(_FIRST).upper()}" for _ in range(n)]
+    rmp = [f"{rng.choice(_FIRST).title()} {rng.choice(_LAST).title()}" for _ in range(n)]
+    return nexus, rmp
+
+
+def _sequential_reference(nexus, rmp):
+    """The original pass-2 loop: strictly-better wins, matched records leave the pool."""
+    pool = list(range(len(rmp)))
+    matches = []
+    for q in nexus:
+        norm_q = normalize_nexus_name(q)
+        best_score, best_idx = 0, None
+        for idx in pool:
+            score = match_confidence(norm_q, normalize_rmp_name(rmp[idx]))
+            if score > best_score:
+                best_score, best_idx = score, idx
+        if best_score >= 85 and best_idx is not None:
+            matches.append((best_idx, best_score))
+            pool.remove(best_idx)
+        else:
+            matches.append(None)
+    return matches
+
+
+def test_sort_key_matches_token_sort():
+    assert sort_key("Smith,  John!") == "john smith"
+
+
+def test_ranked_candidates_ordering():
+    pool = CandidatePool(["john smith", None, "jon smith", "john smith"])
+    ranked = pool.ranked_candidates(["john smith"])
+    assert ranked[0][0] == (0, 100)
+    assert ranked[0][1] == (3, 100)
+    assert all(idx != 1 for idx, _ in ranked[0])
+
+
+def test_take_and_first_available():
+    pool = CandidatePool(["john smith", "john smith"])
+    cands = pool.ranked_candidates(["john smith"])[0]
+    assert pool.first_available(cands) == (0, 100)
+    pool.take(0)
+    assert pool.first_available(cands) == (1, 100)
+    pool.take(1)
+    assert pool.first_available(cands) is None
+
+
+def test_matches_sequential_scan_on_synthetic_names():
+    nexus, rmp = _synthetic_names(300, seed=7)
+    expected = _sequential_reference(nexus, rmp)
+
+    pool = CandidatePool([normalize_rmp_name(n) for n in rmp])
+    ranked = pool.ranked_candidates([normalize_nexus_name(n) for n in nexus])
+    actual = []
+    for cands in ranked:
+        best = pool.first_available(cands)
+        if best is not None:
+            pool.take(best[0])
+        actual.append(best)
+
+    assert actual == expected
@@ -0,0 +1,66 @@
+"""Tests for dashboard/course_index.py — the in-memory autocomplete index."""
+
+from dashboard.course_index import CourseIndex
+from dashboard.queries import search_courses
+from db.data_version import bump_data_version, current_data_version
+from db.models import Course
+
+
+def _course(id_, code, title, dept_id):
+    return {
+        "id": id_, "code": code, "title": title, "department": code.rstrip("0123456789AB"),
+        "department_id": dept_id, "code_normalized": code,
+        "search_text": f"{code} {title.lower()}",
+    }
+
+
+INDEX = CourseIndex([
+    _course(1, "PSTAT120B", "Probability and Statistics", 2),
+    _course(2, "CMPSC8", "Introduction to Computer Science", 1),
+    _course(3, "PSTAT120A", "Probability and Statistics", 2),
+    _course(4, "CMPSC130A", "Data Structures and Algorithms I", 1),
+    _course(5, "MATH4A", "Linear Algebra with Applications", 3),
+])
+
+
+def _codes(results):
+    return [c["code"] for c in results]
+
+
+def test_prefix_search_is_sorted_and_normalized():
+    assert _codes(INDEX.search("pstat 120")) == ["PSTAT120A", "PSTAT120B"]
+    assert _codes(INDEX.search("CMPSC")) == ["CMPSC130A", "CMPSC8"]
+    assert _codes(INDEX.search("pstat120", limit=1)) == ["PSTAT120A"]
+
+
+def test_department_partition():
+    assert _codes(INDEX.search("", department_id=1)) == ["CMPSC130A", "CMPSC8"]
+    assert INDEX.search("pstat", department_id=1) == []
+    assert INDEX.search("pstat", department_id=99) == []
+
+
+def test_substring_and_fuzzy_fallback():
+    assert _codes(INDEX.search("130A")) == ["CMPSC130A"]
+    assert _codes(INDEX.search("linear algebra")) == ["MATH4A"]
+    assert _codes(INDEX.search("linear algbra")) == ["MATH4A"]
+    assert INDEX.search("zzzz") == []
+
+
+def test_results_match_search_courses_shape(db_session):
+    db_session.add_all([
+        Course(code="CMPSC8", title="Introduction to Computer Science", department="CMPSC"),
+        Course(code="PSTAT120A", title="Probability and Statistics", department="PSTAT"),
+        Course(code="PSTAT120B", title="Probability and Statistics", department="PSTAT"),
+    ])
+    db_session.flush()
+    index = CourseIndex.load(db_session)
+    assert len(index) == 3
+    for query in ("pstat 120", "cmpsc8", "probability"):
+        assert index.search(query) == search_courses(db_session, query)
+
+
+def test_data_version_bump(db_session):
+    start = current_data_version(db_session)
+    assert bump_data_version(db_session) == start + 1
+    assert bump_data_version(db_session) == start + 2
+    assert current_data_version(db_session) == start + 2
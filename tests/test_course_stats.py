@@ -0,0 +1,56 @@
+"""Tests for db/course_stats.py — the professor_course_stats materialized view."""
+
+import statistics
+
+import pytest
+
+from db.course_stats import course_stats_query, refresh_professor_course_stats
+from db.models import Course, GradeDistribution, Professor
+from scrapers.grades_loader import load_grades_to_db
+
+
+def _seed(session):
+    prof = Professor(name_nexus="STATS, PAT", department="MATH")
+    course = Course(code="STATS1", department="MATH")
+    session.add_all([prof, course])
+    session.flush()
+    terms = [("Fall", 2021, 3.0, 10), ("Winter", 2022, 3.6, 30), ("Fall", 2022, 2.4, 20),
+             ("Spring", 2022, None, 5)]
+    for quarter, year, gpa, students in terms:
+        session.add(GradeDistribution(
+            professor_id=prof.id, course_id=course.id, quarter=quarter, year=year,
+            avg_gpa=gpa, a=students,
+        ))
+    refresh_professor_course_stats(session)
+    return prof, course
+
+
+def test_combined_buckets_match_direct_aggregates(db_session):
+    prof, course = _seed(db_session)
+    row = course_stats_query(db_session).filter_by(professor_id=prof.id).one()
+
+    gpas = [3.0, 3.6, 2.4]
+    assert row.quarters_taught == 4
+    assert row.total_students == 65
+    assert row.mean_gpa == pytest.approx(statistics.mean(gpas))
+    assert row.std_gpa == pytest.approx(statistics.stdev(gpas))
+    assert row.weighted_gpa == pytest.approx((3.0 * 10 + 3.6 * 30 + 2.4 * 20) / 60)
+    assert row.latest_term == "Fall 2022"
+
+
+def test_min_year_uses_year_buckets(db_session):
+    prof, course = _seed(db_session)
+    row = course_stats_query(db_session, min_year=2022).filter_by(professor_id=prof.id).one()
+    assert row.quarters_taught == 3
+    assert row.mean_gpa == pytest.approx(3.0)
+    assert course_stats_query(db_session, min_year=2023).filter_by(professor_id=prof.id).all() == []
+
+
+def test_grade_load_refreshes_view(db_session):
+    load_grades_to_db([{
+        "instructor": "VIEW, LOAD", "course_code": "VIEW1", "quarter": "Fall",
+        "year": 2024, "avg_gpa": 3.2, "a": 8, "department": "MATH",
+    }], db_session)
+    prof = db_session.query(Professor).filter_by(name_nexus="VIEW, LOAD").one()
+    row = course_stats_query(db_session).filter_by(professor_id=prof.id).one()
+    assert row.quarters_taught == 1 and row.total_students == 8
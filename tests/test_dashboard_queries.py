@@ -1,10 +1,24 @@
-"""Tests for dashboard/queries.py — comments, min_year filter, department filter."""
+"""Tests for dashboard/queries.py — comments, history, min_year filter, department filter."""
 from datetime import datetime, timezone
 
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from db.course_stats import refresh_professor_course_stats
+from db.rating_rollup import refresh_rating_rollups
 from db.models import Professor, Course, GradeDistribution, RmpRating, RmpComment
 from dashboard.queries import (
     get_comments_for_professor,
+    get_course_comments,
+    get_course_grade_histograms,
+    get_course_grade_history,
+    get_course_grade_trends,
+    get_grade_histogram,
+    get_grade_history,
+    get_professor_ranking_page,
     get_professors_for_course,
+    rank_professors,
     search_courses,
     get_departments,
 )
@@ -75,6 +89,77 @@ def test_get_comments_empty(db_session):
     assert comments == []
 
 
+def _seed_course_with_instructors(session):
+    """Two instructors with comments on one course, plus a third who teaches elsewhere."""
+    course = Course(code="BATCH1", department="CMPSC")
+    other = Course(code="BATCH2", department="CMPSC")
+    session.add_all([course, other])
+    session.flush()
+    first = _seed_professor_with_comments(session)
+    second = _seed_professor_with_comments(session)
+    outsider = _seed_professor_with_comments(session)
+    for prof, c in ((first, course), (second, course), (outsider, other)):
+        for year, quarter in ((2023, "Fall"), (2022, "Spring"), (2023, "Winter")):
+            session.add(GradeDistribution(
+                professor_id=prof.id, course_id=c.id, quarter=quarter, year=year, avg_gpa=3.0, a=4,
+            ))
+    session.flush()
+    return course, [first, second], outsider
+
+
+def test_course_batches_match_per_professor_queries(db_session):
+    course, instructors, outsider = _seed_course_with_instructors(db_session)
+
+    history = get_course_grade_history(db_session, course.id)
+    comments = get_course_comments(db_session, course.id)
+
+    assert set(history) == set(comments) == {p.id for p in instructors}
+    for prof in instructors:
+        assert history[prof.id] == get_grade_history(db_session, prof.id, course.id)
+        assert comments[prof.id] == get_comments_for_professor(db_session, prof.id)
+        assert len(comments[prof.id]) == 5
+
+
+def test_course_comments_limit_keeps_nulls_last(db_session):
+    course, instructors, _ = _seed_course_with_instructors(db_session)
+    comments = get_course_comments(db_session, course.id, limit=10)
+    for prof in instructors:
+        assert len(comments[prof.id]) == 7
+        assert comments[prof.id][-1]["created_at"] is None
+
+
+def test_grade_histogram_sums_buckets_in_sql(db_session):
+    prof = Professor(name_nexus="HIST, PROF", department="MATH")
+    course = Course(code="HIST1", department="MATH")
+    db_session.add_all([prof, course])
+    db_session.flush()
+    db_session.add_all([
+        GradeDistribution(professor_id=prof.id, course_id=course.id, quarter="Fall", year=2020,
+                          a=10, b=10, avg_gpa=3.5),
+        GradeDistribution(professor_id=prof.id, course_id=course.id, quarter="Fall", year=2023,
+                          a=5, f=5, avg_gpa=2.0),
+        GradeDistribution(professor_id=prof.id, course_id=course.id, quarter="Winter", year=2024,
+                          c=4, avg_gpa=None),
+    ])
+    db_session.flush()
+
+    hist = get_grade_histogram(db_session, prof.id, course.id)
+    assert hist["counts"][1] == 15  # A
+    assert hist["counts"][4] == 10  # B
+    assert hist["counts"][7] == 4  # C
+    assert hist["counts"][12] == 5  # F
+    assert hist["students"] == 34
+    # Weighted by enrollment over quarters with a GPA: (20 * 3.5 + 10 * 2.0) / 30
+    assert hist["weighted_gpa"] == pytest.approx(3.0)
+
+    recent = get_grade_histogram(db_session, prof.id, course.id, min_year=2023)
+    assert recent["students"] == 14 and recent["weighted_gpa"] == pytest.approx(2.0)
+    assert get_course_grade_histograms(db_session, course.id) == {prof.id: hist}
+
+    empty = get_grade_histogram(db_session, prof.id, course.id, min_year=2030)
+    assert empty == {"counts": [0] * 13, "students": 0, "weighted_gpa": None}
+
+
 def test_get_professors_min_year_filter(db_session):
     prof = Professor(name_nexus="Year Prof", department="CMPSC")
     course = Course(code="CMPSC8", title="Intro", department="CMPSC")
@@ -87,7 +172,7 @@ def test_get_professors_min_year_filter(db_session):
             professor_id=prof.id, course_id=course.id,
             quarter="Fall", year=year, avg_gpa=3.5,
         ))
-    db_session.flush()
+    refresh_professor_course_stats(db_session)
 
     # No filter — all 3 quarters
     result = get_professors_for_course(db_session, course.id)
@@ -104,6 +189,93 @@ def test_get_professors_min_year_filter(db_session):
     assert result == []
 
 
+def _seed_ranked_course(session, n):
+    """A course taught by n professors with varied grades and ratings; returns its id."""
+    course = Course(code="RANK1", title="Ranking", department="CMPSC")
+    session.add(course)
+    session.flush()
+    for i in range(n):
+        prof = Professor(name_nexus=f"RANK{i:02d}, PROF", department="CMPSC")
+        session.add(prof)
+        session.flush()
+        session.add(GradeDistribution(
+            professor_id=prof.id, course_id=course.id, quarter="Fall", year=2024,
+            avg_gpa=None if i % 7 == 0 else 2.0 + (i % 5) * 0.4,
+        ))
+        if i % 3:
+            rating = RmpRating(professor_id=prof.id, overall_quality=1.0 + i % 4,
+                               difficulty=1.0 + i % 3, num_ratings=i % 6)
+            session.add(rating)
+            session.flush()
+            session.add(RmpComment(rmp_rating_id=rating.id, comment_text="ok",
+                                   sentiment_score=(i % 5 - 2) / 2))
+    refresh_professor_course_stats(session)
+    refresh_rating_rollups(session)
+    return course.id
+
+
+def test_ranking_pages_match_python_scores(db_session):
+    from etl.scoring import (
+        bayesian_adjust, compute_gaucho_score, normalize_difficulty, normalize_gpa, normalize_quality,
+    )
+
+    course_id = _seed_ranked_course(db_session, 23)
+    weights = {"gpa": 0.4, "quality": 0.3, "difficulty": 0.1, "sentiment": 0.2}
+
+    pages, cursor = [], None
+    while True:
+        page = get_professor_ranking_page(db_session, course_id, weights, cursor=cursor, page_size=5)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [len(p["professors"]) for p in pages] == [5, 5, 5, 5, 3]
+    assert [p["remaining"] for p in pages] == [18, 13, 8, 3, 0]
+
+    ranked = [prof for page in pages for prof in page["professors"]]
+    assert len({p["id"] for p in ranked}) == 23
+    for prof in get_professors_for_course(db_session, course_id):
+        gpa_f = normalize_gpa(prof["mean_gpa"]) if prof["mean_gpa"] else 0.5
+        qual_f = normalize_quality(prof["rmp_quality"]) if prof["rmp_quality"] else 0.5
+        if prof["rmp_num_ratings"] and prof["rmp_quality"]:
+            qual_f = normalize_quality(bayesian_adjust(prof["rmp_quality"], prof["rmp_num_ratings"], 3.0))
+        diff_f = normalize_difficulty(prof["rmp_difficulty"]) if prof["rmp_difficulty"] else 0.5
+        sent_f = (prof["avg_sentiment"] + 1) / 2 if prof["avg_sentiment"] is not None else 0.5
+        expected = compute_gaucho_score(gpa_f, qual_f, diff_f, sent_f, weights)
+        [got] = [p["gaucho_score"] for p in ranked if p["id"] == prof["id"]]
+        assert got == pytest.approx(expected, abs=0.011)
+    keys = [(-p["gaucho_score"], p["id"]) for p in ranked]
+    assert keys == sorted(keys)
+
+
+def test_ranking_page_ties_are_stable(db_session):
+    course_id = _seed_ranked_course(db_session, 4)
+    zero = {"gpa": 0.0, "quality": 0.0, "difficulty": 0.0, "sentiment": 0.0}
+    first = get_professor_ranking_page(db_session, course_id, zero, page_size=2)
+    second = get_professor_ranking_page(db_session, course_id, zero, cursor=first["next_cursor"], page_size=2)
+    ids = [p["id"] for p in first["professors"] + second["professors"]]
+    assert ids == sorted(ids)
+    assert second["next_cursor"] is None
+
+    assert get_professor_ranking_page(db_session, course_id, zero, min_year=2030) == {
+        "professors": [], "next_cursor": None, "remaining": 0,
+    }
+
+
+def test_rank_professors_returns_top_k(db_session):
+    course_id = _seed_ranked_course(db_session, 23)
+    weights = {"gpa": 0.1, "quality": 0.5, "difficulty": 0.2, "sentiment": 0.2}
+
+    top = rank_professors(db_session, course_id, weights, k=7)
+    page = get_professor_ranking_page(db_session, course_id, weights, page_size=7)
+    assert [r["rank"] for r in top] == list(range(1, 8))
+    assert [(r["id"], r["gaucho_score"]) for r in top] == [
+        (p["id"], p["gaucho_score"]) for p in page["professors"]
+    ]
+    assert len(rank_professors(db_session, course_id, k=50)) == 23
+    assert rank_professors(db_session, course_id, weights, k=5, min_year=2030) == []
+
+
 def test_search_courses_department_filter(db_session):
     db_session.add_all([
         Course(code="CMPSC8", title="Intro CS", department="CMPSC"),
@@ -116,13 +288,15 @@ def test_search_courses_department_filter(db_session):
     all_results = search_courses(db_session, "")
     assert len(all_results) >= 3
 
+    depts = {d["code"]: d["id"] for d in get_departments(db_session)}
+
     # Filter by CMPSC
-    cs_results = search_courses(db_session, "", department="CMPSC")
+    cs_results = search_courses(db_session, "", department_id=depts["CMPSC"])
     assert all(r["department"] == "CMPSC" for r in cs_results)
     assert len(cs_results) >= 2
 
     # Filter by MATH
-    math_results = search_courses(db_session, "", department="MATH")
+    math_results = search_courses(db_session, "", department_id=depts["MATH"])
     assert all(r["department"] == "MATH" for r in math_results)
 
 
@@ -134,8 +308,109 @@ def test_get_departments(db_session):
     ])
     db_session.flush()
 
-    depts = get_departments(db_session)
-    assert "PHYS" in depts
-    assert "CHEM" in depts
+    codes = [d["code"] for d in get_departments(db_session)]
+    # PHYS shares "Physics" with ASTRO, so it resolves to their canonical department
+    assert "ASTRO+PHYS" in codes
+    assert "CHEM" in codes
     # Should be deduplicated
-    assert depts.count("PHYS") == 1
+    assert codes.count("ASTRO+PHYS") == 1
+
+
+def _seed_catalog(session):
+    session.add_all([
+        Course(code="CMPSC8", title="Introduction to Computer Science", department="CMPSC"),
+        Course(code="CMPSC130A", title="Data Structures and Algorithms I", department="CMPSC"),
+        Course(code="PSTAT120A", title="Probability and Statistics", department="PSTAT"),
+        Course(code="PSTAT120B", title="Probability and Statistics", department="PSTAT"),
+        Course(code="MATH4A", title="Linear Algebra with Applications", department="MATH"),
+    ])
+    session.flush()
+
+
+def test_search_courses_normalized_prefix(db_session):
+    _seed_catalog(db_session)
+    assert [c["code"] for c in search_courses(db_session, "cmpsc 8")] == ["CMPSC8"]
+    assert [c["code"] for c in search_courses(db_session, "pstat 120")] == ["PSTAT120A", "PSTAT120B"]
+
+
+def test_search_courses_substring_and_title(db_session):
+    _seed_catalog(db_session)
+    assert [c["code"] for c in search_courses(db_session, "130A")] == ["CMPSC130A"]
+    assert [c["code"] for c in search_courses(db_session, "linear algebra")] == ["MATH4A"]
+
+
+def test_search_courses_trigram_typo(db_session):
+    from dashboard.queries import _has_trigram
+
+    if not _has_trigram(db_session):
+        pytest.skip("pg_trgm extension not installed")
+    db_session.execute(text("SET LOCAL pg_trgm.word_similarity_threshold = 0.4"))
+    _seed_catalog(db_session)
+    results = search_courses(db_session, "linear algbra")
+    assert results[0]["code"] == "MATH4A"
+
+
+def test_course_search_keys_follow_code_and_title(db_session):
+    course = Course(code="Cmpsc 16", title="Problem Solving", department="CMPSC")
+    assert course.code_normalized == "CMPSC16"
+    assert course.search_text == "CMPSC16 problem solving"
+    course.title = None
+    assert course.search_text == "CMPSC16"
+
+
+def _seed_term_history(session):
+    """Six consecutive terms, Spring 2022 to Summer 2023, inserted out of order; GPA rises 0.1 per term."""
+    course = Course(code="TERMS 1", department="CMPSC")
+    prof = Professor(name_nexus="TERMS, PROF", department="CMPSC")
+    session.add_all([course, prof])
+    session.flush()
+    for quarter, year, gpa in [
+        ("Fall", 2022, 3.2), ("Spring", 2022, 3.0), ("Winter", 2023, 3.3),
+        ("Summer", 2022, 3.1), ("Summer", 2023, 3.5), ("Spring", 2023, 3.4),
+    ]:
+        session.add(GradeDistribution(
+            professor_id=prof.id, course_id=course.id, quarter=quarter, year=year, avg_gpa=gpa,
+        ))
+    session.flush()
+    return prof, course
+
+
+def test_grade_history_is_in_term_order(db_session):
+    prof, course = _seed_term_history(db_session)
+    expected = ["Spring 2022", "Summer 2022", "Fall 2022", "Winter 2023", "Spring 2023", "Summer 2023"]
+
+    assert [h["quarter"] for h in get_grade_history(db_session, prof.id, course.id)] == expected
+    assert [h["quarter"] for h in get_course_grade_history(db_session, course.id)[prof.id]] == expected
+    last_two = get_grade_history(db_session, prof.id, course.id, last_n_terms=2)
+    assert [h["quarter"] for h in last_two] == expected[-2:]
+
+
+def test_course_grade_trends_fit_the_last_terms_per_year(db_session):
+    prof, course = _seed_term_history(db_session)
+    flat = Professor(name_nexus="FLAT, PROF", department="CMPSC")
+    single = Professor(name_nexus="SINGLE, PROF", department="CMPSC")
+    db_session.add_all([flat, single])
+    db_session.flush()
+    # Fall 2023 drops back to 3.0: the last two terms fall 0.5, all seven barely rise
+    db_session.add(GradeDistribution(
+        professor_id=prof.id, course_id=course.id, quarter="Fall", year=2023, avg_gpa=3.0,
+    ))
+    for quarter in ("Winter", "Spring"):
+        db_session.add(GradeDistribution(
+            professor_id=flat.id, course_id=course.id, quarter=quarter, year=2024, avg_gpa=3.6,
+        ))
+    db_session.add(GradeDistribution(
+        professor_id=single.id, course_id=course.id, quarter="Fall", year=2024, avg_gpa=2.0,
+    ))
+    db_session.flush()
+
+    trends = get_course_grade_trends(db_session, course.id)
+    assert set(trends) == {prof.id, flat.id}
+    assert trends[flat.id] == 0
+    assert get_course_grade_trends(db_session, course.id, last_n_terms=2)[prof.id] == pytest.approx(-2.0)
+    assert get_course_grade_trends(db_session, course.id, last_n_terms=6)[prof.id] == pytest.approx(
+        4 * np.polyfit(range(6), [3.1, 3.2, 3.3, 3.4, 3.5, 3.0], 1)[0], abs=1e-3,
+    )
+    assert get_course_grade_trends(db_session, course.id, min_year=2023)[prof.id] == pytest.approx(
+        4 * np.polyfit(range(4), [3.3, 3.4, 3.5, 3.0], 1)[0], abs=1e-3,
+    )
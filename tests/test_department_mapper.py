@@ -1,6 +1,12 @@
 """Tests for etl/department_mapper.py — department code/name matching."""
 
-from etl.department_mapper import departments_match, DEPT_MAP
+from etl.department_mapper import (
+    CANONICAL_NAMES,
+    DEPT_MAP,
+    canonical_department,
+    departments_match,
+    same_department,
+)
 
 
 class TestDepartmentsMatch:
@@ -36,3 +42,26 @@ class TestDeptMapCompleteness:
     def test_common_depts_present(self):
         for code in ["CMPSC", "MATH", "PHYS", "ECON", "ENGL", "HIST", "PSTAT", "PSY"]:
             assert code in DEPT_MAP, f"{code} missing from DEPT_MAP"
+
+
+class TestCanonicalDepartment:
+    def test_code_and_rmp_name_share_key(self):
+        assert canonical_department("CMPSC") == canonical_department("Computer Science") == "CMPSC"
+
+    def test_codes_sharing_an_rmp_name_are_grouped(self):
+        assert canonical_department("PHYS") == canonical_department("ASTRO") == "ASTRO+PHYS"
+        assert canonical_department("Physics") == "ASTRO+PHYS"
+        assert CANONICAL_NAMES["ASTRO+PHYS"] == "Physics"
+
+    def test_fuzzy_fallback(self):
+        assert canonical_department("Statistics & Applied Probability") == "PSTAT"
+
+    def test_unknown_and_empty(self):
+        assert canonical_department(" zzzzz ") == "ZZZZZ"
+        assert canonical_department("") is None
+        assert canonical_department(None) is None
+
+    def test_same_department(self):
+        assert same_department(3, 3) is True
+        assert same_department(3, 4) is False
+        assert same_department(None, None) is False
@@ -1,8 +1,13 @@
 """Tests for etl/enhanced_matcher.py — multi-pass professor matching."""
 
+from datetime import datetime, timedelta
+
 import pytest
-from db.models import Professor, GradeDistribution, Course, RmpRating
+from sqlalchemy import update
+
+from db.models import Professor, GradeDistribution, Course, RmpRating, MatchingRun
 from etl.enhanced_matcher import (
+    LinkPlan,
     _get_unmatched_nexus,
     _get_unlinked_rmp,
     _link_professor,
@@ -99,6 +104,120 @@ class TestLinkProfessor:
         assert another.rmp_id is None
 
 
+class TestLinkPlan:
+    def test_apply_moves_ratings_and_deletes_rmp_rows(self, db_session):
+        course = _make_course(db_session)
+        n1 = _make_nexus_prof(db_session, "HUANG L", course=course)
+        n2 = _make_nexus_prof(db_session, "SMITH, JOHN", course=course)
+        r1 = _make_rmp_prof(db_session, "Lei", "Huang", rmp_id=501)
+        r2 = _make_rmp_prof(db_session, "John", "Smith", rmp_id=502)
+        r1_id, r2_id = r1.id, r2.id
+
+        plan = LinkPlan()
+        assert plan.add(n1, r1, 90.0)
+        assert plan.add(n2, r2, 95.0)
+        assert plan.apply(db_session) == 2
+
+        assert (n1.rmp_id, n1.name_rmp, n1.match_confidence) == (501, "Lei Huang", 90.0)
+        assert (n2.rmp_id, n2.name_rmp, n2.match_confidence) == (502, "John Smith", 95.0)
+        assert db_session.get(Professor, r1_id) is None
+        assert db_session.get(Professor, r2_id) is None
+        assert db_session.query(RmpRating).filter_by(professor_id=n1.id).count() == 1
+        assert db_session.query(RmpRating).filter_by(professor_id=n2.id).count() == 1
+
+    def test_collision_resolved_in_memory(self, db_session):
+        course = _make_course(db_session)
+        n1 = _make_nexus_prof(db_session, "HUANG L", course=course)
+        n2 = _make_nexus_prof(db_session, "HUANG LEI", course=course)
+        rmp = _make_rmp_prof(db_session, "Lei", "Huang", rmp_id=503)
+
+        plan = LinkPlan()
+        assert plan.add(n1, rmp, 90.0) is True
+        assert plan.add(n2, rmp, 90.0) is False
+        assert len(plan) == 1
+
+
+class TestRunEnhancedMatching:
+    def _seed(self, session):
+        course = _make_course(session)
+        _make_nexus_prof(session, "HUANG L", course=course)
+        _make_nexus_prof(session, "SMITH, JOHN", course=course)
+        _make_rmp_prof(session, "Lei", "Huang", rmp_id=601)
+        _make_rmp_prof(session, "John", "Smith", rmp_id=602)
+
+    def test_links_all_passes_in_one_apply(self, db_session):
+        self._seed(db_session)
+        stats = run_enhanced_matching(db_session, min_year=2023)
+        assert stats["pass1"]["matched"] == 1
+        assert stats["pass2"]["matched"] == 1
+        linked = db_session.query(Professor).filter(
+            Professor.rmp_id.in_([601, 602]),
+        ).all()
+        assert sorted(p.name_nexus for p in linked) == ["HUANG L", "SMITH, JOHN"]
+
+    def test_dry_run_same_stats_no_writes(self, db_session):
+        self._seed(db_session)
+        dry = run_enhanced_matching(db_session, min_year=2023, dry_run=True)
+        assert db_session.query(Professor).filter(Professor.rmp_id.in_([601, 602])).count() == 2
+        assert all(
+            p.name_nexus is None
+            for p in db_session.query(Professor).filter(Professor.rmp_id.in_([601, 602]))
+        )
+        real = run_enhanced_matching(db_session, min_year=2023)
+        assert dry == real
+
+
+class TestIncrementalMatching:
+    def _seed_before_watermark(self, session):
+        """Seed a matchable pair, then record a finished run after their last change."""
+        course = _make_course(session)
+        nexus = _make_nexus_prof(session, "HUANG L", course=course)
+        rmp = _make_rmp_prof(session, "Lei", "Huang", rmp_id=701)
+        full = _make_nexus_prof(session, "SMITH, JOHN", course=course)
+        full_rmp = _make_rmp_prof(session, "John", "Smith", rmp_id=702)
+        past = datetime(2020, 1, 1)
+        session.execute(update(Professor).values(updated_at=past))
+        session.add(MatchingRun(
+            started_at=past + timedelta(days=1), finished_at=past + timedelta(days=1),
+        ))
+        session.flush()
+        session.expire_all()
+        return nexus, rmp, full, full_rmp
+
+    def test_unchanged_professors_skipped(self, db_session):
+        self._seed_before_watermark(db_session)
+        stats = run_enhanced_matching(db_session, min_year=2023)
+        assert stats["incremental_since"] == "2020-01-02T00:00:00"
+        assert stats["total_new_matches"] == 0
+
+    def test_full_rebuild_ignores_watermark(self, db_session):
+        self._seed_before_watermark(db_session)
+        stats = run_enhanced_matching(db_session, min_year=2023, full_rebuild=True)
+        assert stats["incremental_since"] is None
+        assert stats["total_new_matches"] == 2
+
+    def test_changed_candidate_brings_pair_into_scope(self, db_session):
+        _, rmp, _, full_rmp = self._seed_before_watermark(db_session)
+        rmp.department = "Computer Engineering"
+        full_rmp.department = "Computer Engineering"
+        db_session.flush()
+
+        stats = run_enhanced_matching(db_session, min_year=2023)
+        assert stats["pass1"]["matched"] == 1
+        assert stats["pass2"]["matched"] == 1
+
+    def test_records_run_and_advances_watermark(self, db_session):
+        run_enhanced_matching(db_session, min_year=2023)
+        run_enhanced_matching(db_session, min_year=2023, dry_run=True)
+        runs = db_session.query(MatchingRun).all()
+        assert len(runs) == 1
+        assert runs[0].full_rebuild is True
+        assert runs[0].finished_at >= runs[0].started_at
+
+        stats = run_enhanced_matching(db_session, min_year=2023)
+        assert stats["incremental_since"] == runs[0].started_at.isoformat()
+
+
 class TestPass1:
     def test_matches_initial_to_rmp(self, db_session):
         course = _make_course(db_session)
@@ -135,6 +254,62 @@ class TestPass2:
         assert nexus.rmp_id is not None
 
 
+class TestParsedNameColumns:
+    def test_columns_set_on_create_and_link(self, db_session):
+        nexus = _make_nexus_prof(db_session, "HUANG L")
+        assert (nexus.last_name, nexus.first_name, nexus.is_initial) == ("huang", "l", True)
+
+        rmp = _make_rmp_prof(db_session, "Lei", "Huang", rmp_id=4242)
+        assert (rmp.last_name, rmp.first_name, rmp.is_initial) == ("huang", "lei", False)
+        assert rmp.name_normalized == "lei huang"
+
+        # Linking copies name_rmp onto the Nexus row; Nexus-derived fields stay
+        _link_professor(db_session, nexus, rmp, 90.0)
+        assert nexus.last_name == "huang"
+        assert nexus.is_initial is True
+
+
+class TestDepartmentResolution:
+    def test_nexus_code_and_rmp_name_resolve_to_same_department(self, db_session):
+        nexus = _make_nexus_prof(db_session, "HUANG L", dept="CMPSC")
+        rmp = _make_rmp_prof(db_session, "Lei", "Huang", dept="Computer Science")
+        assert nexus.department_id is not None
+        assert nexus.department_id == rmp.department_id
+        assert nexus.canonical_department.code == "CMPSC"
+
+    def test_department_change_re_resolves(self, db_session):
+        prof = _make_nexus_prof(db_session, "HUANG L", dept="CMPSC")
+        prof.department = "MATH"
+        db_session.flush()
+        assert prof.canonical_department.code == "MATH"
+        prof.department = None
+        db_session.flush()
+        assert prof.department_id is None
+
+
+class TestPass3:
+    def test_department_breaks_tie(self, db_session):
+        course = _make_course(db_session)
+        nexus = _make_nexus_prof(db_session, "HUANG L", dept="CMPSC", course=course)
+        rmp_cs = _make_rmp_prof(db_session, "Lei", "Huang", dept="Computer Science", rmp_id=111)
+        _make_rmp_prof(db_session, "Lin", "Huang", dept="History", rmp_id=222)
+        expected_rmp_id = rmp_cs.rmp_id
+
+        stats = _pass3_dept_disambiguation(db_session, min_year=2023)
+        assert stats["matched"] == 1
+        assert nexus.rmp_id == expected_rmp_id
+
+    def test_still_ambiguous(self, db_session):
+        course = _make_course(db_session)
+        nexus = _make_nexus_prof(db_session, "HUANG L", dept="CMPSC", course=course)
+        _make_rmp_prof(db_session, "Lei", "Huang", dept="Computer Science", rmp_id=111)
+        _make_rmp_prof(db_session, "Lin", "Huang", dept="Computer Science", rmp_id=222)
+
+        stats = _pass3_dept_disambiguation(db_session, min_year=2023)
+        assert stats["still_ambiguous"] == 1
+        assert nexus.rmp_id is None
+
+
 class TestPass4:
     def test_merges_duplicates(self, db_session):
         course = _make_course(db_session)
@@ -150,3 +325,58 @@ class TestPass4:
         # Full-name professor should have the grades
         remaining = db_session.get(Professor, full_id)
         assert remaining is not None
+
+    def test_colliding_grades_deleted_rest_reassigned(self, db_session):
+        course = _make_course(db_session)
+        other = _make_course(db_session, code="CMPSC 130B")
+        abbr = _make_nexus_prof(db_session, "CHANG S", course=course)
+        full = _make_nexus_prof(db_session, "CHANG SHIYU", course=course)
+        db_session.add(GradeDistribution(
+            professor_id=abbr.id, course_id=other.id, quarter="Winter", year=2024, a=5,
+        ))
+        db_session.flush()
+        full_id = full.id
+
+        _pass4_deduplication(db_session)
+
+        grades = db_session.query(GradeDistribution).filter_by(professor_id=full_id).all()
+        assert sorted(g.course_id for g in grades) == sorted([course.id, other.id])
+
+    def test_transfers_rmp_link_and_ratings(self, db_session):
+        abbr = _make_nexus_prof(db_session, "CHANG S")
+        full = _make_nexus_prof(db_session, "CHANG SHIYU")
+        abbr.rmp_id, abbr.name_rmp, abbr.match_confidence = 4242, "Shiyu Chang", 90.0
+        db_session.add(RmpRating(professor_id=abbr.id, overall_quality=4.5, num_ratings=3))
+        db_session.flush()
+        full_id = full.id
+
+        _pass4_deduplication(db_session)
+
+        full = db_session.get(Professor, full_id)
+        assert full.rmp_id == 4242
+        assert full.name_rmp == "Shiyu Chang"
+        assert [r.overall_quality for r in full.rmp_ratings] == [4.5]
+
+    def test_conflicting_rmp_links_not_merged(self, db_session):
+        abbr = _make_nexus_prof(db_session, "CHANG S")
+        full = _make_nexus_prof(db_session, "CHANG SHIYU")
+        abbr.rmp_id, full.rmp_id = 1, 2
+        db_session.flush()
+
+        stats = _pass4_deduplication(db_session)
+        assert stats == {"merged": 0, "conflicts": 1}
+        assert db_session.get(Professor, abbr.id) is not None
+
+    def test_two_abbreviations_into_one_full_name(self, db_session):
+        course = _make_course(db_session)
+        _make_nexus_prof(db_session, "CHANG S", course=course)
+        _make_nexus_prof(db_session, "CHANG S", course=course)
+        _make_nexus_prof(db_session, "CHANG S", course=course, year=2025)
+        full = _make_nexus_prof(db_session, "CHANG SHIYU")
+        full_id = full.id
+
+        stats = _pass4_deduplication(db_session)
+        assert stats["merged"] == 3
+        # The two abbreviations' Fall 2024 rows collide with each other; one is kept
+        grades = db_session.query(GradeDistribution).filter_by(professor_id=full_id).all()
+        assert sorted(g.year for g in grades) == [2024, 2025]
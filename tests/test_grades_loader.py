@@ -1,3 +1,8 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
 from db.models import Professor, Course, GradeDistribution
 from scrapers.grades_loader import load_grades_to_db
 
@@ -53,3 +58,64 @@ def test_load_is_idempotent(db_session):
     ).all()
     # Should not duplicate
     assert len(grades) == 1
+
+
+def test_new_grade_touches_professor(db_session):
+    row = {
+        "instructor": "LEE, KIM",
+        "course_code": "MATH3A",
+        "quarter": "Fall",
+        "year": 2024,
+        "avg_gpa": 3.0,
+        "department": "MATH",
+    }
+    load_grades_to_db([row], db_session)
+    prof = db_session.query(Professor).filter_by(name_nexus="LEE, KIM").one()
+    prof.updated_at = datetime(2020, 1, 1)
+    db_session.commit()
+
+    load_grades_to_db([row], db_session)
+    assert prof.updated_at == datetime(2020, 1, 1)
+
+    load_grades_to_db([{**row, "quarter": "Winter", "year": 2025}], db_session)
+    assert prof.updated_at > datetime(2020, 1, 1)
+
+
+def test_load_bumps_data_version_only_on_new_rows(db_session):
+    from db.data_version import current_data_version
+
+    row = {
+        "instructor": "PARK, MIN",
+        "course_code": "MATH4A",
+        "quarter": "Spring",
+        "year": 2024,
+        "avg_gpa": 3.1,
+        "department": "MATH",
+    }
+    before = current_data_version(db_session)
+    load_grades_to_db([row], db_session)
+    assert current_data_version(db_session) == before + 1
+    load_grades_to_db([row], db_session)
+    assert current_data_version(db_session) == before + 1
+
+
+def test_grades_are_stored_compactly_behind_the_old_attributes(db_session):
+    row = {
+        "instructor": "ROE, RAY", "course_code": "MATH3A", "quarter": "Spring", "year": 2022,
+        "a": 7, "b": 4, "c_minus": 2, "f": 1, "avg_gpa": 3.1, "department": "MATH",
+    }
+    load_grades_to_db([row], db_session)
+
+    grade = db_session.query(GradeDistribution).filter(GradeDistribution.quarter == "Spring").one()
+    assert (grade.quarter, grade.season, grade.year) == ("Spring", 1, 2022)
+    assert (grade.a, grade.a_plus) == (7, 0)
+    assert grade.total_students == 14
+    legacy = db_session.execute(text(
+        "SELECT quarter, year, a, a_plus, total_students FROM legacy_grade_distributions WHERE id = :id"
+    ), {"id": grade.id}).one()
+    assert tuple(legacy) == ("Spring", 2022, 7, 0, 14)
+
+
+def test_unknown_quarter_is_rejected():
+    with pytest.raises(ValueError, match="Unknown quarter"):
+        GradeDistribution(quarter="Autumn", year=2022)
@@ -3,7 +3,11 @@ from db.models import Base, Professor, Course, GradeDistribution, RmpRating, Rmp
 
 def test_all_tables_defined():
     table_names = {t.name for t in Base.metadata.sorted_tables}
-    expected = {"professors", "courses", "grade_distributions", "rmp_ratings", "rmp_comments", "gaucho_scores"}
+    expected = {
+        "professors", "courses", "grade_distributions", "rmp_ratings", "rmp_comments",
+        "gaucho_scores", "matching_runs", "departments", "data_version",
+        "professor_rating_rollups",
+    }
     assert expected == table_names
 
 
@@ -14,6 +18,11 @@ def test_professor_columns():
     assert "rmp_id" in cols
     assert "department" in cols
     assert "match_confidence" in cols
+    for parsed in ["last_name", "first_name", "is_initial", "name_normalized"]:
+        assert parsed in cols
+    assert Professor.__table__.c.last_name.index is True
+    assert "created_at" in cols
+    assert Professor.__table__.c.updated_at.index is True
 
 
 def test_grade_distribution_has_letter_grades():
@@ -22,3 +31,12 @@ def test_grade_distribution_has_letter_grades():
                   "c_plus", "c", "c_minus", "d_plus", "d", "d_minus", "f"]:
         assert grade in cols
     assert "avg_gpa" in cols
+
+
+def test_grade_distribution_term_ordinal_follows_quarter_and_year():
+    grade = GradeDistribution(professor_id=1, course_id=1, quarter="Fall", year=2023)
+    assert grade.term_ordinal == 2023 * 4 + 3
+    grade.quarter = "Winter"
+    grade.year = 2024
+    # Winter 2024 is the term right after Fall 2023
+    assert grade.term_ordinal == 2023 * 4 + 3 + 1
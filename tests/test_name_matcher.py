@@ -1,4 +1,10 @@
-from etl.name_matcher import normalize_nexus_name, normalize_rmp_name, match_names, match_confidence
+import random
+
+from thefuzz import fuzz, process
+
+from etl.name_matcher import (
+    normalize_nexus_name, normalize_rmp_name, match_names, match_confidence, RmpNameIndex,
+)
 
 
 def test_normalize_nexus_name():
@@ -41,3 +47,50 @@ def test_match_names_no_match():
     rmp_names = ["Robert Johnson"]
     matches = match_names(nexus_names, rmp_names)
     assert "ZHANG, WEI" not in matches or matches["ZHANG, WEI"]["confidence"] < 70
+
+
+def test_rmp_name_index_candidates():
+    index = RmpNameIndex(["John Smith", "Jane Doe", "Robert Johnson"])
+    assert len(index) == 3
+    assert 0 in index.candidates("john smith")
+    assert index.candidates("qqq") == []
+
+
+def test_rmp_name_index_word_order_insensitive():
+    index = RmpNameIndex(["John Smith"])
+    assert index.best_match("smith john") == ("John Smith", 100)
+
+
+def test_match_names_reuses_prebuilt_index():
+    index = RmpNameIndex(["John Smith", "Jane Doe"])
+    first = match_names(["SMITH, JOHN"], None, index=index)
+    second = match_names(["DOE, JANE"], None, index=index)
+    assert first["SMITH, JOHN"]["rmp_name"] == "John Smith"
+    assert second["DOE, JANE"]["rmp_name"] == "Jane Doe"
+
+
+def _shared_first_name_roster(n: int, seed: int = 0) -> list[str]:
+    """Names drawn from a handful of first names and short random last names."""
+    rng = random.Random(seed)
+    firsts = ["Anna", "John", "Maria", "David", "Wei", "Sarah"]
+    return [
+        f"{rng.choice(firsts)} {''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 6))).title()}"
+        for _ in range(n)
+    ]
+
+
+def test_rmp_name_index_matches_full_scan_with_shared_first_names():
+    rmp_names = _shared_first_name_roster(2000)
+    index = RmpNameIndex(rmp_names, top_k=10)
+    normalized = [normalize_rmp_name(name) for name in rmp_names]
+    rng = random.Random(1)
+    for name in rng.sample(rmp_names, 150):
+        first, last = name.split()
+        # One character of the last name replaced, as a spelling variant
+        i = rng.randrange(len(last))
+        query = normalize_nexus_name(f"{last[:i]}q{last[i + 1:]}, {first}".upper())
+
+        _, expected = process.extractOne(query, normalized, scorer=fuzz.token_sort_ratio)
+        rmp_name, score = index.best_match(query)
+        assert score == expected
+        assert match_confidence(query, normalize_rmp_name(rmp_name)) == expected
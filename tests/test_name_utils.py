@@ -5,6 +5,7 @@ from etl.name_utils import (
     is_initial_only,
     initial_matches,
     find_duplicate_pairs,
+    parse_professor_name,
 )
 
 
@@ -81,3 +82,22 @@ class TestFindDuplicatePairs:
         ]
         pairs = find_duplicate_pairs(names)
         assert len(pairs) == 0
+
+
+class TestParseProfessorName:
+    def test_nexus_name_wins(self):
+        fields = parse_professor_name("HUANG L", "Lei Huang")
+        assert fields == {
+            "last_name": "huang", "first_name": "l",
+            "is_initial": True, "name_normalized": "huang l",
+        }
+
+    def test_rmp_only(self):
+        fields = parse_professor_name(None, "Dr. Maria De La Cruz")
+        assert fields["last_name"] == "cruz"
+        assert fields["first_name"] == "dr."
+        assert fields["is_initial"] is False
+        assert fields["name_normalized"] == "maria de la cruz"
+
+    def test_no_names(self):
+        assert parse_professor_name(None, "  ")["last_name"] is None
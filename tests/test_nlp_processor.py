@@ -1,4 +1,4 @@
-from etl.nlp_processor import analyze_sentiment, extract_keywords
+from etl.nlp_processor import analyze_sentiment, analyze_sentiment_batch, extract_keywords
 
 
 def test_analyze_sentiment_positive():
@@ -29,3 +29,27 @@ def test_extract_keywords():
     # "exams" should be a top keyword given it appears in every comment
     keyword_texts = [k.lower() for k in keywords]
     assert any("exam" in k for k in keyword_texts)
+
+
+def test_analyze_sentiment_batch_matches_single():
+    texts = [
+        "Great professor, very clear and helpful!",
+        "Terrible class, confusing and unfair grading.",
+        "The exams are hard but the lectures are AMAZING",
+        "Not good at all. Never so disappointed",
+        "It was kind of boring, no help whatsoever??",
+        "At least he is not the worst :)",
+        "Loved it 😀 would take again",
+        "",
+        "   ",
+        "Great professor, very clear and helpful!",
+    ]
+    batch = analyze_sentiment_batch(texts)
+    assert len(batch) == len(texts)
+    for text, score in zip(texts, batch):
+        assert abs(score - analyze_sentiment(text)) < 1e-9
+
+
+def test_analyze_sentiment_batch_empty():
+    assert analyze_sentiment_batch([]) == []
+    assert analyze_sentiment_batch([None, ""]) == [0.0, 0.0]
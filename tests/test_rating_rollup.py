@@ -0,0 +1,101 @@
+"""Tests for db/rating_rollup.py — per-professor latest rating and sentiment rollups."""
+from datetime import datetime, timezone
+
+import pytest
+
+from db.course_stats import refresh_professor_course_stats
+from db.models import Professor, Course, GradeDistribution, RmpRating, RmpComment, ProfessorRatingRollup
+from db.rating_rollup import refresh_rating_rollups
+from dashboard.queries import get_professors_for_course
+from etl.nlp_processor import process_all_comments
+from scrapers.rmp_loader import load_rmp_teacher_to_db
+
+
+def _teacher(legacy_id, quality, comments):
+    return {
+        "legacy_id": legacy_id, "first_name": "Rollup", "last_name": f"Prof{legacy_id}",
+        "department": "Computer Science", "avg_rating": quality, "avg_difficulty": 3.0,
+        "num_ratings": 12, "comments": comments,
+    }
+
+
+def test_loader_writes_rollup(db_session):
+    prof = load_rmp_teacher_to_db(
+        _teacher(8801, 4.1, [{"text": "Clear lectures", "date": "2024-03-01"}]), db_session,
+    )
+    rollup = db_session.get(ProfessorRatingRollup, prof.id)
+    rating = db_session.query(RmpRating).filter_by(professor_id=prof.id).one()
+
+    assert rollup.latest_rating_id == rating.id
+    assert rollup.latest_fetched_at == rating.fetched_at
+    assert rollup.comment_count == 1
+    assert rollup.avg_sentiment is None
+
+
+def test_nlp_fills_rollup_sentiment_and_keywords(db_session):
+    prof = load_rmp_teacher_to_db(_teacher(8802, 4.0, [
+        {"text": "Amazing professor, super clear and helpful!", "date": "2024-03-01"},
+        {"text": "Great lectures, fair exams.", "date": "2024-04-01"},
+    ]), db_session)
+
+    process_all_comments(db_session)
+
+    rollup = db_session.get(ProfessorRatingRollup, prof.id)
+    assert rollup.avg_sentiment > 0
+    assert isinstance(rollup.keywords, list)
+
+
+def test_newest_rating_wins_and_deletion_clears(db_session):
+    prof = Professor(name_nexus="NEWEST, RATING", department="CS")
+    db_session.add(prof)
+    db_session.flush()
+    old = RmpRating(professor_id=prof.id, overall_quality=2.0, num_ratings=3,
+                    fetched_at=datetime(2023, 1, 1, tzinfo=timezone.utc))
+    new = RmpRating(professor_id=prof.id, overall_quality=4.5, num_ratings=9,
+                    fetched_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    db_session.add_all([old, new])
+    db_session.flush()
+    db_session.add_all([
+        RmpComment(rmp_rating_id=old.id, comment_text="old", sentiment_score=-0.8),
+        RmpComment(rmp_rating_id=new.id, comment_text="new", sentiment_score=0.6, keywords=["clear"]),
+    ])
+
+    refresh_rating_rollups(db_session, [prof.id])
+    rollup = db_session.get(ProfessorRatingRollup, prof.id)
+    assert rollup.latest_rating_id == new.id
+    assert rollup.avg_sentiment == 0.6
+    assert rollup.keywords == ["clear"]
+    # Quality 4.5 over 9 ratings pulls toward 3.0: (9 * 4.5 + 15) / 14 / 5
+    assert rollup.quality_factor == pytest.approx((9 * 4.5 + 15) / 14 / 5)
+    assert rollup.difficulty_factor == 0.5
+    assert rollup.sentiment_factor == pytest.approx(0.8)
+
+    db_session.query(RmpComment).delete(synchronize_session=False)
+    db_session.query(RmpRating).filter_by(professor_id=prof.id).delete(synchronize_session=False)
+    refresh_rating_rollups(db_session, [prof.id])
+    assert db_session.get(ProfessorRatingRollup, prof.id) is None
+
+
+def test_course_page_reads_rollup(db_session):
+    prof = load_rmp_teacher_to_db(
+        _teacher(8803, 3.9, [{"text": "Fine", "date": "2024-03-01"}]), db_session,
+    )
+    course = Course(code="ROLL101", department="CMPSC")
+    db_session.add(course)
+    db_session.flush()
+    db_session.add(GradeDistribution(
+        professor_id=prof.id, course_id=course.id, quarter="Fall", year=2024, avg_gpa=3.3,
+    ))
+    db_session.flush()
+    refresh_professor_course_stats(db_session)
+
+    rollup = db_session.get(ProfessorRatingRollup, prof.id)
+    rollup.avg_sentiment = 0.42
+    rollup.keywords = ["fair", "fair", "clear"]
+    db_session.flush()
+
+    [row] = get_professors_for_course(db_session, course.id)
+    assert row["rmp_quality"] == 3.9
+    assert row["rmp_num_ratings"] == 12
+    assert row["avg_sentiment"] == 0.42
+    assert row["keywords"] == ["fair", "clear"]
@@ -0,0 +1,122 @@
+"""Tests for db/recency.py — recency-weighted GPA and sentiment in Postgres."""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from db.course_stats import refresh_professor_course_stats
+from db.models import (
+    Professor, Course, GradeDistribution, RmpRating, RmpComment, GauchoScore, ProfessorRatingRollup,
+)
+from db.rating_rollup import refresh_rating_rollups
+from db.recency import recency_gpa_query, recency_sentiment_query
+from etl.score_bootstrap import RaggedGroups, bootstrap_means
+from etl.scoring import compute_all_scores, compute_gaucho_score, normalize_gpa
+
+
+def _seed(db_session):
+    """One professor teaching one course: GPA rising 2.0 -> 4.0, sentiment souring 1.0 -> -1.0."""
+    course = Course(code="DECAY1", department="CMPSC")
+    prof = Professor(name_nexus="DECAY, PROF", rmp_id=880201, department="CMPSC")
+    db_session.add_all([course, prof])
+    db_session.flush()
+    # Winter, Spring, Summer, Fall 2020 and Winter 2021: five consecutive terms
+    terms = [("Winter", 2020), ("Spring", 2020), ("Summer", 2020), ("Fall", 2020), ("Winter", 2021)]
+    for (quarter, year), gpa in zip(terms, [2.0, 2.5, 3.0, 3.5, 4.0]):
+        db_session.add(GradeDistribution(
+            professor_id=prof.id, course_id=course.id, quarter=quarter, year=year, avg_gpa=gpa,
+        ))
+    rating = RmpRating(professor_id=prof.id, overall_quality=4.0, difficulty=3.0, num_ratings=3)
+    db_session.add(rating)
+    db_session.flush()
+    newest = datetime(2024, 1, 1)
+    db_session.add_all([
+        RmpComment(rmp_rating_id=rating.id, comment_text="c", sentiment_score=s,
+                   created_at=newest - timedelta(days=days))
+        for s, days in [(1.0, 730), (0.0, 365), (-1.0, 0)]
+    ])
+    db_session.commit()
+    refresh_professor_course_stats(db_session)
+    refresh_rating_rollups(db_session)
+    return prof.id, course.id
+
+
+def test_recency_gpa_weights_recent_terms(db_session):
+    prof_id, course_id = _seed(db_session)
+    rows = {
+        half_life: next(r for r in db_session.execute(recency_gpa_query(half_life)) if r.professor_id == prof_id)
+        for half_life in (None, 1)
+    }
+
+    assert float(rows[None].mean_gpa) == pytest.approx(3.0)
+    # Ages 4..0 terms -> weights 1/16 .. 1
+    w = 0.5 ** np.array([4, 3, 2, 1, 0])
+    expected = (w * [2.0, 2.5, 3.0, 3.5, 4.0]).sum() / w.sum()
+    assert float(rows[1].mean_gpa) == pytest.approx(expected)
+    assert rows[1].course_id == course_id
+
+
+def test_recency_sentiment_decays_by_comment_age(db_session):
+    prof_id, _ = _seed(db_session)
+    sentiment = {
+        half_life: dict(db_session.execute(recency_sentiment_query(half_life)).all())[prof_id]
+        for half_life in (None, 365)
+    }
+
+    assert float(sentiment[None]) == pytest.approx(0.0)
+    # Ages 730, 365, 0 days -> weights 1/4, 1/2, 1
+    assert float(sentiment[365]) == pytest.approx((0.25 * 1.0 + 0.5 * 0.0 - 1.0) / 1.75)
+
+
+def test_weighted_bootstrap_means_follow_the_weights():
+    groups = RaggedGroups([[0.0, 1.0], [5.0]], weights=[[1.0, 3.0], [0.2]])
+    assert np.allclose(groups.means(), [0.75, 5.0])
+
+    means = bootstrap_means(groups, np.arange(2), 4000, np.random.default_rng(0))
+    assert (means[:, 1] == 5.0).all()
+    # Resamples are {0, 0}, {0, 1} or {1, 1}: weighted means 0, 0.75, 1
+    assert set(np.round(means[:, 0], 6)) == {0.0, 0.75, 1.0}
+
+
+def test_compute_all_scores_stores_decay_and_uses_it(db_session):
+    prof_id, course_id = _seed(db_session)
+
+    def stored():
+        return db_session.query(GauchoScore).filter_by(professor_id=prof_id, course_id=course_id).one()
+
+    compute_all_scores(db_session)
+    flat = stored()
+    flat_score = flat.score
+    assert flat.decay_used == {"gpa_half_life_terms": None, "sentiment_half_life_days": None}
+
+    compute_all_scores(db_session, gpa_half_life_terms=1)
+    gpa_decayed = stored()
+    assert gpa_decayed.decay_used["gpa_half_life_terms"] == 1
+    # GPA rose over time, so recency lifts the score
+    assert gpa_decayed.score > flat_score
+    assert gpa_decayed.score_low <= gpa_decayed.score <= gpa_decayed.score_high
+
+    compute_all_scores(db_session, gpa_half_life_terms=1, sentiment_half_life_days=365)
+    both = stored()
+    assert both.decay_used == {"gpa_half_life_terms": 1, "sentiment_half_life_days": 365}
+    # Sentiment soured over time, so decaying it too pulls the score back down
+    assert both.score < gpa_decayed.score
+
+
+def test_flat_score_uses_the_stats_view_gpa(db_session):
+    prof_id, course_id = _seed(db_session)
+    # A term loaded after the last refresh is not in the view yet
+    db_session.add(GradeDistribution(
+        professor_id=prof_id, course_id=course_id, quarter="Spring", year=2021, avg_gpa=1.0,
+    ))
+    db_session.commit()
+
+    compute_all_scores(db_session)
+    stored = db_session.query(GauchoScore).filter_by(professor_id=prof_id, course_id=course_id).one()
+    rollup = db_session.get(ProfessorRatingRollup, prof_id)
+    # The view's mean of the five seeded terms, as the dashboard card shows it
+    expected = compute_gaucho_score(
+        normalize_gpa(3.0), rollup.quality_factor, rollup.difficulty_factor, rollup.sentiment_factor,
+        stored.weights_used,
+    )
+    assert stored.score == pytest.approx(expected)
@@ -0,0 +1,239 @@
+"""Tests for dashboard/result_cache.py — pluggable, shareable query result cache."""
+
+import socketserver
+import threading
+
+import pytest
+
+from dashboard.result_cache import (
+    LRUBackend,
+    RedisBackend,
+    ResultCache,
+    SQLiteBackend,
+    backend_from_url,
+    cache_key,
+    dumps,
+    loads,
+)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Just enough of the Redis protocol for GET, SET (ignoring EX) and SELECT."""
+
+    def handle(self):
+        while True:
+            header = self.rfile.readline()
+            if not header:
+                return
+            parts = []
+            for _ in range(int(header[1:])):
+                n = int(self.rfile.readline()[1:])
+                parts.append(self.rfile.read(n + 2)[:-2])
+            cmd = parts[0].upper()
+            if cmd == b"GET":
+                value = self.server.store.get(parts[1])
+                self.wfile.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value))
+            elif cmd == b"SET":
+                self.server.store[parts[1]] = parts[2]
+                self.wfile.write(b"+OK\r\n")
+            elif cmd == b"SELECT":
+                self.wfile.write(b"+OK\r\n")
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+class _GarbledHandler(socketserver.StreamRequestHandler):
+    """Answers every command with a bulk reply whose length is not a number."""
+
+    def handle(self):
+        while self.rfile.readline():
+            self.wfile.write(b"$abc\r\n")
+
+
+def _serve(handler):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.store = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def resp_server():
+    server = _serve(_RespHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def garbled_server():
+    server = _serve(_GarbledHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _counting_loader(cache):
+    calls = []
+
+    @cache.cached
+    def load(data_version, course_id, min_year=None):
+        calls.append((data_version, course_id, min_year))
+        return [{"id": course_id, "min_year": min_year, "gpa": 3.25}]
+
+    return load, calls
+
+
+def test_serialization_round_trip_and_compression():
+    small = {"a": [1, 2.5, None, "x"]}
+    assert loads(dumps(small)) == small
+    assert dumps(small).startswith(b"j")
+    big = [{"name": "Professor", "gpa": 3.5}] * 200
+    assert dumps(big).startswith(b"z")
+    assert len(dumps(big)) < len(str(big)) // 10
+    assert loads(dumps(big)) == big
+
+
+def test_cache_key_covers_function_version_and_arguments():
+    base = cache_key("f", 1, {"course_id": 5, "min_year": 2020})
+    assert base == cache_key("f", 1, {"min_year": 2020, "course_id": 5})
+    assert base != cache_key("g", 1, {"course_id": 5, "min_year": 2020})
+    assert base != cache_key("f", 2, {"course_id": 5, "min_year": 2020})
+    assert base != cache_key("f", 1, {"course_id": 6, "min_year": 2020})
+    assert base != cache_key("f", 1, {"course_id": 5, "min_year": 2021})
+
+
+def test_cached_calls_share_a_key_however_arguments_are_passed():
+    cache = ResultCache(LRUBackend())
+    load, calls = _counting_loader(cache)
+
+    load(1, 42)
+    load(1, 42, None)
+    load(1, course_id=42)
+    load(data_version=1, course_id=42, min_year=None)
+    assert len(calls) == 1
+
+
+def test_lru_backend_evicts_least_recently_used():
+    backend = LRUBackend(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1" and backend.get("c") == b"3"
+
+
+def test_cached_hits_misses_and_data_version():
+    cache = ResultCache(LRUBackend())
+    load, calls = _counting_loader(cache)
+
+    first = load(1, 42, min_year=2020)
+    first[0]["gpa"] = 0  # callers may mutate results without touching the cache
+    assert load(1, 42, min_year=2020) == [{"id": 42, "min_year": 2020, "gpa": 3.25}]
+    load(2, 42, min_year=2020)
+    assert calls == [(1, 42, 2020), (2, 42, 2020)]
+
+    stats = cache.stats()["_counting_loader.<locals>.load"]
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-3)
+    assert stats["avg_lookup_ms"] is not None
+
+
+def test_cached_counters_are_exact_across_threads():
+    cache = ResultCache(LRUBackend())
+    load, _ = _counting_loader(cache)
+    load(1, 1)
+
+    def hammer():
+        for _ in range(2000):
+            load(1, 1)
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = cache.stats()["_counting_loader.<locals>.load"]
+    assert stats["hits"] == 8 * 2000 and stats["misses"] == 1
+
+
+def test_sqlite_backend_is_shared_between_replicas(tmp_path):
+    url = f"sqlite:///{tmp_path / 'cache.db'}"
+    replica_a = ResultCache(backend_from_url(url))
+    replica_b = ResultCache(backend_from_url(url))
+    load_a, calls_a = _counting_loader(replica_a)
+    load_b, calls_b = _counting_loader(replica_b)
+
+    assert load_a(3, 7) == load_b(3, 7)
+    assert len(calls_a) == 1 and calls_b == []
+
+
+def test_sqlite_backend_expires_entries(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), ttl=-1)
+    backend.set("k", b"v")
+    assert backend.get("k") is None
+
+
+def test_redis_backend_against_resp_stand_in(resp_server):
+    host, port = resp_server.server_address
+    backend = backend_from_url(f"redis://{host}:{port}/1")
+    assert isinstance(backend, RedisBackend)
+    cache = ResultCache(backend)
+    load, calls = _counting_loader(cache)
+
+    assert load(1, 9) == load(1, 9)
+    assert len(calls) == 1
+    assert len(resp_server.store) == 1
+
+
+def test_unreachable_backend_degrades_to_miss():
+    cache = ResultCache(RedisBackend("127.0.0.1", 1, timeout=0.2))
+    load, calls = _counting_loader(cache)
+    assert load(1, 5) == [{"id": 5, "min_year": None, "gpa": 3.25}]
+    assert load(1, 5) == [{"id": 5, "min_year": None, "gpa": 3.25}]
+    assert len(calls) == 2
+    assert cache.stats()["_counting_loader.<locals>.load"]["errors"] == 4
+
+
+def test_malformed_reply_degrades_to_miss_and_closes_connection(garbled_server):
+    backend = RedisBackend(*garbled_server.server_address)
+    cache = ResultCache(backend)
+    load, calls = _counting_loader(cache)
+
+    assert load(1, 5) == [{"id": 5, "min_year": None, "gpa": 3.25}]
+    assert len(calls) == 1
+    assert cache.stats()["_counting_loader.<locals>.load"]["errors"] == 2
+    assert backend._local.file is None and backend._local.sock is None
+
+
+def test_failed_connection_is_closed_before_reconnecting(resp_server, monkeypatch):
+    backend = RedisBackend(*resp_server.server_address)
+    assert backend.get("k") is None
+    sock = backend._local.sock
+
+    def broken(*args):
+        raise OSError("boom")
+
+    monkeypatch.setattr(backend, "_reply", broken)
+    with pytest.raises(OSError):
+        backend.get("k")
+    assert sock.fileno() == -1
+
+
+def test_sqlite_backend_indexes_expiry(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    plan = backend._conn().execute(
+        "EXPLAIN QUERY PLAN DELETE FROM results WHERE expires_at <= ?", (0,)
+    ).fetchall()
+    assert "ix_results_expires_at" in str(plan)
+
+
+def test_backend_from_url():
+    assert isinstance(backend_from_url(None), LRUBackend)
+    assert backend_from_url("memory://?max_entries=10").max_entries == 10
+    with pytest.raises(ValueError):
+        backend_from_url("memcached://localhost")
@@ -73,3 +73,14 @@ def test_load_rmp_teacher(db_session):
 
     comments = db_session.query(RmpComment).filter_by(rmp_rating_id=rating.id).all()
     assert len(comments) == 2
+
+
+def test_load_rmp_teacher_bumps_data_version(db_session):
+    from db.data_version import current_data_version
+
+    before = current_data_version(db_session)
+    load_rmp_teacher_to_db(
+        {"legacy_id": 9998, "first_name": "Bo", "last_name": "Kim", "num_ratings": 0},
+        db_session,
+    )
+    assert current_data_version(db_session) == before + 1
@@ -0,0 +1,84 @@
+"""Tests for etl/score_bootstrap.py — vectorized bootstrap intervals for Gaucho scores."""
+import numpy as np
+import pytest
+
+from db.course_stats import refresh_professor_course_stats
+from db.models import Professor, Course, GradeDistribution, RmpRating, RmpComment, GauchoScore
+from db.rating_rollup import refresh_rating_rollups
+from etl.score_bootstrap import RaggedGroups, bootstrap_means, score_intervals
+from etl.scoring import compute_all_scores, compute_gaucho_score
+
+
+def test_ragged_groups_means_and_pooled_std():
+    groups = RaggedGroups([[1.0, 3.0], [], [2.0], [4.0, 4.0, 7.0]])
+    assert np.allclose(groups.means(), [2.0, np.nan, 2.0, 5.0], equal_nan=True)
+    # Squared deviations 2 + 6 over 1 + 2 degrees of freedom
+    assert groups.pooled_std() == pytest.approx(np.sqrt(8 / 3))
+
+
+def test_bootstrap_means_resample_within_each_group():
+    groups = RaggedGroups([[1.0, 2.0, 3.0], [], [10.0], [5.0, 5.0]])
+    means = bootstrap_means(groups, np.arange(4), 2000, np.random.default_rng(0))
+
+    assert means.shape == (2000, 4)
+    assert np.isnan(means[:, 1]).all()
+    assert (means[:, 2] == 10.0).all() and (means[:, 3] == 5.0).all()
+    assert means[:, 0].min() >= 1.0 and means[:, 0].max() <= 3.0
+    assert means[:, 0].mean() == pytest.approx(2.0, abs=0.05)
+    # Every resample of three values is a mean of thirds
+    assert np.allclose(means[:, 0] * 3, np.round(means[:, 0] * 3))
+
+
+def test_intervals_shrink_with_more_data_and_cover_the_score():
+    rng = np.random.default_rng(1)
+    thin_gpa, thin_sent = [3.4], [0.6]
+    thick_gpa = list(np.clip(rng.normal(3.4, 0.25, 30), 0, 4))
+    thick_sent = list(np.clip(rng.normal(0.6, 0.3, 200), -1, 1))
+    gpas = RaggedGroups([thin_gpa, thick_gpa, []])
+    sentiments = RaggedGroups([thin_sent, thick_sent, []])
+
+    low, high = score_intervals(gpas, sentiments, np.full(3, 0.7), np.full(3, 0.4), max_cells=500)
+
+    assert high[0] - low[0] > 2 * (high[1] - low[1])
+    for i, (g, s) in enumerate([(thin_gpa, thin_sent), (thick_gpa, thick_sent)]):
+        point = compute_gaucho_score(np.mean(g) / 4, 0.7, 0.4, (np.mean(s) + 1) / 2)
+        assert low[i] <= point <= high[i]
+    # No GPAs or comments: both resampled factors fall back to 0.5
+    assert low[2] == high[2] == pytest.approx(compute_gaucho_score(0.5, 0.7, 0.4, 0.5))
+
+
+def test_compute_all_scores_stores_wider_intervals_for_thin_data(db_session):
+    course = Course(code="BOOT1", department="CMPSC")
+    db_session.add(course)
+    db_session.flush()
+    profs = {}
+    for name, rmp_id, quarters, comments in [("THIN", 880101, 1, 1), ("THICK", 880102, 12, 40)]:
+        prof = Professor(name_nexus=f"{name}, BOOT", rmp_id=rmp_id, department="CMPSC")
+        db_session.add(prof)
+        db_session.flush()
+        for q in range(quarters):
+            db_session.add(GradeDistribution(
+                professor_id=prof.id, course_id=course.id, quarter="Fall", year=2000 + q,
+                avg_gpa=3.0 + 0.1 * (q % 5),
+            ))
+        rating = RmpRating(professor_id=prof.id, overall_quality=4.0, difficulty=3.0, num_ratings=comments)
+        db_session.add(rating)
+        db_session.flush()
+        db_session.add_all([
+            RmpComment(rmp_rating_id=rating.id, comment_text="c", sentiment_score=0.2 + 0.05 * (c % 7))
+            for c in range(comments)
+        ])
+        profs[name] = prof.id
+    db_session.commit()
+    refresh_professor_course_stats(db_session)
+    refresh_rating_rollups(db_session)
+
+    compute_all_scores(db_session)
+
+    thin, thick = (
+        db_session.query(GauchoScore).filter_by(professor_id=profs[name], course_id=course.id).one()
+        for name in ("THIN", "THICK")
+    )
+    for s in (thin, thick):
+        assert s.score_low <= s.score <= s.score_high
+    assert thin.score_high - thin.score_low > thick.score_high - thick.score_low
@@ -0,0 +1,71 @@
+"""Tests for etl/sharded_matching.py — last-name sharded candidate scoring."""
+
+from db.models import Professor, GradeDistribution, Course
+from etl.enhanced_matcher import (
+    LinkPlan,
+    _get_unmatched_nexus,
+    _get_unlinked_rmp,
+    _pass1_initial_match,
+    _pass3_dept_disambiguation,
+    run_enhanced_matching,
+)
+from etl.sharded_matching import score_shard, shard_index, sharded_initial_candidates
+
+
+def _seed(session):
+    """Initial-only Nexus names with unique, ambiguous and dept-resolvable RMP candidates."""
+    course = Course(code="SHARD 1", department="CMPSC")
+    session.add(course)
+    session.flush()
+    rmp_id = 900
+    for i, last in enumerate(["LEE", "KIM", "PARK", "WANG", "CHEN", "GARCIA", "NGUYEN", "SMITH"]):
+        nexus = Professor(name_nexus=f"{last} J", department="CMPSC" if i % 2 else "MATH")
+        session.add(nexus)
+        session.flush()
+        session.add(GradeDistribution(
+            professor_id=nexus.id, course_id=course.id, quarter="Fall", year=2024,
+        ))
+        # i % 3 == 0: one candidate; otherwise two, split across departments
+        firsts = ["Jane"] if i % 3 == 0 else ["Jane", "John"]
+        depts = ["Computer Science", "Mathematics"]
+        for j, first in enumerate(firsts):
+            rmp_id += 1
+            session.add(Professor(
+                name_rmp=f"{first} {last.title()}", rmp_id=rmp_id, department=depts[j],
+            ))
+    session.flush()
+
+
+def test_shard_index_is_stable():
+    assert shard_index("lee", 8) == shard_index("lee", 8)
+    assert 0 <= shard_index("nguyen", 8) < 8
+
+
+def test_score_shard():
+    nexus = [(1, "lee", "j", 5)]
+    rmp = [(10, "lee", "jane", 5), (11, "lee", "kim", 5), (12, "kim", "jo", 6)]
+    assert score_shard((nexus, rmp)) == [(1, [(10, True)])]
+
+
+def test_sharded_candidates_match_serial_passes(db_session):
+    _seed(db_session)
+    unmatched = _get_unmatched_nexus(db_session)
+    rmp_profs = _get_unlinked_rmp(db_session)
+    scored = sharded_initial_candidates(unmatched, rmp_profs, workers=2)
+
+    serial, sharded = LinkPlan(), LinkPlan()
+    s1 = _pass1_initial_match(db_session, unmatched, rmp_profs, plan=serial)
+    s3 = _pass3_dept_disambiguation(db_session, plan=serial)
+    p1 = _pass1_initial_match(db_session, unmatched, rmp_profs, plan=sharded, scored=scored)
+    p3 = _pass3_dept_disambiguation(db_session, plan=sharded, scored=scored)
+
+    assert (s1, s3) == (p1, p3)
+    assert s1["matched"] > 0 and s3["matched"] > 0
+    assert serial.links == sharded.links
+
+
+def test_run_enhanced_matching_parallel_same_as_serial(db_session):
+    _seed(db_session)
+    serial = run_enhanced_matching(db_session, dry_run=True)
+    parallel = run_enhanced_matching(db_session, dry_run=True, workers=2)
+    assert serial == parallel
@@ -0,0 +1,89 @@
+"""Tests for etl/weight_sweep.py — batch what-if rankings over many weight vectors."""
+import numpy as np
+import pytest
+
+from dashboard.queries import rank_professors
+from db.course_stats import refresh_professor_course_stats
+from db.models import Professor, Course, GradeDistribution, RmpRating
+from db.rating_rollup import refresh_rating_rollups
+from etl.weight_sweep import FACTORS, FactorMatrix, sample_weights, weight_sweep
+
+
+def _brute_force_ranks(factors, professor_ids, w):
+    scores = np.clip(factors @ w * 100, 0, 100)
+    order = sorted(range(len(scores)), key=lambda i: (-scores[i], professor_ids[i]))
+    ranks = np.empty(len(scores), dtype=int)
+    ranks[order] = np.arange(len(scores))
+    return ranks
+
+
+def test_sweep_matches_brute_force_across_chunks():
+    rng = np.random.default_rng(7)
+    n = 120
+    matrix = FactorMatrix(rng.permutation(n) + 1, rng.integers(0, 15, n), rng.random((n, 4)))
+    weights = sample_weights(50, seed=3)
+
+    # A small max_cells forces several chunks of courses
+    results = weight_sweep(matrix, weights, max_cells=1000)
+    assert len(results) == len(set(matrix.course_ids.tolist()))
+
+    for course in results:
+        rows = np.flatnonzero(matrix.course_ids == course["course_id"])
+        ranks = np.array([_brute_force_ranks(matrix.factors[rows], matrix.professor_ids[rows], w) for w in weights])
+        base = _brute_force_ranks(matrix.factors[rows], matrix.professor_ids[rows], np.full(4, 0.25))
+        by_id = {p["professor_id"]: p for p in course["professor_stats"]}
+        for j, row in enumerate(rows):
+            stats = by_id[int(matrix.professor_ids[row])]
+            assert stats["top_rate"] == pytest.approx((ranks[:, j] == 0).mean(), abs=1e-4)
+            assert stats["baseline_rank"] == base[j] + 1
+            assert stats["best_rank"] == ranks[:, j].min() + 1
+            assert stats["worst_rank"] == ranks[:, j].max() + 1
+        assert course["distinct_tops"] == len(set(ranks.argmin(axis=1).tolist()))
+
+
+def test_sweep_ties_and_single_professor_courses():
+    matrix = FactorMatrix([9, 4, 6], [1, 1, 2], np.full((3, 4), 0.5))
+    [tied, single] = weight_sweep(matrix, sample_weights(20, seed=0))
+
+    # Equal factors tie under every weighting; the lower professor id wins
+    assert tied["baseline_top"] == 4 and tied["baseline_top_rate"] == 1.0
+    assert tied["distinct_tops"] == 1 and tied["mean_spearman"] == 1.0
+    assert single["professors"] == 1 and single["mean_spearman"] == 1.0
+
+
+def test_sample_weights_are_on_the_simplex():
+    uniform = sample_weights(500, seed=1)
+    assert uniform.shape == (500, len(FACTORS))
+    assert np.allclose(uniform.sum(axis=1), 1.0)
+
+    gpa_heavy = sample_weights(500, center={"gpa": 0.7, "quality": 0.1, "difficulty": 0.1, "sentiment": 0.1},
+                               concentration=50, seed=1)
+    assert gpa_heavy[:, 0].mean() == pytest.approx(0.7, abs=0.03)
+
+
+def test_loaded_matrix_agrees_with_sql_ranking(db_session):
+    course = Course(code="SWEEP1", department="CMPSC")
+    db_session.add(course)
+    db_session.flush()
+    for i, (gpa, quality) in enumerate([(3.9, 2.0), (2.5, 4.8), (3.2, None), (None, 3.5)]):
+        prof = Professor(name_nexus=f"SWEEP{i}, PROF", department="CMPSC")
+        db_session.add(prof)
+        db_session.flush()
+        db_session.add(GradeDistribution(
+            professor_id=prof.id, course_id=course.id, quarter="Fall", year=2024, avg_gpa=gpa,
+        ))
+        if quality is not None:
+            db_session.add(RmpRating(professor_id=prof.id, overall_quality=quality, difficulty=3.0, num_ratings=20))
+    refresh_professor_course_stats(db_session)
+    refresh_rating_rollups(db_session)
+
+    matrix = FactorMatrix.load(db_session)
+    for w in ({"gpa": 0.25, "quality": 0.25, "difficulty": 0.25, "sentiment": 0.25},
+              {"gpa": 0.9, "quality": 0.1, "difficulty": 0.0, "sentiment": 0.0},
+              {"gpa": 0.0, "quality": 1.0, "difficulty": 0.0, "sentiment": 0.0}):
+        [result] = [c for c in weight_sweep(matrix, np.array([[w[f] for f in FACTORS]]), baseline=w)
+                    if c["course_id"] == course.id]
+        expected = [r["id"] for r in rank_professors(db_session, course.id, w, k=4)]
+        got = sorted(result["professor_stats"], key=lambda p: p["baseline_rank"])
+        assert [p["professor_id"] for p in got] == expected
+        assert result["baseline_top_rate"] == 1.0